@@ -19,6 +19,14 @@ if config.config_file_name is not None:
 from app.database import Base
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    # The full-text index (and FTS5's shadow tables) is managed by hand
+    if type_ == "table" and name is not None and name.startswith("syllabus_search"):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -43,6 +51,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -66,7 +75,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name
         )
 
         with context.begin_transaction():
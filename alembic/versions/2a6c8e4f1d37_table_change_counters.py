@@ -0,0 +1,35 @@
+"""table change counters
+
+Revision ID: 2a6c8e4f1d37
+Revises: 7d1f3b8e6a42
+Create Date: 2026-10-17 14:21:09.554170
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a6c8e4f1d37'
+down_revision: Union[str, Sequence[str], None] = '7d1f3b8e6a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("table_versions"):
+        return
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("table_versions")
@@ -0,0 +1,42 @@
+"""keyset pagination indexes
+
+Revision ID: 3b8e1f6c2a90
+Revises: f7928c86b5d4
+Create Date: 2026-10-17 09:12:41.532018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e1f6c2a90'
+down_revision: Union[str, Sequence[str], None] = 'f7928c86b5d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_users_role_id", "users", ["role", "id"]),
+    ("ix_users_department_id_id", "users", ["department_id", "id"]),
+    ("ix_subjects_department_id_id", "subjects", ["department_id", "id"]),
+    ("ix_syllabi_status_id", "syllabi", ["status", "id"]),
+    ("ix_syllabi_teacher_id_id", "syllabi", ["teacher_id", "id"]),
+    ("ix_syllabi_subject_id_id", "syllabi", ["subject_id", "id"]),
+    ("ix_syllabi_updated_at_id", "syllabi", ["updated_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables may have been created by create_admin.py with these indexes already
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,80 @@
+"""dashboard stats
+
+Revision ID: 4f6a1c9e2b75
+Revises: 8b3e5d2c9f64
+Create Date: 2026-10-17 18:42:13.570214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6a1c9e2b75'
+down_revision: Union[str, Sequence[str], None] = '8b3e5d2c9f64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The counters as app.models.models.rebuild_dashboard_stats computed them
+# when this revision was written, frozen so later changes to the app cannot
+# alter what this migration does
+SUBJECT_STATES = (
+    "SELECT s.id AS id, s.department_id AS department_id, "
+    "CASE WHEN EXISTS (SELECT 1 FROM assignments a WHERE a.subject_id = s.id) THEN 1 ELSE 0 END AS assigned, "
+    "CASE WHEN EXISTS (SELECT 1 FROM assignments a WHERE a.subject_id = s.id) "
+    "AND EXISTS (SELECT 1 FROM syllabi y WHERE y.subject_id = s.id AND y.status = 'approved') THEN 1 ELSE 0 END AS complete "
+    "FROM subjects s"
+)
+INSERT_STATS = "INSERT INTO dashboard_stats (scope, scope_id, name, value) "
+REBUILD_STATS = [
+    "DELETE FROM dashboard_stats",
+    INSERT_STATS
+    + "SELECT 'department', s.department_id, 'syllabi:' || y.status, COUNT(*) "
+    "FROM syllabi y JOIN subjects s ON s.id = y.subject_id "
+    "WHERE s.department_id IS NOT NULL GROUP BY s.department_id, y.status",
+    *(
+        INSERT_STATS
+        + f"SELECT 'department', department_id, '{name}', {value} FROM ({SUBJECT_STATES}) states "
+        "WHERE department_id IS NOT NULL GROUP BY department_id"
+        for name, value in (("subjects", "COUNT(*)"), ("subjects:assigned", "SUM(assigned)"), ("subjects:complete", "SUM(complete)"))
+    ),
+    INSERT_STATS
+    + "SELECT 'teacher', teacher_id, 'syllabi:' || status, COUNT(*) FROM syllabi "
+    "WHERE teacher_id IS NOT NULL GROUP BY teacher_id, status",
+    INSERT_STATS
+    + "SELECT 'teacher', teacher_id, 'assignments', COUNT(*) FROM assignments "
+    "WHERE teacher_id IS NOT NULL GROUP BY teacher_id",
+    INSERT_STATS
+    + "SELECT 'teacher', a.teacher_id, 'assignments:open', COUNT(CASE WHEN NOT EXISTS ("
+    "SELECT 1 FROM syllabi y WHERE y.subject_id = a.subject_id AND y.teacher_id = a.teacher_id AND y.status = 'approved'"
+    ") THEN 1 END) FROM assignments a WHERE a.teacher_id IS NOT NULL GROUP BY a.teacher_id",
+    *(
+        INSERT_STATS + f"SELECT 'subject', id, '{name}', {name} FROM ({SUBJECT_STATES}) states"
+        for name in ("assigned", "complete")
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table("dashboard_stats"):
+        op.create_table(
+            "dashboard_stats",
+            sa.Column("scope", sa.String(), nullable=False),
+            sa.Column("scope_id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("value", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("scope", "scope_id", "name"),
+        )
+
+    # Count everything written before the counters existed
+    for statement in REBUILD_STATS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("dashboard_stats")
@@ -0,0 +1,168 @@
+"""delta encoded syllabus versions
+
+Revision ID: 5e7a9c3d8f21
+Revises: 9c4d2e7a1b53
+Create Date: 2026-10-17 11:26:05.817342
+
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7a9c3d8f21'
+down_revision: Union[str, Sequence[str], None] = '9c4d2e7a1b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+syllabi = sa.table(
+    "syllabi",
+    sa.column("id", sa.Integer),
+    sa.column("template_data", sa.JSON),
+    sa.column("created_at", sa.DateTime),
+)
+versions = sa.table(
+    "syllabus_versions",
+    sa.column("id", sa.Integer),
+    sa.column("syllabus_id", sa.Integer),
+    sa.column("version", sa.Integer),
+    sa.column("kind", sa.String),
+    sa.column("data", sa.JSON(none_as_null=True)),
+    sa.column("payload", sa.LargeBinary),
+    sa.column("timestamp", sa.DateTime),
+)
+
+
+# Frozen copy of the app.utils.versioning codec and its default settings as
+# of this revision; stored revisions stay readable by the app whatever
+# interval or compression threshold it is configured with later
+SNAPSHOT_INTERVAL = 10
+COMPRESS_MIN_BYTES = 256
+
+
+def _escape(key):
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old, new, path=""):
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        pointer = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(old[key], dict) and isinstance(value, dict):
+            ops.extend(make_patch(old[key], value, pointer))
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+
+def apply_patch(doc, ops):
+    doc = json.loads(json.dumps(doc))
+    for patch_op in ops:
+        tokens = [_unescape(token) for token in patch_op["path"].split("/")[1:]]
+        target = doc
+        for token in tokens[:-1]:
+            target = target[token]
+        if patch_op["op"] == "remove":
+            target.pop(tokens[-1], None)
+        else:
+            target[tokens[-1]] = patch_op["value"]
+    return doc
+
+
+def encode_body(body):
+    raw = json.dumps(body, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return None, zlib.compress(raw)
+    return body, None
+
+
+def decode_body(row):
+    if row.payload is not None:
+        return json.loads(zlib.decompress(row.payload))
+    return row.data
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    existing = {column["name"] for column in sa.inspect(bind).get_columns("syllabus_versions")}
+    with op.batch_alter_table("syllabus_versions") as batch_op:
+        if "version" not in existing:
+            batch_op.add_column(sa.Column("version", sa.Integer(), nullable=True))
+        if "kind" not in existing:
+            batch_op.add_column(sa.Column("kind", sa.String(), nullable=True))
+        if "payload" not in existing:
+            batch_op.add_column(sa.Column("payload", sa.LargeBinary(), nullable=True))
+
+    # Existing rows each hold a full copy of template_data; re-encode every
+    # syllabus' chain as periodic snapshots with JSON patches in between
+    interval = SNAPSHOT_INTERVAL
+    rows = bind.execute(
+        sa.select(versions.c.id, versions.c.syllabus_id, versions.c.data)
+        .where(versions.c.version.is_(None))
+        .order_by(versions.c.syllabus_id, versions.c.timestamp, versions.c.id)
+    ).all()
+    previous_syllabus, previous_doc, number = None, None, 0
+    for row in rows:
+        if row.syllabus_id != previous_syllabus:
+            previous_syllabus, previous_doc, number = row.syllabus_id, None, 0
+        number += 1
+        doc = row.data or {}
+        if previous_doc is None or (number - 1) % interval == 0:
+            kind, body = "snapshot", doc
+        else:
+            kind, body = "delta", make_patch(previous_doc, doc)
+        data, payload = encode_body(body)
+        bind.execute(
+            versions.update().where(versions.c.id == row.id).values(version=number, kind=kind, data=data, payload=payload)
+        )
+        previous_doc = doc
+
+    # Give syllabi without any history a first snapshot of their current content
+    has_history = sa.select(versions.c.id).where(versions.c.syllabus_id == syllabi.c.id).exists()
+    for row in bind.execute(sa.select(syllabi.c.id, syllabi.c.template_data, syllabi.c.created_at).where(~has_history)).all():
+        data, payload = encode_body(row.template_data or {})
+        bind.execute(versions.insert().values(
+            syllabus_id=row.id, version=1, kind="snapshot", data=data, payload=payload, timestamp=row.created_at
+        ))
+
+    op.create_index(
+        "ix_syllabus_versions_syllabus_id_version", "syllabus_versions", ["syllabus_id", "version"],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(versions.c.id, versions.c.syllabus_id, versions.c.kind, versions.c.data, versions.c.payload)
+        .order_by(versions.c.syllabus_id, versions.c.version)
+    ).all()
+    previous_syllabus, doc = None, None
+    for row in rows:
+        if row.syllabus_id != previous_syllabus:
+            previous_syllabus, doc = row.syllabus_id, None
+        body = decode_body(row)
+        doc = body if row.kind == "snapshot" or doc is None else apply_patch(doc, body)
+        bind.execute(versions.update().where(versions.c.id == row.id).values(data=doc))
+
+    op.drop_index("ix_syllabus_versions_syllabus_id_version", table_name="syllabus_versions", if_exists=True)
+    with op.batch_alter_table("syllabus_versions") as batch_op:
+        batch_op.drop_column("payload")
+        batch_op.drop_column("kind")
+        batch_op.drop_column("version")
@@ -0,0 +1,88 @@
+"""unique syllabus versions
+
+Revision ID: 6c2e8a4f1b93
+Revises: 4f6a1c9e2b75
+Create Date: 2026-10-17 19:26:41.093518
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e8a4f1b93'
+down_revision: Union[str, Sequence[str], None] = '4f6a1c9e2b75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = "ix_syllabi_subject_id_teacher_id_version"
+COLUMNS = ["subject_id", "teacher_id", sa.text("version DESC")]
+
+syllabi = sa.table(
+    "syllabi",
+    sa.column("id", sa.Integer),
+    sa.column("subject_id", sa.Integer),
+    sa.column("teacher_id", sa.Integer),
+    sa.column("version", sa.Integer),
+)
+change_log = sa.table(
+    "change_log",
+    sa.column("table_name", sa.String),
+    sa.column("row_id", sa.Integer),
+    sa.column("op", sa.String),
+    sa.column("changed_at", sa.DateTime),
+)
+
+
+def record_syllabus_changes(bind, ids):
+    """Bump the syllabi table counter and log an upsert per id, as
+    app.models.models.record_changes did when this revision was written."""
+    if not ids:
+        return
+    bind.execute(sa.text(
+        "INSERT INTO table_versions (table_name, version) VALUES ('syllabi', 1) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1"
+    ))
+    now = datetime.utcnow()
+    bind.execute(change_log.insert(), [
+        {"table_name": "syllabi", "row_id": id, "op": "upsert", "changed_at": now} for id in ids
+    ])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # Racing creates may already have stored the same version twice; number
+    # those (subject, teacher) pairs again in creation order
+    duplicated = (
+        sa.select(syllabi.c.subject_id, syllabi.c.teacher_id)
+        .group_by(syllabi.c.subject_id, syllabi.c.teacher_id, syllabi.c.version)
+        .having(sa.func.count() > 1)
+        .distinct()
+    )
+    renumbered = []
+    for subject_id, teacher_id in bind.execute(duplicated).all():
+        rows = bind.execute(
+            sa.select(syllabi.c.id, syllabi.c.version)
+            .where(syllabi.c.subject_id == subject_id, syllabi.c.teacher_id == teacher_id)
+            .order_by(syllabi.c.version, syllabi.c.id)
+        ).all()
+        for number, row in enumerate(rows, start=1):
+            if row.version != number:
+                bind.execute(syllabi.update().where(syllabi.c.id == row.id).values(version=number))
+                renumbered.append(row.id)
+    record_syllabus_changes(bind, renumbered)
+
+    op.drop_index(INDEX, table_name="syllabi", if_exists=True)
+    op.create_index(INDEX, "syllabi", COLUMNS, unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX, table_name="syllabi")
+    op.create_index(INDEX, "syllabi", COLUMNS, unique=False)
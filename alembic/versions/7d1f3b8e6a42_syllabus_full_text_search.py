@@ -0,0 +1,96 @@
+"""syllabus full text search
+
+Revision ID: 7d1f3b8e6a42
+Revises: 5e7a9c3d8f21
+Create Date: 2026-10-17 13:02:41.209518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1f3b8e6a42'
+down_revision: Union[str, Sequence[str], None] = '5e7a9c3d8f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+syllabi = sa.table(
+    "syllabi",
+    sa.column("id", sa.Integer),
+    sa.column("template_data", sa.JSON),
+)
+
+
+# Frozen copies of app.models.models.SYLLABUS_SEARCH_DDL and
+# app.utils.search.search_document as of this revision
+SYLLABUS_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS syllabus_search USING fts5("
+        "title, body, tokenize = 'porter unicode61')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS syllabus_search ("
+        "syllabus_id INTEGER PRIMARY KEY REFERENCES syllabi (id) ON DELETE CASCADE, "
+        "title TEXT NOT NULL DEFAULT '', "
+        "body TEXT NOT NULL DEFAULT '', "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')"
+        ") STORED)",
+        "CREATE INDEX IF NOT EXISTS ix_syllabus_search_document ON syllabus_search USING GIN (document)",
+    ],
+}
+
+TITLE_FIELDS = ("courseTitle", "courseCode")
+# Snippet highlight delimiters, never indexed
+STRIP_SEL = str.maketrans("", "", "\ue000\ue001")
+
+
+def _flatten(value):
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, dict):
+        return [part for item in value.values() for part in _flatten(item)]
+    if isinstance(value, (list, tuple)):
+        return [part for item in value for part in _flatten(item)]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return [str(value)]
+    return []
+
+
+def search_document(template_data):
+    template_data = template_data or {}
+    title = [part for key in TITLE_FIELDS for part in _flatten(template_data.get(key))]
+    body = [part for key, value in template_data.items() if key not in TITLE_FIELDS for part in _flatten(value)]
+    return {"title": " ".join(title).translate(STRIP_SEL), "body": "\n".join(body).translate(STRIP_SEL)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    statements = SYLLABUS_SEARCH_DDL.get(bind.dialect.name)
+    if not statements:
+        return
+    for statement in statements:
+        op.execute(statement)
+
+    # Index every existing syllabus
+    if bind.dialect.name == "postgresql":
+        insert = sa.text(
+            "INSERT INTO syllabus_search (syllabus_id, title, body) VALUES (:id, :title, :body) "
+            "ON CONFLICT (syllabus_id) DO NOTHING"
+        )
+    else:
+        bind.execute(sa.text("DELETE FROM syllabus_search"))
+        insert = sa.text("INSERT INTO syllabus_search (rowid, title, body) VALUES (:id, :title, :body)")
+    for row in bind.execute(sa.select(syllabi.c.id, syllabi.c.template_data)).all():
+        bind.execute(insert, {"id": row.id, **search_document(row.template_data)})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name in SYLLABUS_SEARCH_DDL:
+        op.execute("DROP TABLE IF EXISTS syllabus_search")
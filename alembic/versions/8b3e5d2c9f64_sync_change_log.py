@@ -0,0 +1,53 @@
+"""sync change log
+
+Revision ID: 8b3e5d2c9f64
+Revises: 2a6c8e4f1d37
+Create Date: 2026-10-17 15:04:37.118620
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e5d2c9f64'
+down_revision: Union[str, Sequence[str], None] = '2a6c8e4f1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("users", "departments", "subjects", "assignments")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    now = datetime.utcnow()
+    for table in TABLES:
+        if "updated_at" in {column["name"] for column in inspector.get_columns(table)}:
+            continue
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(sa.table(table, sa.column("updated_at", sa.DateTime)).update().values(updated_at=now))
+
+    if not inspector.has_table("change_log"):
+        op.create_table(
+            "change_log",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("table_name", sa.String(), nullable=False),
+            sa.Column("row_id", sa.Integer(), nullable=False),
+            sa.Column("op", sa.String(), nullable=False),
+            sa.Column("changed_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("change_log")
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
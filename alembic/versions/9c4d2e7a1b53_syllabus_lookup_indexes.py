@@ -0,0 +1,40 @@
+"""syllabus lookup indexes
+
+Revision ID: 9c4d2e7a1b53
+Revises: 3b8e1f6c2a90
+Create Date: 2026-10-17 10:03:18.204771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d2e7a1b53'
+down_revision: Union[str, Sequence[str], None] = '3b8e1f6c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_departments_head_id", "departments", ["head_id"]),
+    ("ix_assignments_teacher_id_subject_id", "assignments", ["teacher_id", "subject_id"]),
+    ("ix_assignments_subject_id", "assignments", ["subject_id"]),
+    ("ix_syllabus_versions_syllabus_id", "syllabus_versions", ["syllabus_id"]),
+    ("ix_syllabi_subject_id_teacher_id_version", "syllabi", ["subject_id", "teacher_id", sa.text("version DESC")]),
+    ("ix_syllabi_status_subject_id", "syllabi", ["status", "subject_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
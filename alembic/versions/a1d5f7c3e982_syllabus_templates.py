@@ -0,0 +1,41 @@
+"""syllabus templates
+
+Revision ID: a1d5f7c3e982
+Revises: 6c2e8a4f1b93
+Create Date: 2026-10-17 20:14:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d5f7c3e982'
+down_revision: Union[str, Sequence[str], None] = '6c2e8a4f1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table("syllabus_templates"):
+        op.create_table(
+            "syllabus_templates",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("department_id", sa.Integer(), nullable=False),
+            sa.Column("definition", sa.JSON(), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["department_id"], ["departments.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("department_id"),
+        )
+        op.create_index(op.f("ix_syllabus_templates_id"), "syllabus_templates", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_syllabus_templates_id"), table_name="syllabus_templates")
+    op.drop_table("syllabus_templates")
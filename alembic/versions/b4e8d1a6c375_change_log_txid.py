@@ -0,0 +1,36 @@
+"""change log txid
+
+Revision ID: b4e8d1a6c375
+Revises: a1d5f7c3e982
+Create Date: 2026-10-18 09:12:27.604119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8d1a6c375'
+down_revision: Union[str, Sequence[str], None] = 'a1d5f7c3e982'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "txid" not in {column["name"] for column in inspector.get_columns("change_log")}:
+        # Entries written before the column sort first, as they are all final
+        with op.batch_alter_table("change_log") as batch_op:
+            batch_op.add_column(sa.Column("txid", sa.BigInteger(), nullable=False, server_default="0"))
+    if "ix_change_log_txid_id" not in {index["name"] for index in inspector.get_indexes("change_log")}:
+        op.create_index("ix_change_log_txid_id", "change_log", ["txid", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_change_log_txid_id", table_name="change_log")
+    with op.batch_alter_table("change_log") as batch_op:
+        batch_op.drop_column("txid")
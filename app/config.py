@@ -3,8 +3,95 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./syllabus.db")
+    # Defaults to database_url with its async driver (aiosqlite / asyncpg)
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key")
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
 
+    # Connection pool, shared by the sync and async engines
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+
+    # Authenticated principal caching; embedding claims lets most requests
+    # skip the users table entirely. Role and department changes revoke
+    # embedded claims only in the worker process that made them, so leave
+    # embed_principal_claims off unless the API runs as a single worker
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_max_entries: int = 10000
+    embed_principal_claims: bool = False
+
+    # Password hashing; existing hashes are upgraded on login when the cost changes
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
+
+    # Bulk import endpoints
+    bulk_max_rows: int = 10000
+
+    # Rows fetched per server-side cursor batch by the catalog export
+    export_batch_size: int = 1000
+
+    # Login attempt throttling; only failed attempts count, so many users
+    # behind one NAT or proxy can still sign in at once
+    login_throttle_window_seconds: int = 60
+    login_max_failures_per_ip: int = 30
+    login_max_failures_per_email: int = 5
+
+    # Syllabus revision history: full snapshot every N revisions, JSON patches
+    # in between, zlib-compressed when the body is large enough
+    version_snapshot_interval: int = 10
+    version_compress: bool = True
+    version_compress_min_bytes: int = 256
+
+    # Largest template_data a department template may allow, in bytes
+    template_max_bytes: int = 256 * 1024
+
+    # Computed syllabus diffs kept in memory, keyed by version pair
+    diff_cache_max_entries: int = 1024
+
+    # Syllabus status notifications; an empty broker URL keeps pub/sub in
+    # process, a redis:// URL fans events out across workers
+    event_broker_url: str = os.getenv("EVENT_BROKER_URL", "")
+    event_max_pending: int = 100
+    event_heartbeat_seconds: int = 15
+
+    # Request metrics at /metrics (a bearer token is required when set);
+    # requests slower than slow_request_seconds are logged with their
+    # slowest SQL statements, 0 turns the log off
+    metrics_token: str = os.getenv("METRICS_TOKEN", "")
+    slow_request_seconds: float = 1.0
+    slow_request_max_queries: int = 10
+
+    # Rendered PDF cache
+    pdf_cache_dir: str = os.getenv("PDF_CACHE_DIR", "./.pdf_cache")
+    pdf_cache_memory_bytes: int = 64 * 1024 * 1024
+    pdf_cache_disk_bytes: int = 512 * 1024 * 1024
+
+    # PDF rendering pool (0 workers renders on a single local thread)
+    pdf_render_workers: int = 2
+    pdf_render_max_queue: int = 16
+    pdf_render_retry_after_seconds: int = 5
+
+    # Department id -> registered PDF layout name (see app/utils/pdf.py);
+    # unlisted departments use the default layout
+    pdf_department_layouts: dict[int, str] = {}
+
+    def get_async_database_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        url = self.database_url
+        for prefix, async_prefix in (
+            ("sqlite://", "sqlite+aiosqlite://"),
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("postgres://", "postgresql+asyncpg://"),
+        ):
+            if url.startswith(prefix):
+                return async_prefix + url[len(prefix):]
+        return url
+
 settings = Settings()
\ No newline at end of file
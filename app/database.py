@@ -1,9 +1,35 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.metrics import instrument_engine
 
-engine = create_engine(settings.database_url)
+def _engine_options(url: str) -> dict:
+    options = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    # SQLite picks its own pool class, which may not accept sizing arguments
+    if not url.startswith("sqlite"):
+        options.update({
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        })
+    return options
+
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+# Async stack used by the API routes; the sync engine above stays for
+# scripts, migrations and other blocking callers
+async_engine = create_async_engine(
+    settings.get_async_database_url(),
+    **_engine_options(settings.get_async_database_url())
+)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
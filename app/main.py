@@ -1,8 +1,25 @@
-from fastapi import FastAPI
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, users, departments, subjects, syllabi
+from fastapi.responses import Response
+from app.config import settings
+from app.database import async_engine
+from app.routes import auth, users, departments, subjects, syllabi, stats, sync
+from app.utils.events import event_broker
+from app.utils.hashing import hashing_pool
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.utils.render_pool import render_pool
 
-app = FastAPI(title="Syllabus Management API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    render_pool.shutdown()
+    hashing_pool.shutdown()
+    await event_broker.close()
+    await async_engine.dispose()
+
+app = FastAPI(title="Syllabus Management API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -11,14 +28,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Outermost, so CORS preflights are measured too
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(departments.router, prefix="/departments", tags=["Departments"])
 app.include_router(subjects.router, prefix="/subjects", tags=["Subjects"])
 app.include_router(syllabi.router, prefix="/syllabi", tags=["Syllabi"])
+app.include_router(sync.router, prefix="/sync", tags=["Sync"])
+app.include_router(stats.router, prefix="/stats", tags=["Stats"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to Syllabus Management API"}
\ No newline at end of file
+    return {"message": "Welcome to Syllabus Management API"}
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics(request: Request):
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}"
+        if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
\ No newline at end of file
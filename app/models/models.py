@@ -1,23 +1,34 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import relationship
+from collections import Counter
+from sqlalchemy import BigInteger, Column, Integer, String, Text, ForeignKey, DateTime, JSON, Index, LargeBinary, DDL, case, event, exists, func, inspect, select, text
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
 from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_role_id", "role", "id"),
+        Index("ix_users_department_id_id", "department_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String)
     role = Column(String)  # admin, teacher, head
     department_id = Column(Integer, ForeignKey("departments.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     department = relationship("Department", back_populates="users", foreign_keys=[department_id])
 
 class Department(Base):
     __tablename__ = "departments"
+    __table_args__ = (
+        # Every head request resolves its department by head_id
+        Index("ix_departments_head_id", "head_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True)
     head_id = Column(Integer, ForeignKey("users.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     users = relationship("User", back_populates="department", foreign_keys=[User.department_id])
     head = relationship("User", foreign_keys=[head_id])
@@ -25,10 +36,14 @@ class Department(Base):
 
 class Subject(Base):
     __tablename__ = "subjects"
+    __table_args__ = (
+        Index("ix_subjects_department_id_id", "department_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     code = Column(String, unique=True)
     department_id = Column(Integer, ForeignKey("departments.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     department = relationship("Department", back_populates="subjects")
     assignments = relationship("Assignment", back_populates="subject")
@@ -36,15 +51,32 @@ class Subject(Base):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_teacher_id_subject_id", "teacher_id", "subject_id"),
+        Index("ix_assignments_subject_id", "subject_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     teacher_id = Column(Integer, ForeignKey("users.id"))
     subject_id = Column(Integer, ForeignKey("subjects.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     teacher = relationship("User")
     subject = relationship("Subject")
 
 class Syllabus(Base):
     __tablename__ = "syllabi"
+    __table_args__ = (
+        # Keyset pagination: every filter column is paired with the sort key
+        Index("ix_syllabi_status_id", "status", "id"),
+        Index("ix_syllabi_teacher_id_id", "teacher_id", "id"),
+        Index("ix_syllabi_subject_id_id", "subject_id", "id"),
+        Index("ix_syllabi_updated_at_id", "updated_at", "id"),
+        # Latest version per (subject, teacher); unique so concurrent
+        # creates cannot both take the same number
+        Index("ix_syllabi_subject_id_teacher_id_version", "subject_id", "teacher_id", text("version DESC"), unique=True),
+        # Pending review lists joined to subjects by department
+        Index("ix_syllabi_status_subject_id", "status", "subject_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     subject_id = Column(Integer, ForeignKey("subjects.id"))
     teacher_id = Column(Integer, ForeignKey("users.id"))
@@ -57,13 +89,343 @@ class Syllabus(Base):
 
     subject = relationship("Subject", back_populates="syllabi")
     teacher = relationship("User")
-    versions = relationship("SyllabusVersion", back_populates="syllabus")
+    versions = relationship("SyllabusVersion", back_populates="syllabus", cascade="all, delete-orphan", order_by="SyllabusVersion.version")
 
 class SyllabusVersion(Base):
     __tablename__ = "syllabus_versions"
+    __table_args__ = (
+        Index("ix_syllabus_versions_syllabus_id_version", "syllabus_id", "version", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    syllabus_id = Column(Integer, ForeignKey("syllabi.id"))
-    data = Column(JSON)
+    syllabus_id = Column(Integer, ForeignKey("syllabi.id"), index=True)
+    version = Column(Integer)  # revision number within the syllabus, from 1
+    kind = Column(String, default="snapshot")  # snapshot, delta (JSON patch against the previous revision)
+    data = Column(JSON(none_as_null=True), nullable=True)  # uncompressed body
+    payload = Column(LargeBinary, nullable=True)  # zlib-compressed JSON body
     timestamp = Column(DateTime, default=datetime.utcnow)
 
-    syllabus = relationship("Syllabus", back_populates="versions")
\ No newline at end of file
+    syllabus = relationship("Syllabus", back_populates="versions")
+
+class SyllabusTemplate(Base):
+    """A department's syllabus template (app.utils.templates); departments
+    without one use the built-in default."""
+    __tablename__ = "syllabus_templates"
+    id = Column(Integer, primary_key=True, index=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), unique=True, nullable=False)
+    definition = Column(JSON, nullable=False)
+    version = Column(Integer, nullable=False, default=1)  # bumped on every change
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Full-text index over syllabus template_data, maintained by app.utils.search.
+# It is dialect specific (an FTS5 table keyed by rowid on SQLite, a weighted
+# tsvector with a GIN index on Postgres), so it lives outside the ORM and is
+# created alongside the syllabi table.
+SYLLABUS_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS syllabus_search USING fts5("
+        "title, body, tokenize = 'porter unicode61')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS syllabus_search ("
+        "syllabus_id INTEGER PRIMARY KEY REFERENCES syllabi (id) ON DELETE CASCADE, "
+        "title TEXT NOT NULL DEFAULT '', "
+        "body TEXT NOT NULL DEFAULT '', "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')"
+        ") STORED)",
+        "CREATE INDEX IF NOT EXISTS ix_syllabus_search_document ON syllabus_search USING GIN (document)",
+    ],
+}
+
+for _dialect, _statements in SYLLABUS_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Syllabus.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+    event.listen(Syllabus.__table__, "before_drop", DDL("DROP TABLE IF EXISTS syllabus_search").execute_if(dialect=_dialect))
+
+class TableVersion(Base):
+    """Per-table change counter, bumped in the transaction of every ORM write.
+
+    Read endpoints derive their ETags from these counters, so an unchanged
+    list is answered from one small indexed read.
+    """
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class ChangeLog(Base):
+    """One row per created, updated or deleted row of a synced table.
+
+    Written in the transaction of the change. /sync orders entries by
+    (txid, id): on Postgres ``txid`` is the writing transaction's id, so a
+    reader can tell which entries may still be joined by earlier ones; on
+    SQLite, where writers are serialized, it is 0 and ids alone order them.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_txid_id", "txid", "id"),
+    )
+    id = Column(Integer, primary_key=True)
+    txid = Column(BigInteger, nullable=False, default=0)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # upsert, delete
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+class DashboardStat(Base):
+    """Precomputed counter behind /stats, kept current in the transaction of
+    every write so dashboards read O(departments) rows.
+
+    Per department: "syllabi:<status>", "subjects", "subjects:assigned" and
+    "subjects:complete" (assigned and with an approved syllabus). Per
+    teacher: "syllabi:<status>", "assignments" and "assignments:open" (no
+    approved syllabus yet). Per subject: "assigned" and "complete" as 0 or
+    1, so department counters can move by the difference.
+    """
+    __tablename__ = "dashboard_stats"
+    scope = Column(String, primary_key=True)  # department, teacher, subject
+    scope_id = Column(Integer, primary_key=True)
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+# Tables whose changes are recorded for /sync
+SYNCED_TABLES = ("users", "departments", "subjects", "assignments", "syllabi")
+
+_BUMP_TABLE_VERSION = text(
+    "INSERT INTO table_versions (table_name, version) VALUES (:table_name, 1) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1"
+)
+
+def record_changes(connection, changes: list):
+    """Bump table counters and write change_log rows for ``changes``.
+
+    ``changes`` holds (table name, row id, op) tuples with op "upsert" or
+    "delete". ORM flushes call this automatically; Core bulk statements,
+    which bypass the ORM, call it themselves in the same transaction.
+    """
+    if not changes:
+        return
+
+    tables = {table_name for table_name, _, _ in changes} - {TableVersion.__tablename__, ChangeLog.__tablename__}
+    for table_name in sorted(tables):
+        connection.execute(_BUMP_TABLE_VERSION, {"table_name": table_name})
+
+    now = datetime.utcnow()
+    entries = [
+        {"table_name": table_name, "row_id": row_id, "op": op, "changed_at": now}
+        for table_name, row_id, op in changes if table_name in SYNCED_TABLES
+    ]
+    if entries:
+        txid = connection.execute(text("SELECT txid_current()")).scalar() if connection.dialect.name == "postgresql" else 0
+        connection.execute(ChangeLog.__table__.insert(), [{**entry, "txid": txid} for entry in entries])
+
+# Columns of each table that dashboard_stats depends on
+STATS_COLUMNS = {
+    "syllabi": ("subject_id", "teacher_id", "status"),
+    "subjects": ("department_id",),
+    "assignments": ("subject_id", "teacher_id"),
+    "departments": (),
+}
+
+class StatsChanges:
+    """Row changes that move dashboard_stats, gathered for one flush or bulk statement.
+
+    Department counters move by deltas. Teachers and subjects touched by a
+    change are small enough to recount, and a department is recounted only
+    when a subject moves in or out of it.
+    """
+
+    def __init__(self):
+        self.syllabi = Counter()  # (subject_id, status) -> change in count
+        self.subjects = Counter()  # department_id -> change in subject count
+        self.subject_departments = {}  # subject to recheck -> department before the write, if gone
+        self.teachers = set()
+        self.departments = set()
+
+    def add(self, table_name: str, row_id: int, old: dict = None, new: dict = None):
+        """Record one row change; ``old`` is None for inserts and ``new`` for deletes."""
+        if old is not None and old == new:
+            return
+        if table_name == "syllabi":
+            for row, sign in ((old, -1), (new, 1)):
+                if row is not None:
+                    self.syllabi[(row["subject_id"], row["status"])] += sign
+                    self.teachers.add(row["teacher_id"])
+                    if row["status"] == "approved":
+                        self.subject_departments.setdefault(row["subject_id"], None)
+        elif table_name == "assignments":
+            for row in (old, new):
+                if row is not None:
+                    self.subject_departments.setdefault(row["subject_id"], None)
+                    self.teachers.add(row["teacher_id"])
+        elif table_name == "subjects":
+            if old is None:
+                self.subjects[new["department_id"]] += 1
+            elif new is None:
+                self.subjects[old["department_id"]] -= 1
+                self.subject_departments[row_id] = old["department_id"]
+            else:
+                self.departments.update({old["department_id"], new["department_id"]})
+                self.subject_departments.setdefault(row_id, None)
+        elif table_name == "departments" and new is None:
+            self.departments.add(row_id)
+
+    def __bool__(self) -> bool:
+        return bool(self.syllabi or self.subjects or self.subject_departments or self.teachers or self.departments)
+
+_ADD_STAT = text(
+    "INSERT INTO dashboard_stats (scope, scope_id, name, value) VALUES (:scope, :scope_id, :name, :value) "
+    "ON CONFLICT (scope, scope_id, name) DO UPDATE SET value = dashboard_stats.value + excluded.value"
+)
+_SET_STAT = text(
+    "INSERT INTO dashboard_stats (scope, scope_id, name, value) VALUES (:scope, :scope_id, :name, :value) "
+    "ON CONFLICT (scope, scope_id, name) DO UPDATE SET value = excluded.value"
+)
+
+def _subject_states(connection, ids=None, department_ids=None) -> dict:
+    """{subject id: (department id, assigned, complete)} from the base tables."""
+    assigned = exists().where(Assignment.subject_id == Subject.id)
+    approved = exists().where(Syllabus.subject_id == Subject.id, Syllabus.status == "approved")
+    stmt = select(Subject.id, Subject.department_id, assigned, approved)
+    if ids is not None:
+        stmt = stmt.where(Subject.id.in_(ids))
+    if department_ids is not None:
+        stmt = stmt.where(Subject.department_id.in_(department_ids))
+    return {
+        id: (department_id, int(bool(is_assigned)), int(bool(is_assigned and is_approved)))
+        for id, department_id, is_assigned, is_approved in connection.execute(stmt)
+    }
+
+def _teacher_counters(connection, ids=None) -> list:
+    by_status = select(Syllabus.teacher_id, Syllabus.status, func.count()).group_by(Syllabus.teacher_id, Syllabus.status)
+    approved = exists().where(
+        Syllabus.subject_id == Assignment.subject_id,
+        Syllabus.teacher_id == Assignment.teacher_id,
+        Syllabus.status == "approved",
+    )
+    by_assignment = select(Assignment.teacher_id, func.count(), func.count(case((~approved, 1)))).group_by(Assignment.teacher_id)
+    if ids is not None:
+        by_status = by_status.where(Syllabus.teacher_id.in_(ids))
+        by_assignment = by_assignment.where(Assignment.teacher_id.in_(ids))
+    rows = [("teacher", teacher_id, f"syllabi:{status}", count) for teacher_id, status, count in connection.execute(by_status)]
+    for teacher_id, count, open_count in connection.execute(by_assignment):
+        rows += [("teacher", teacher_id, "assignments", count), ("teacher", teacher_id, "assignments:open", open_count)]
+    return rows
+
+def _department_counters(connection, ids=None) -> list:
+    by_status = (
+        select(Subject.department_id, Syllabus.status, func.count())
+        .join(Subject, Subject.id == Syllabus.subject_id)
+        .group_by(Subject.department_id, Syllabus.status)
+    )
+    if ids is not None:
+        by_status = by_status.where(Subject.department_id.in_(ids))
+    rows = [("department", department_id, f"syllabi:{status}", count) for department_id, status, count in connection.execute(by_status)]
+    totals = Counter()
+    for department_id, assigned, complete in _subject_states(connection, department_ids=ids).values():
+        totals[(department_id, "subjects")] += 1
+        totals[(department_id, "subjects:assigned")] += assigned
+        totals[(department_id, "subjects:complete")] += complete
+    rows += [("department", department_id, name, value) for (department_id, name), value in totals.items()]
+    return rows
+
+def _replace_stats(connection, scope: str, ids, rows: list):
+    table = DashboardStat.__table__
+    delete = table.delete().where(table.c.scope == scope)
+    if ids is not None:
+        delete = delete.where(table.c.scope_id.in_(ids))
+    connection.execute(delete)
+    _write_stats(connection, _SET_STAT, rows)
+
+def _write_stats(connection, statement, rows: list):
+    # Sorted so concurrent writers take row locks in the same order
+    rows = sorted(row for row in rows if row[1] is not None)
+    if rows:
+        connection.execute(statement, [{"scope": scope, "scope_id": id, "name": name, "value": value} for scope, id, name, value in rows])
+
+def update_dashboard_stats(connection, changes: StatsChanges):
+    """Apply ``changes`` to dashboard_stats in the caller's transaction.
+
+    Runs after the write itself has been flushed, so recounts see the new
+    rows. Like record_changes, Core bulk statements call it themselves.
+    """
+    if not changes:
+        return
+    table = DashboardStat.__table__
+    subject_ids = set(changes.subject_departments) | {subject_id for subject_id, _ in changes.syllabi}
+    states = _subject_states(connection, subject_ids) if subject_ids else {}
+    departments = {**changes.subject_departments, **{id: state[0] for id, state in states.items()}}
+
+    deltas = Counter()
+    for (subject_id, status), count in changes.syllabi.items():
+        deltas[("department", departments.get(subject_id), f"syllabi:{status}")] += count
+    for department_id, count in changes.subjects.items():
+        deltas[("department", department_id, "subjects")] += count
+
+    # Subjects whose assigned/complete state may have flipped
+    rechecked = set(changes.subject_departments)
+    if rechecked:
+        stored = {
+            (id, name): value for id, name, value in connection.execute(
+                select(table.c.scope_id, table.c.name, table.c.value).where(table.c.scope == "subject", table.c.scope_id.in_(rechecked))
+            )
+        }
+        subject_rows = []
+        for subject_id in rechecked:
+            department_id, assigned, complete = states.get(subject_id, (departments.get(subject_id), 0, 0))
+            for name, value in (("assigned", assigned), ("complete", complete)):
+                deltas[("department", department_id, f"subjects:{name}")] += value - stored.get((subject_id, name), 0)
+                if subject_id in states:
+                    subject_rows.append(("subject", subject_id, name, value))
+        _replace_stats(connection, "subject", rechecked, subject_rows)
+
+    if changes.teachers:
+        _replace_stats(connection, "teacher", changes.teachers, _teacher_counters(connection, changes.teachers))
+    if changes.departments:
+        _replace_stats(connection, "department", changes.departments, _department_counters(connection, changes.departments))
+
+    _write_stats(connection, _ADD_STAT, [
+        (scope, id, name, value) for (scope, id, name), value in deltas.items()
+        if value and id not in changes.departments
+    ])
+
+def rebuild_dashboard_stats(connection):
+    """Recount every dashboard counter from the base tables."""
+    connection.execute(DashboardStat.__table__.delete())
+    _write_stats(connection, _SET_STAT, _department_counters(connection) + _teacher_counters(connection) + [
+        ("subject", id, name, value)
+        for id, (_, assigned, complete) in _subject_states(connection).items()
+        for name, value in (("assigned", assigned), ("complete", complete))
+    ])
+
+def _stats_values(obj, columns: tuple, previous: bool) -> dict:
+    if not previous:
+        return {column: getattr(obj, column) for column in columns}
+    attrs = inspect(obj).attrs
+    values = {}
+    for column in columns:
+        history = attrs[column].history
+        values[column] = history.deleted[0] if history.deleted else getattr(obj, column)
+    return values
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_changes(session, flush_context):
+    changes = {}
+    for obj in session.new:
+        changes[obj] = "upsert"
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            changes[obj] = "upsert"
+    for obj in session.deleted:
+        changes[obj] = "delete"
+    record_changes(session.connection(), [
+        (obj.__table__.name, obj.id, op) for obj, op in changes.items() if hasattr(obj, "__table__") and hasattr(obj, "id")
+    ])
+
+    stats = StatsChanges()
+    for obj, op in changes.items():
+        columns = STATS_COLUMNS.get(getattr(obj, "__tablename__", None))
+        if columns is not None:
+            old = None if obj in session.new else _stats_values(obj, columns, previous=True)
+            new = None if op == "delete" else _stats_values(obj, columns, previous=False)
+            stats.add(obj.__tablename__, obj.id, old, new)
+    update_dashboard_stats(session.connection(), stats)
@@ -1,20 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from app.database import SessionLocal
 from app.models.models import User
-from app.utils.auth import authenticate_user, create_access_token, get_db
+from app.config import settings
+from app.utils.auth import authenticate_user, create_access_token, get_async_db, principal_claims
+from app.utils.hashing import HashingPoolSaturated
+from app.utils.throttle import SlidingWindowThrottle
 
 router = APIRouter()
 
+ip_throttle = SlidingWindowThrottle(settings.login_max_failures_per_ip, settings.login_throttle_window_seconds)
+email_throttle = SlidingWindowThrottle(settings.login_max_failures_per_email, settings.login_throttle_window_seconds)
+
 class LoginRequest(BaseModel):
     email: str
     password: str
 
 @router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = authenticate_user(db, request.email, request.password)
+async def login(request: LoginRequest, http_request: Request, db: AsyncSession = Depends(get_async_db)):
+    client_ip = http_request.client.host if http_request.client else "unknown"
+    email = request.email.strip().lower()
+    retry_after = ip_throttle.retry_after(client_ip) or email_throttle.retry_after(email)
+    if retry_after:
+        raise HTTPException(status_code=429, detail="Too many login attempts", headers={"Retry-After": str(retry_after)})
+
+    try:
+        user = await authenticate_user(db, request.email, request.password)
+    except HashingPoolSaturated:
+        raise HTTPException(status_code=503, detail="Login is busy, please retry shortly", headers={"Retry-After": "1"})
     if not user:
+        ip_throttle.hit(client_ip)
+        email_throttle.hit(email)
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    access_token = create_access_token(data={"sub": user.email, "role": user.role})
+    email_throttle.reset(email)
+    access_token = create_access_token(data=principal_claims(user))
     return {"access_token": access_token, "token_type": "bearer", "user": {"id": user.id, "email": user.email, "role": user.role}}
\ No newline at end of file
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.models.models import Department, User
-from app.utils.auth import get_current_user, get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.models.models import Department, User, Subject, Syllabus, SyllabusTemplate
+from app.utils.auth import Principal, get_current_user, get_async_db
+from app.utils.etag import not_modified
+from app.utils.pagination import keyset_page
+from app.utils.pdf import _layouts
+from app.utils.pdf_export import export_entry, stream_pdf_zip
+from app.utils.template_registry import template_registry
+from app.utils.templates import TemplateDefinition, compile_template, default_template
 from pydantic import BaseModel
 from typing import Optional
 
@@ -14,50 +23,57 @@ class DepartmentResponse(BaseModel):
     name: str
     head_id: Optional[int] = None
 
+class TemplateResponse(BaseModel):
+    department_id: int
+    version: int
+    is_default: bool
+    definition: dict
+
 router = APIRouter()
 
 @router.post("/", response_model=DepartmentResponse)
-def create_department(dept: DepartmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_department(dept: DepartmentCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     db_dept = Department(name=dept.name, head_id=dept.head_id)
     db.add(db_dept)
-    db.commit()
-    db.refresh(db_dept)
+    await db.commit()
+    await db.refresh(db_dept)
     return db_dept
 
 @router.get("/", response_model=list[DepartmentResponse])
-def read_departments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    depts = db.query(Department).offset(skip).limit(limit).all()
-    return depts
+async def read_departments(request: Request, response: Response, cursor: Optional[str] = None, limit: int = 100, skip: int = 0, include_total: bool = False, db: AsyncSession = Depends(get_async_db)):
+    cached = await not_modified(request, response, db, ["departments"], cache_control="public, no-cache")
+    if cached is not None:
+        return cached
+    return await keyset_page(db, select(Department), response, [Department.id], "id", cursor, limit, include_total=include_total, skip=skip)
 
 @router.put("/{dept_id}", response_model=DepartmentResponse)
-def update_department(dept_id: int, dept: DepartmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_department(dept_id: int, dept: DepartmentCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    db_dept = db.query(Department).filter(Department.id == dept_id).first()
+    db_dept = await db.get(Department, dept_id)
     if not db_dept:
         raise HTTPException(status_code=404, detail="Department not found")
     db_dept.name = dept.name
     db_dept.head_id = dept.head_id
-    db.commit()
-    db.refresh(db_dept)
+    await db.commit()
+    await db.refresh(db_dept)
     return db_dept
 
 @router.delete("/{dept_id}")
-def delete_department(dept_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_department(dept_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    db_dept = db.query(Department).filter(Department.id == dept_id).first()
+    db_dept = await db.get(Department, dept_id)
     if not db_dept:
         raise HTTPException(status_code=404, detail="Department not found")
 
     # Check for dependencies that would prevent deletion
-    from app.models.models import User, Subject
 
     # Check if department has users
-    users_count = db.query(User).filter(User.department_id == dept_id).count()
+    users_count = await db.scalar(select(func.count()).select_from(User).where(User.department_id == dept_id))
     if users_count > 0:
         raise HTTPException(
             status_code=400,
@@ -65,7 +81,7 @@ def delete_department(dept_id: int, db: Session = Depends(get_db), current_user:
         )
 
     # Check if department has subjects
-    subjects_count = db.query(Subject).filter(Subject.department_id == dept_id).count()
+    subjects_count = await db.scalar(select(func.count()).select_from(Subject).where(Subject.department_id == dept_id))
     if subjects_count > 0:
         raise HTTPException(
             status_code=400,
@@ -73,9 +89,84 @@ def delete_department(dept_id: int, db: Session = Depends(get_db), current_user:
         )
 
     try:
-        db.delete(db_dept)
-        db.commit()
+        template = await db.scalar(select(SyllabusTemplate).where(SyllabusTemplate.department_id == dept_id))
+        if template:
+            await db.delete(template)
+        await db.delete(db_dept)
+        await db.commit()
         return {"message": "Department deleted successfully"}
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to delete department: {str(e)}")
\ No newline at end of file
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to delete department: {str(e)}")
+
+@router.get("/{dept_id}/syllabi/export")
+async def export_department_syllabi(dept_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    db_dept = await db.get(Department, dept_id)
+    if not db_dept:
+        raise HTTPException(status_code=404, detail="Department not found")
+    if current_user.role != "admin" and not (current_user.role == "head" and db_dept.head_id == current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    syllabi = (await db.execute(
+        select(Syllabus).join(Syllabus.subject).options(joinedload(Syllabus.subject)).where(
+            Syllabus.status == "approved",
+            Subject.department_id == dept_id
+        ).order_by(Syllabus.id)
+    )).scalars().all()
+    templates = await template_registry.for_departments(db, {dept_id})
+    entries = [export_entry(syllabus, templates) for syllabus in syllabi]
+
+    return StreamingResponse(
+        stream_pdf_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=department-{dept_id}-syllabi.zip"}
+    )
+
+async def get_template_department(db: AsyncSession, dept_id: int, current_user: Principal, write: bool = False) -> Department:
+    db_dept = await db.get(Department, dept_id)
+    if not db_dept:
+        raise HTTPException(status_code=404, detail="Department not found")
+    if write and current_user.role != "admin" and not (current_user.role == "head" and db_dept.head_id == current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return db_dept
+
+@router.get("/{dept_id}/template", response_model=TemplateResponse)
+async def read_department_template(dept_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    await get_template_department(db, dept_id, current_user)
+    row = await db.scalar(select(SyllabusTemplate).where(SyllabusTemplate.department_id == dept_id))
+    if not row:
+        return TemplateResponse(department_id=dept_id, version=0, is_default=True, definition=default_template.definition)
+    template = await template_registry.get(db, row.id, row.version)
+    return TemplateResponse(department_id=dept_id, version=row.version, is_default=False, definition=template.definition)
+
+@router.put("/{dept_id}/template", response_model=TemplateResponse)
+async def update_department_template(dept_id: int, definition: TemplateDefinition, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    await get_template_department(db, dept_id, current_user, write=True)
+    if definition.layout is not None and definition.layout not in _layouts:
+        raise HTTPException(status_code=422, detail=f"Unknown layout: {definition.layout}")
+    # Compiling catches definitions Pydantic cannot build a model from
+    try:
+        compiled = compile_template(definition)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid template: {e}")
+
+    row = await db.scalar(select(SyllabusTemplate).where(SyllabusTemplate.department_id == dept_id))
+    if row:
+        row.definition = compiled.definition
+        row.version = SyllabusTemplate.version + 1
+    else:
+        row = SyllabusTemplate(department_id=dept_id, definition=compiled.definition)
+        db.add(row)
+    await db.commit()
+    await db.refresh(row)
+    return TemplateResponse(department_id=dept_id, version=row.version, is_default=False, definition=row.definition)
+
+@router.delete("/{dept_id}/template")
+async def delete_department_template(dept_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    await get_template_department(db, dept_id, current_user, write=True)
+    row = await db.scalar(select(SyllabusTemplate).where(SyllabusTemplate.department_id == dept_id))
+    if not row:
+        raise HTTPException(status_code=404, detail="Department uses the default template")
+    await db.delete(row)
+    await db.commit()
+    return {"message": "Department template reset to the default"}
@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import DashboardStat, Department, User
+from app.utils.auth import Principal, get_current_user, get_async_db
+from app.utils.etag import not_modified
+from pydantic import BaseModel
+from typing import Optional
+
+# Dashboard summaries read from dashboard_stats, which every write keeps
+# current, so a summary costs one row per department or teacher counter
+# however many syllabi there are.
+
+STATS_TABLES = ["syllabi", "subjects", "assignments", "departments"]
+
+class DepartmentStats(BaseModel):
+    department_id: int
+    name: Optional[str] = None
+    syllabi: dict[str, int] = {}  # by status
+    subjects: int = 0
+    assigned_subjects: int = 0
+    # Assigned subjects with an approved syllabus, and their share
+    complete_subjects: int = 0
+    completion_rate: Optional[float] = None
+
+class StatsSummary(DepartmentStats):
+    department_id: Optional[int] = None
+    departments: list[DepartmentStats] = []
+
+class TeacherStats(BaseModel):
+    teacher_id: int
+    email: str
+    department_id: Optional[int] = None
+    syllabi: dict[str, int] = {}  # by status
+    assignments: int = 0
+    # Assigned subjects without an approved syllabus from this teacher
+    open_assignments: int = 0
+
+router = APIRouter()
+
+async def visible_departments(db: AsyncSession, current_user: Principal) -> Optional[list[int]]:
+    """Department ids the caller may see statistics for; None means all."""
+    if current_user.role == "admin":
+        return None
+    if current_user.role == "head":
+        return list((await db.execute(select(Department.id).where(Department.head_id == current_user.id))).scalars())
+    raise HTTPException(status_code=403, detail="Not authorized")
+
+def apply_counter(stats: BaseModel, name: str, value: int):
+    if name.startswith("syllabi:"):
+        stats.syllabi[name.split(":", 1)[1]] = value
+    else:
+        field = {
+            "subjects": "subjects",
+            "subjects:assigned": "assigned_subjects",
+            "subjects:complete": "complete_subjects",
+            "assignments": "assignments",
+            "assignments:open": "open_assignments",
+        }.get(name)
+        if field is not None:
+            setattr(stats, field, value)
+
+def completion_rate(complete: int, assigned: int) -> Optional[float]:
+    return round(complete / assigned, 4) if assigned else None
+
+@router.get("/", response_model=StatsSummary)
+async def read_stats(request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    """Syllabi by status and subject completion per department, with totals."""
+    department_ids = await visible_departments(db, current_user)
+    cached = await not_modified(request, response, db, STATS_TABLES, current_user)
+    if cached is not None:
+        return cached
+
+    departments_stmt = select(Department.id, Department.name).order_by(Department.id)
+    counters_stmt = select(DashboardStat.scope_id, DashboardStat.name, DashboardStat.value).where(DashboardStat.scope == "department")
+    if department_ids is not None:
+        departments_stmt = departments_stmt.where(Department.id.in_(department_ids))
+        counters_stmt = counters_stmt.where(DashboardStat.scope_id.in_(department_ids))
+    departments = {id: DepartmentStats(department_id=id, name=name) for id, name in (await db.execute(departments_stmt)).all()}
+    for department_id, name, value in (await db.execute(counters_stmt)).all():
+        if department_id in departments:
+            apply_counter(departments[department_id], name, value)
+
+    summary = StatsSummary(departments=list(departments.values()))
+    for stats in summary.departments:
+        stats.completion_rate = completion_rate(stats.complete_subjects, stats.assigned_subjects)
+        for status, count in stats.syllabi.items():
+            summary.syllabi[status] = summary.syllabi.get(status, 0) + count
+        summary.subjects += stats.subjects
+        summary.assigned_subjects += stats.assigned_subjects
+        summary.complete_subjects += stats.complete_subjects
+    summary.completion_rate = completion_rate(summary.complete_subjects, summary.assigned_subjects)
+    return summary
+
+@router.get("/teachers", response_model=list[TeacherStats])
+async def read_teacher_stats(
+    request: Request,
+    response: Response,
+    department_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Per-teacher backlog; teachers see only their own row."""
+    teachers_stmt = select(User.id, User.email, User.department_id).where(User.role == "teacher").order_by(User.id)
+    if current_user.role == "teacher":
+        teachers_stmt = teachers_stmt.where(User.id == current_user.id)
+    else:
+        department_ids = await visible_departments(db, current_user)
+        if department_ids is not None:
+            if department_id is not None and department_id not in department_ids:
+                raise HTTPException(status_code=403, detail="Not authorized")
+            teachers_stmt = teachers_stmt.where(User.department_id.in_(department_ids))
+        if department_id is not None:
+            teachers_stmt = teachers_stmt.where(User.department_id == department_id)
+    cached = await not_modified(request, response, db, STATS_TABLES + ["users"], current_user)
+    if cached is not None:
+        return cached
+
+    teachers = {
+        id: TeacherStats(teacher_id=id, email=email, department_id=dept_id)
+        for id, email, dept_id in (await db.execute(teachers_stmt)).all()
+    }
+    if teachers:
+        counters = await db.execute(
+            select(DashboardStat.scope_id, DashboardStat.name, DashboardStat.value)
+            .where(DashboardStat.scope == "teacher", DashboardStat.scope_id.in_(teachers_stmt.with_only_columns(User.id).order_by(None)))
+        )
+        for teacher_id, name, value in counters.all():
+            apply_counter(teachers[teacher_id], name, value)
+    return list(teachers.values())
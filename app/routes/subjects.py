@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.models.models import Subject, User, Assignment
-from app.utils.auth import get_current_user, get_db
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import insert, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Subject, Assignment, Department, Syllabus, SyllabusTemplate, User, STATS_COLUMNS, StatsChanges, record_changes, update_dashboard_stats
+from app.utils.auth import Principal, get_current_user, get_async_db
+from app.utils.bulk import BulkBatch, BulkResult, check_unique, read_rows
+from app.utils.etag import not_modified
+from app.utils.pagination import keyset_page
+from app.utils.template_registry import template_registry
+from pydantic import BaseModel, model_validator
+from typing import Optional
 
 class SubjectCreate(BaseModel):
     name: str
@@ -17,49 +24,111 @@ class SubjectResponse(BaseModel):
 
 router = APIRouter()
 
+async def bulk_insert(db: AsyncSession, model, batch: BulkBatch, values: list, label: str) -> dict:
+    """Insert the valid rows of ``batch`` in one statement and transaction."""
+    rows = list(batch.valid)
+    try:
+        ids = (await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), values)).scalars().all()
+        table_name = model.__tablename__
+        stats = StatsChanges()
+        for id, row in zip(ids, values):
+            stats.add(table_name, id, None, {column: row[column] for column in STATS_COLUMNS[table_name]})
+
+        def record(session):
+            record_changes(session.connection(), [(table_name, id, "upsert") for id in ids])
+            update_dashboard_stats(session.connection(), stats)
+
+        await db.run_sync(record)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"A {label} in the batch was created concurrently, please retry")
+    for row, id in zip(rows, ids):
+        batch.created(row, id)
+    return batch.report()
+
+async def existing_ids(db: AsyncSession, column, values: set) -> set:
+    if not values:
+        return set()
+    return set((await db.execute(select(column).where(column.in_(values)))).scalars())
+
 @router.post("/", response_model=SubjectResponse)
-def create_subject(subject: SubjectCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_subject(subject: SubjectCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     db_subject = Subject(name=subject.name, code=subject.code, department_id=subject.department_id)
     db.add(db_subject)
-    db.commit()
-    db.refresh(db_subject)
+    await db.commit()
+    await db.refresh(db_subject)
     return db_subject
 
+@router.post("/bulk", response_model=BulkResult, response_model_exclude_none=True)
+async def bulk_create_subjects(request: Request, response: Response, atomic: bool = True, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    """Create subjects from a JSON array or CSV body; see POST /users/bulk."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    batch = BulkBatch(SubjectCreate, await read_rows(request))
+
+    codes = await existing_ids(db, Subject.code, {subject.code for subject in batch.valid.values()})
+    check_unique(batch, lambda row, subject: subject.code, codes, "Subject code")
+    departments = await existing_ids(db, Department.id, {subject.department_id for subject in batch.valid.values()})
+    for row, subject in list(batch.valid.items()):
+        if subject.department_id not in departments:
+            batch.fail(row, "Department not found")
+
+    if not batch.valid or (atomic and batch.failed):
+        if batch.failed:
+            response.status_code = 422
+        return batch.report()
+    values = [subject.model_dump() for subject in batch.valid.values()]
+    return await bulk_insert(db, Subject, batch, values, "subject")
+
 @router.get("/", response_model=list[SubjectResponse])
-def read_subjects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    subjects = db.query(Subject).offset(skip).limit(limit).all()
-    return subjects
+async def read_subjects(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+    department_id: Optional[int] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(request, response, db, ["subjects"], cache_control="public, no-cache")
+    if cached is not None:
+        return cached
+    stmt = select(Subject)
+    if department_id is not None:
+        stmt = stmt.where(Subject.department_id == department_id)
+    return await keyset_page(db, stmt, response, [Subject.id], "id", cursor, limit, include_total=include_total, skip=skip)
 
 @router.put("/{subject_id}", response_model=SubjectResponse)
-def update_subject(subject_id: int, subject: SubjectCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_subject(subject_id: int, subject: SubjectCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    db_subject = db.query(Subject).filter(Subject.id == subject_id).first()
+    db_subject = await db.get(Subject, subject_id)
     if not db_subject:
         raise HTTPException(status_code=404, detail="Subject not found")
     db_subject.name = subject.name
     db_subject.code = subject.code
     db_subject.department_id = subject.department_id
-    db.commit()
-    db.refresh(db_subject)
+    await db.commit()
+    await db.refresh(db_subject)
     return db_subject
 
 @router.delete("/{subject_id}")
-def delete_subject(subject_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_subject(subject_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    db_subject = db.query(Subject).filter(Subject.id == subject_id).first()
+    db_subject = await db.get(Subject, subject_id)
     if not db_subject:
         raise HTTPException(status_code=404, detail="Subject not found")
 
     # Check for dependencies that would prevent deletion
-    from app.models.models import Assignment, Syllabus
 
     # Check if subject has assignments
-    assignments_count = db.query(Assignment).filter(Assignment.subject_id == subject_id).count()
+    assignments_count = await db.scalar(select(func.count()).select_from(Assignment).where(Assignment.subject_id == subject_id))
     if assignments_count > 0:
         raise HTTPException(
             status_code=400,
@@ -67,7 +136,7 @@ def delete_subject(subject_id: int, db: Session = Depends(get_db), current_user:
         )
 
     # Check if subject has syllabi
-    syllabi_count = db.query(Syllabus).filter(Syllabus.subject_id == subject_id).count()
+    syllabi_count = await db.scalar(select(func.count()).select_from(Syllabus).where(Syllabus.subject_id == subject_id))
     if syllabi_count > 0:
         raise HTTPException(
             status_code=400,
@@ -75,28 +144,123 @@ def delete_subject(subject_id: int, db: Session = Depends(get_db), current_user:
         )
 
     try:
-        db.delete(db_subject)
-        db.commit()
+        await db.delete(db_subject)
+        await db.commit()
         return {"message": "Subject deleted successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete subject: {str(e)}")
 
 @router.get("/my", response_model=list[SubjectResponse])
-def read_my_subjects(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    subjects = db.query(Subject).join(Assignment).filter(Assignment.teacher_id == current_user.id).all()
+async def read_my_subjects(request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    cached = await not_modified(request, response, db, ["subjects", "assignments"], current_user)
+    if cached is not None:
+        return cached
+    subjects = (await db.execute(
+        select(Subject).join(Assignment).where(Assignment.teacher_id == current_user.id)
+    )).scalars().all()
     return subjects
 
+class SubjectTemplateResponse(BaseModel):
+    subject_id: int
+    department_id: int
+    version: int
+    is_default: bool
+    definition: dict
+
+@router.get("/{subject_id}/template", response_model=SubjectTemplateResponse)
+async def read_subject_template(subject_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    """The template a syllabus for this subject is validated against, for forms."""
+    cached = await not_modified(request, response, db, ["subjects", "syllabus_templates"])
+    if cached is not None:
+        return cached
+    row = (await db.execute(
+        select(Subject.department_id, SyllabusTemplate.id, SyllabusTemplate.version)
+        .outerjoin(SyllabusTemplate, SyllabusTemplate.department_id == Subject.department_id)
+        .where(Subject.id == subject_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    template = await template_registry.get(db, row.id, row.version)
+    return SubjectTemplateResponse(
+        subject_id=subject_id,
+        department_id=row.department_id,
+        version=row.version or 0,
+        is_default=template.key is None,
+        definition=template.definition,
+    )
+
 class AssignmentCreate(BaseModel):
     teacher_id: int
     subject_id: int
 
+class AssignmentImport(BaseModel):
+    # Teachers and subjects by id or, for imports, by email and code
+    teacher_id: Optional[int] = None
+    teacher_email: Optional[str] = None
+    subject_id: Optional[int] = None
+    subject_code: Optional[str] = None
+
+    @model_validator(mode="after")
+    def one_reference_each(self):
+        if (self.teacher_id is None) == (self.teacher_email is None):
+            raise ValueError("give exactly one of teacher_id or teacher_email")
+        if (self.subject_id is None) == (self.subject_code is None):
+            raise ValueError("give exactly one of subject_id or subject_code")
+        return self
+
+@router.post("/assign/bulk", response_model=BulkResult, response_model_exclude_none=True)
+async def bulk_assign_subjects(request: Request, response: Response, atomic: bool = True, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    """Create assignments from a JSON array or CSV body; see POST /users/bulk."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    batch = BulkBatch(AssignmentImport, await read_rows(request))
+    items = batch.valid.values()
+
+    # Resolve every reference with one query per kind
+    emails = {item.teacher_email for item in items if item.teacher_email is not None}
+    teacher_ids = {item.teacher_id for item in items if item.teacher_id is not None}
+    codes = {item.subject_code for item in items if item.subject_code is not None}
+    subject_ids = {item.subject_id for item in items if item.subject_id is not None}
+    teachers_by_email = dict((await db.execute(select(User.email, User.id).where(User.email.in_(emails)))).all()) if emails else {}
+    subjects_by_code = dict((await db.execute(select(Subject.code, Subject.id).where(Subject.code.in_(codes)))).all()) if codes else {}
+    known_teachers = await existing_ids(db, User.id, teacher_ids)
+    known_subjects = await existing_ids(db, Subject.id, subject_ids)
+
+    pairs = {}
+    for row, item in list(batch.valid.items()):
+        teacher_id = item.teacher_id if item.teacher_id is not None else teachers_by_email.get(item.teacher_email)
+        subject_id = item.subject_id if item.subject_id is not None else subjects_by_code.get(item.subject_code)
+        if teacher_id is None or (item.teacher_id is not None and teacher_id not in known_teachers):
+            batch.fail(row, "Teacher not found")
+        elif subject_id is None or (item.subject_id is not None and subject_id not in known_subjects):
+            batch.fail(row, "Subject not found")
+        else:
+            pairs[row] = (teacher_id, subject_id)
+
+    taken = set()
+    if pairs:
+        taken = set((await db.execute(
+            select(Assignment.teacher_id, Assignment.subject_id).where(
+                Assignment.teacher_id.in_({teacher_id for teacher_id, _ in pairs.values()}),
+                Assignment.subject_id.in_({subject_id for _, subject_id in pairs.values()}),
+            )
+        )).tuples())
+    check_unique(batch, lambda row, item: pairs[row], taken, "Assignment")
+
+    if not batch.valid or (atomic and batch.failed):
+        if batch.failed:
+            response.status_code = 422
+        return batch.report()
+    values = [{"teacher_id": pairs[row][0], "subject_id": pairs[row][1]} for row in batch.valid]
+    return await bulk_insert(db, Assignment, batch, values, "assignment")
+
 @router.post("/assign", response_model=AssignmentCreate)
-def assign_subject(assignment: AssignmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def assign_subject(assignment: AssignmentCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     db_assignment = Assignment(teacher_id=assignment.teacher_id, subject_id=assignment.subject_id)
     db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
-    return assignment
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_assignment)
+    return assignment
@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from app.models.models import Syllabus, User
-from app.utils.auth import get_current_user, get_db
-from pydantic import BaseModel
-from typing import Optional
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
-from io import BytesIO
 import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, contains_eager, joinedload
+from app.models.models import Syllabus, SyllabusVersion, Subject, Department, User
+from app.utils.access import get_accessible_syllabus, get_accessible_syllabus_template
+from app.utils.catalog_export import FORMATS, check_format, stream_catalog
+from app.utils.diff import diff_cache, diff_template_data
+from app.utils.etag import etag_matches, not_modified
+from app.utils.metrics import pdf_cache_lookups, pdf_render_duration
+from app.utils.events import ALL, department_channel, event_broker, publish, user_channel
+from app.utils.auth import Principal, get_current_user, get_stream_user, get_async_db
+from app.database import AsyncSessionLocal
+from pydantic import BaseModel
+from typing import Any, Optional
+from datetime import datetime
+from app.config import settings
+from app.utils.pdf import layout_for_department
+from app.utils.pdf_cache import pdf_cache
+from app.utils.pagination import keyset_page
+from app.utils.pdf_export import export_entry, stream_pdf_zip
+from app.utils.render_pool import render_pool, RenderPoolSaturated
+from app.utils.search import highlight, index_syllabus, search_hits, unindex_syllabus
+from app.utils.serialization import json_response
+from app.utils.template_registry import template_registry
+from app.utils.templates import CompiledTemplate
+from app.utils.versioning import record_revision, reconstruct
 
 class SyllabusCreate(BaseModel):
     subject_id: int
@@ -33,261 +51,637 @@ class SyllabusResponse(BaseModel):
     status: str
     version: int
 
+class SyllabusReviewItem(SyllabusResponse):
+    subject_name: Optional[str] = None
+    subject_code: Optional[str] = None
+    teacher_email: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class SyllabusReviewPage(BaseModel):
+    items: list[SyllabusReviewItem]
+    counts: Optional[dict[str, int]] = None
+
+class SyllabusSearchHit(BaseModel):
+    id: int
+    subject_id: int
+    teacher_id: int
+    status: str
+    version: int
+    course_title: Optional[str] = None
+    course_code: Optional[str] = None
+    rank: float
+    snippet: Optional[str] = None
+
+class SubjectSummary(BaseModel):
+    id: int
+    name: str
+    code: str
+    department_id: int
+
+class TeacherSummary(BaseModel):
+    id: int
+    email: str
+    department_id: Optional[int] = None
+
+class SyllabusExpandedResponse(SyllabusResponse):
+    subject: Optional[SubjectSummary] = None
+    teacher: Optional[TeacherSummary] = None
+
+# Syllabus columns a list may return; ``fields=`` picks a subset so list
+# views can leave out template_data
+LIST_FIELDS = {
+    column.key: column
+    for column in (Syllabus.id, Syllabus.subject_id, Syllabus.teacher_id, Syllabus.template_data, Syllabus.status, Syllabus.version)
+}
+
+_subject = aliased(Subject)
+_teacher = aliased(User)
+# Expansion -> (related table, foreign key, columns returned)
+EXPANDABLE = {
+    "subject": (_subject, Syllabus.subject_id, (_subject.id, _subject.name, _subject.code, _subject.department_id)),
+    "teacher": (_teacher, Syllabus.teacher_id, (_teacher.id, _teacher.email, _teacher.department_id)),
+}
+
+# Tables a syllabus list response is built from, expansions included
+SYLLABUS_LIST_TABLES = ["syllabi", "subjects", "departments", "users"]
+
+def parse_expand(expand: Optional[str]) -> list[str]:
+    fields = [field.strip() for field in (expand or "").split(",") if field.strip()]
+    unknown = [field for field in fields if field not in EXPANDABLE]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot expand: {', '.join(unknown)}")
+    return fields
+
+def parse_fields(fields: Optional[str]) -> list[str]:
+    if fields is None:
+        return list(LIST_FIELDS)
+    names = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [name for name in names if name not in LIST_FIELDS]
+    if unknown or not names:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested")
+    return names
+
+def list_query(fields: list[str], expand: list[str], sort_columns: list = ()):
+    """Column-only select for a syllabus list and a function turning its
+    rows into response items.
+
+    Rows come back as tuples, so no ORM objects are built. Expansions are
+    outer joined into the same statement, and ``sort_columns`` missing
+    from ``fields`` are selected under their own keys for keyset cursors.
+    """
+    columns = [LIST_FIELDS[field] for field in fields]
+    columns += [column for column in sort_columns if column.key not in fields]
+    stmt = select(*columns)
+    expansions = []  # (name, first column in the row, keys)
+    offset = len(columns)
+    for name in expand:
+        table, foreign_key, related = EXPANDABLE[name]
+        stmt = stmt.outerjoin(table, table.id == foreign_key).add_columns(*(column.label(f"{name}__{column.key}") for column in related))
+        keys = [column.key for column in related]
+        expansions.append((name, offset, keys))
+        offset += len(keys)
+    has_template_data = "template_data" in fields
+
+    def to_item(row) -> dict:
+        item = dict(zip(fields, row))
+        if has_template_data and item["template_data"] is None:
+            item["template_data"] = {}
+        for name, start, keys in expansions:
+            item[name] = dict(zip(keys, row[start:start + len(keys)])) if row[start] is not None else None
+        return item
+
+    return stmt, to_item
+
+def review_item(syllabus: Syllabus) -> dict:
+    return {
+        "id": syllabus.id,
+        "subject_id": syllabus.subject_id,
+        "teacher_id": syllabus.teacher_id,
+        "template_data": syllabus.template_data or {},
+        "status": syllabus.status,
+        "version": syllabus.version,
+        "subject_name": syllabus.subject.name if syllabus.subject else None,
+        "subject_code": syllabus.subject.code if syllabus.subject else None,
+        "teacher_email": syllabus.teacher.email if syllabus.teacher else None,
+        "updated_at": syllabus.updated_at,
+    }
+
+class SyllabusRevision(BaseModel):
+    version: int
+    kind: str
+    timestamp: Optional[datetime] = None
+
+class SyllabusRevisionContent(SyllabusRevision):
+    template_data: dict
+
+class SyllabusDiffField(BaseModel):
+    field: str
+    change: str
+    old: Any = None
+    new: Any = None
+    words: Optional[list[list[str]]] = None
+
+class SyllabusDiff(BaseModel):
+    syllabus_id: int
+    version: int
+    against_id: int
+    against_version: int
+    against_revision: Optional[int] = None
+    fields: list[SyllabusDiffField]
+
 router = APIRouter()
 
+async def publish_syllabus_event(db: AsyncSession, syllabus: Syllabus, kind: str):
+    """Notify the teacher, the subject's department and admins."""
+    department_id = await db.scalar(select(Subject.department_id).where(Subject.id == syllabus.subject_id))
+    channels = [ALL, user_channel(syllabus.teacher_id)]
+    if department_id is not None:
+        channels.append(department_channel(department_id))
+    await publish(channels, {
+        "type": kind,
+        "id": syllabus.id,
+        "status": syllabus.status,
+        "version": syllabus.version,
+        "subject_id": syllabus.subject_id,
+        "teacher_id": syllabus.teacher_id,
+        "department_id": department_id,
+        "updated_at": syllabus.updated_at.isoformat() if syllabus.updated_at else None,
+    })
+
+# Writers racing for the same (subject, teacher) lose to the unique index
+# and retry; each round lets at least one of them through
+VERSION_ATTEMPTS = 10
+
+def next_version(subject_id: int, teacher_id: int):
+    return (
+        select(func.coalesce(func.max(Syllabus.version), 0) + 1)
+        .where(Syllabus.subject_id == subject_id, Syllabus.teacher_id == teacher_id)
+        .scalar_subquery()
+    )
+
+async def flush_with_next_version(db: AsyncSession, syllabus: Syllabus, **values):
+    """Flush ``syllabus`` with ``values`` applied as the next version of its
+    (subject, teacher) pair.
+
+    The number is computed by the INSERT or UPDATE itself, and each attempt
+    runs in a savepoint so a conflict only undoes this row.
+    """
+    for _ in range(VERSION_ATTEMPTS):
+        try:
+            async with db.begin_nested():
+                for key, value in values.items():
+                    setattr(syllabus, key, value)
+                syllabus.version = next_version(syllabus.subject_id, syllabus.teacher_id)
+                db.add(syllabus)
+        except IntegrityError:
+            continue
+        # The stored number replaces the expression on the instance
+        await db.refresh(syllabus, ["version"])
+        return
+    raise HTTPException(status_code=409, detail="Too many concurrent versions of this syllabus, please retry")
+
 @router.post("/", response_model=SyllabusResponse)
-def create_syllabus(syllabus: SyllabusCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_syllabus(syllabus: SyllabusCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role not in ["teacher", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
     teacher_id = syllabus.teacher_id if syllabus.teacher_id else current_user.id
-
-    # Find the latest version for this subject-teacher combination
-    latest_syllabus = db.query(Syllabus).filter(
-        Syllabus.subject_id == syllabus.subject_id,
-        Syllabus.teacher_id == teacher_id
-    ).order_by(Syllabus.version.desc()).first()
-
-    next_version = 1 if not latest_syllabus else latest_syllabus.version + 1
+    (await template_registry.for_subject(db, syllabus.subject_id)).validate(syllabus.template_data)
 
     db_syllabus = Syllabus(
         subject_id=syllabus.subject_id,
         teacher_id=teacher_id,
         template_data=syllabus.template_data,
-        status=syllabus.status,
-        version=next_version
+        status=syllabus.status
     )
-    db.add(db_syllabus)
-    db.commit()
-    db.refresh(db_syllabus)
+    await flush_with_next_version(db, db_syllabus)
+    await record_revision(db, db_syllabus.id, None, db_syllabus.template_data)
+    await index_syllabus(db, db_syllabus.id, db_syllabus.template_data)
+    await db.commit()
+    await db.refresh(db_syllabus)
+    await publish_syllabus_event(db, db_syllabus, "syllabus.created")
     return db_syllabus
 
-@router.get("/my", response_model=list[SyllabusResponse])
-def read_my_syllabi(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    syllabi = db.query(Syllabus).filter(Syllabus.teacher_id == current_user.id).all()
-    return syllabi
-
-@router.get("/pending", response_model=list[SyllabusResponse])
-def read_pending_syllabi(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/my", response_model=list[SyllabusExpandedResponse], response_model_exclude_unset=True)
+async def read_my_syllabi(request: Request, response: Response, expand: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    cached = await not_modified(request, response, db, SYLLABUS_LIST_TABLES, current_user)
+    if cached is not None:
+        return cached
+    stmt, to_item = list_query(parse_fields(fields), parse_expand(expand))
+    rows = (await db.execute(stmt.where(Syllabus.teacher_id == current_user.id))).all()
+    return json_response([to_item(row) for row in rows], response)
+
+@router.get("/pending", response_model=list[SyllabusExpandedResponse], response_model_exclude_unset=True)
+async def read_pending_syllabi(request: Request, response: Response, expand: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "head":
         raise HTTPException(status_code=403, detail="Not authorized")
-    from app.models.models import Department
-    dept = db.query(Department).filter(Department.head_id == current_user.id).first()
+    cached = await not_modified(request, response, db, SYLLABUS_LIST_TABLES, current_user)
+    if cached is not None:
+        return cached
+    dept = (await db.execute(select(Department).where(Department.head_id == current_user.id))).scalars().first()
     if not dept:
         raise HTTPException(status_code=404, detail="No department found")
-    syllabi = db.query(Syllabus).join(Syllabus.subject).filter(Syllabus.status == "pending", Syllabus.subject.has(department_id=dept.id)).all()
-    return syllabi
+    stmt, to_item = list_query(parse_fields(fields), parse_expand(expand))
+    rows = (await db.execute(
+        stmt.join(Subject, Subject.id == Syllabus.subject_id).where(Syllabus.status == "pending", Subject.department_id == dept.id)
+    )).all()
+    return json_response([to_item(row) for row in rows], response)
+
+@router.get("/review", response_model=SyllabusReviewPage)
+async def read_review_syllabi(
+    request: Request,
+    response: Response,
+    status: Optional[list[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include_counts: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role != "head":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    cached = await not_modified(request, response, db, SYLLABUS_LIST_TABLES, current_user)
+    if cached is not None:
+        return cached
+    # One indexed join scopes everything to the head's department
+    scope = (
+        select(Syllabus)
+        .join(Syllabus.subject)
+        .join(Department, Department.id == Subject.department_id)
+        .where(Department.head_id == current_user.id)
+    )
+    stmt = scope.options(contains_eager(Syllabus.subject), joinedload(Syllabus.teacher))
+    if status:
+        stmt = stmt.where(Syllabus.status.in_(status))
+    syllabi = await keyset_page(db, stmt, response, [Syllabus.updated_at, Syllabus.id], "updated_at", cursor, limit, descending=True)
+
+    counts = None
+    if include_counts:
+        counts_stmt = scope.with_only_columns(Syllabus.status, func.count()).group_by(Syllabus.status)
+        counts = {row[0]: row[1] for row in (await db.execute(counts_stmt)).all()}
+    return {"items": [review_item(syllabus) for syllabus in syllabi], "counts": counts}
+
+@router.get("/search", response_model=list[SyllabusSearchHit])
+async def search_syllabi(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    status: Optional[str] = None,
+    department_id: Optional[int] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in ["admin", "head", "teacher"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    hits, descending = search_hits(db.get_bind().dialect.name, q)
+    if hits is None:
+        return []
+    stmt = select(
+        Syllabus.id, Syllabus.subject_id, Syllabus.teacher_id, Syllabus.status, Syllabus.version,
+        Syllabus.template_data, hits.c.rank, hits.c.snippet
+    ).join(hits, hits.c.syllabus_id == Syllabus.id)
+
+    # Heads search their department, teachers their own syllabi
+    if current_user.role == "head" or department_id is not None:
+        stmt = stmt.join(Syllabus.subject)
+    if current_user.role == "head":
+        stmt = stmt.join(Department, Department.id == Subject.department_id).where(Department.head_id == current_user.id)
+    elif current_user.role == "teacher":
+        stmt = stmt.where(Syllabus.teacher_id == current_user.id)
+    if department_id is not None:
+        stmt = stmt.where(Subject.department_id == department_id)
+    if status is not None:
+        stmt = stmt.where(Syllabus.status == status)
+
+    rows = await keyset_page(
+        db, stmt, response, [hits.c.rank, Syllabus.id], "rank", cursor, limit, descending, include_total, scalars=False
+    )
+    return [{
+        "id": row.id,
+        "subject_id": row.subject_id,
+        "teacher_id": row.teacher_id,
+        "status": row.status,
+        "version": row.version,
+        "course_title": (row.template_data or {}).get("courseTitle"),
+        "course_code": (row.template_data or {}).get("courseCode"),
+        "rank": row.rank,
+        "snippet": highlight(row.snippet),
+    } for row in rows]
+
+@router.get("/events")
+async def stream_syllabus_events(request: Request, current_user: Principal = Depends(get_stream_user)):
+    """Server-Sent Events for syllabus changes the caller should see.
+
+    Teachers follow their own syllabi, heads their departments and admins
+    everything. A comment line is sent every ``event_heartbeat_seconds`` to
+    keep proxies from closing an idle stream.
+    """
+    channels = [user_channel(current_user.id)]
+    if current_user.role == "admin":
+        channels.append(ALL)
+    elif current_user.role == "head":
+        # Short-lived session: the stream must not pin a pooled connection
+        async with AsyncSessionLocal() as db:
+            department_ids = (await db.execute(select(Department.id).where(Department.head_id == current_user.id))).scalars().all()
+        channels.extend(department_channel(department_id) for department_id in department_ids)
+
+    async def stream():
+        async with event_broker.subscribe(channels) as subscription:
+            yield f"retry: {settings.event_heartbeat_seconds * 1000}\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.event_heartbeat_seconds)
+                if event is None:
+                    yield ": ping\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # Admin-only routes
-@router.get("/all", response_model=list[SyllabusResponse])
-def read_all_syllabi(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/all", response_model=list[SyllabusExpandedResponse], response_model_exclude_unset=True)
+async def read_all_syllabi(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+    sort: str = Query("id", pattern="^(id|updated_at)$"),
+    status: Optional[str] = None,
+    department_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+    include_total: bool = False,
+    expand: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    cached = await not_modified(request, response, db, SYLLABUS_LIST_TABLES, current_user)
+    if cached is not None:
+        return cached
+    # Newest first when paging by modification time
+    if sort == "updated_at":
+        columns, descending = [Syllabus.updated_at, Syllabus.id], True
+    else:
+        columns, descending = [Syllabus.id], False
+    stmt, to_item = list_query(parse_fields(fields), parse_expand(expand), columns)
+    if status is not None:
+        stmt = stmt.where(Syllabus.status == status)
+    if department_id is not None:
+        stmt = stmt.join(Subject, Subject.id == Syllabus.subject_id).where(Subject.department_id == department_id)
+    if teacher_id is not None:
+        stmt = stmt.where(Syllabus.teacher_id == teacher_id)
+    if subject_id is not None:
+        stmt = stmt.where(Syllabus.subject_id == subject_id)
+    if updated_since is not None:
+        stmt = stmt.where(Syllabus.updated_at >= updated_since)
+
+    rows = await keyset_page(db, stmt, response, columns, sort, cursor, limit, descending, include_total, scalars=False, skip=skip)
+    return json_response([to_item(row) for row in rows], response)
+
+@router.get("/export")
+async def export_all_syllabi(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    syllabi = db.query(Syllabus).offset(skip).limit(limit).all()
-    return syllabi
+    syllabi = (await db.execute(
+        select(Syllabus).options(joinedload(Syllabus.subject)).where(
+            Syllabus.status == "approved"
+        ).order_by(Syllabus.id)
+    )).scalars().all()
+    templates = await template_registry.for_departments(db, {syllabus.subject.department_id for syllabus in syllabi if syllabus.subject})
+    entries = [export_entry(syllabus, templates) for syllabus in syllabi]
+    return StreamingResponse(
+        stream_pdf_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=syllabi.zip"}
+    )
+
+@router.get("/catalog")
+async def export_catalog(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    status: Optional[str] = None,
+    department_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream every syllabus with its subject, department and teacher, one
+    column per template_data field."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        check_format(format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(
+        stream_catalog(format, status, department_id),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename=syllabi-catalog.{format}"}
+    )
 
 @router.put("/{syllabus_id}/status")
-def update_status(syllabus_id: int, status: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_status(syllabus_id: int, status: str, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "head":
         raise HTTPException(status_code=403, detail="Not authorized")
-    syllabus = db.query(Syllabus).filter(Syllabus.id == syllabus_id).first()
+    syllabus = await db.get(Syllabus, syllabus_id)
     if not syllabus:
         raise HTTPException(status_code=404, detail="Syllabus not found")
     syllabus.status = status
-    db.commit()
+    await db.commit()
+    await run_in_threadpool(pdf_cache.invalidate, syllabus.id)
+    await publish_syllabus_event(db, syllabus, "syllabus.status")
     return {"message": "Status updated"}
 
 @router.put("/{syllabus_id}", response_model=SyllabusResponse)
-def update_syllabus(syllabus_id: int, syllabus: SyllabusUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_syllabus(syllabus_id: int, syllabus: SyllabusUpdate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    db_syllabus = db.query(Syllabus).filter(Syllabus.id == syllabus_id).first()
+    # Locked until commit so concurrent edits of one syllabus take turns:
+    # its revision history is built from the template_data read here
+    db_syllabus = await db.get(Syllabus, syllabus_id, with_for_update=True)
     if not db_syllabus:
         raise HTTPException(status_code=404, detail="Syllabus not found")
 
-    # Update only provided fields
-    if syllabus.subject_id is not None:
-        db_syllabus.subject_id = syllabus.subject_id
-    if syllabus.teacher_id is not None:
-        db_syllabus.teacher_id = syllabus.teacher_id
-    if syllabus.template_data is not None:
+    # A syllabus moved to another subject or teacher becomes the latest
+    # version there
+    moved = {
+        key: value for key, value in (("subject_id", syllabus.subject_id), ("teacher_id", syllabus.teacher_id))
+        if value is not None and value != getattr(db_syllabus, key)
+    }
+
+    # Update only provided fields. New data, and existing data moved to a
+    # subject that may belong to another department, must satisfy the
+    # template of the subject it ends up under
+    changed = syllabus.template_data is not None and syllabus.template_data != db_syllabus.template_data
+    if changed or "subject_id" in moved:
+        template = await template_registry.for_subject(db, moved.get("subject_id", db_syllabus.subject_id))
+        template.validate(syllabus.template_data if changed else db_syllabus.template_data or {})
+    if changed:
+        await record_revision(db, db_syllabus.id, db_syllabus.template_data, syllabus.template_data)
+        await index_syllabus(db, db_syllabus.id, syllabus.template_data)
         db_syllabus.template_data = syllabus.template_data
     if syllabus.status is not None:
         db_syllabus.status = syllabus.status
 
-    db.commit()
-    db.refresh(db_syllabus)
+    if moved:
+        await flush_with_next_version(db, db_syllabus, **moved)
+
+    await db.commit()
+    await db.refresh(db_syllabus)
+    await run_in_threadpool(pdf_cache.invalidate, db_syllabus.id)
+    await publish_syllabus_event(db, db_syllabus, "syllabus.updated")
     return db_syllabus
 
 @router.delete("/{syllabus_id}")
-def delete_syllabus(syllabus_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_syllabus(syllabus_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    db_syllabus = db.query(Syllabus).filter(Syllabus.id == syllabus_id).first()
+    db_syllabus = await db.get(Syllabus, syllabus_id)
     if not db_syllabus:
         raise HTTPException(status_code=404, detail="Syllabus not found")
 
     try:
-        db.delete(db_syllabus)
-        db.commit()
+        await unindex_syllabus(db, syllabus_id)
+        await db.delete(db_syllabus)
+        await db.commit()
+        await run_in_threadpool(pdf_cache.invalidate, syllabus_id)
         return {"message": "Syllabus deleted successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete syllabus: {str(e)}")
 
-@router.get("/{syllabus_id}/pdf")
-def download_syllabus_pdf(syllabus_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # Check if user can access this syllabus
-    syllabus = db.query(Syllabus).filter(Syllabus.id == syllabus_id).first()
-    if not syllabus:
-        raise HTTPException(status_code=404, detail="Syllabus not found")
-
-    # Allow access if user is teacher of the syllabus, admin, or head of department
-    if current_user.role not in ["admin"]:
-        if current_user.role == "teacher" and syllabus.teacher_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-        elif current_user.role == "head":
-            from app.models.models import Department
-            dept = db.query(Department).filter(Department.head_id == current_user.id).first()
-            if not dept or syllabus.subject.department_id != dept.id:
-                raise HTTPException(status_code=403, detail="Not authorized")
-
-    # Generate PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
-
-    heading_style = ParagraphStyle(
-        'Heading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=12
-    )
+async def render_cached_pdf(syllabus: Syllabus, key: str, layout: str, template: CompiledTemplate) -> bytes:
+    pdf = await run_in_threadpool(pdf_cache.get, syllabus.id, key)
+    pdf_cache_lookups.inc("hit" if pdf is not None else "miss")
+    if pdf is None:
+        started = time.perf_counter()
+        try:
+            pdf = await render_pool.render(syllabus.template_data, syllabus.updated_at, layout, template)
+        except RenderPoolSaturated:
+            raise HTTPException(
+                status_code=503,
+                detail="PDF rendering is busy, please retry shortly",
+                headers={"Retry-After": str(settings.pdf_render_retry_after_seconds)},
+            )
+        pdf_render_duration.observe(time.perf_counter() - started)
+        await run_in_threadpool(pdf_cache.put, syllabus.id, key, pdf)
+    return pdf
+
+@router.get("/render-stats")
+async def read_render_stats(current_user: Principal = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return render_pool.stats()
 
-    content_style = styles['Normal']
-
-    story = []
-
-    # Get template data
-    template_data = syllabus.template_data or {}
-
-    # Title
-    course_title = template_data.get('courseTitle', 'Course Title')
-    course_code = template_data.get('courseCode', 'Course Code')
-    story.append(Paragraph(f"{course_title}<br/>{course_code}", title_style))
-    story.append(Spacer(1, 12))
-
-    # Instructor Info
-    instructor = template_data.get('instructor', 'Instructor Name')
-    email = template_data.get('email', '')
-    office_hours = template_data.get('officeHours', '')
-
-    story.append(Paragraph("Instructor Information", heading_style))
-    story.append(Paragraph(f"<b>Name:</b> {instructor}", content_style))
-    if email:
-        story.append(Paragraph(f"<b>Email:</b> {email}", content_style))
-    if office_hours:
-        story.append(Paragraph(f"<b>Office Hours:</b> {office_hours}", content_style))
-    story.append(Spacer(1, 12))
-
-    # Subject Information
-    typology = template_data.get('typology', '')
-    subject_type = template_data.get('type', '')
-    if typology or subject_type:
-        story.append(Paragraph("Subject Information", heading_style))
-        if typology:
-            typology_descriptions = {
-                'A': 'Basic',
-                'B': 'Intermediate',
-                'C': 'Advanced',
-                'D': 'Specialized',
-                'E': 'Research',
-                'F': 'Practical'
-            }
-            typology_desc = typology_descriptions.get(typology, '')
-            story.append(Paragraph(f"<b>Typology:</b> {typology} - {typology_desc}", content_style))
-        if subject_type:
-            story.append(Paragraph(f"<b>Type:</b> {subject_type.title()}", content_style))
-        story.append(Spacer(1, 12))
-
-    # Course Description
-    course_description = template_data.get('courseDescription', '')
-    if course_description:
-        story.append(Paragraph("Course Description", heading_style))
-        story.append(Paragraph(course_description, content_style))
-        story.append(Spacer(1, 12))
-
-    # Learning Objectives
-    learning_objectives = template_data.get('learningObjectives', '')
-    if learning_objectives:
-        story.append(Paragraph("Learning Objectives", heading_style))
-        story.append(Paragraph(learning_objectives, content_style))
-        story.append(Spacer(1, 12))
-
-    # Prerequisites
-    prerequisites = template_data.get('prerequisites', '')
-    if prerequisites:
-        story.append(Paragraph("Prerequisites", heading_style))
-        story.append(Paragraph(prerequisites, content_style))
-        story.append(Spacer(1, 12))
-
-    # Required Materials
-    textbooks = template_data.get('textbooks', '')
-    if textbooks:
-        story.append(Paragraph("Required Materials", heading_style))
-        story.append(Paragraph(textbooks, content_style))
-        story.append(Spacer(1, 12))
-
-    # Grading Policy
-    grading_policy = template_data.get('gradingPolicy', '')
-    if grading_policy:
-        story.append(Paragraph("Grading Policy", heading_style))
-        story.append(Paragraph(grading_policy, content_style))
-        story.append(Spacer(1, 12))
-
-    # Course Policies
-    attendance_policy = template_data.get('attendancePolicy', '')
-    academic_integrity = template_data.get('academicIntegrity', '')
-
-    if attendance_policy or academic_integrity:
-        story.append(Paragraph("Course Policies", heading_style))
-        if attendance_policy:
-            story.append(Paragraph(f"<b>Attendance:</b> {attendance_policy}", content_style))
-        if academic_integrity:
-            story.append(Paragraph(f"<b>Academic Integrity:</b> {academic_integrity}", content_style))
-        story.append(Spacer(1, 12))
-
-    # Schedule
-    schedule = template_data.get('schedule', '')
-    if schedule:
-        story.append(Paragraph("Course Schedule", heading_style))
-        story.append(Paragraph(schedule.replace('\n', '<br/>'), content_style))
-        story.append(Spacer(1, 12))
-
-    # Footer
-    from datetime import datetime
-    story.append(Spacer(1, 24))
-    story.append(Paragraph(f"This syllabus is subject to change at the instructor's discretion.<br/>Last updated: {datetime.now().strftime('%Y-%m-%d')}", styles['Italic']))
-
-    # Build PDF
-    doc.build(story)
-
-    buffer.seek(0)
-
-    # Return PDF as streaming response
+@router.get("/{syllabus_id}/pdf")
+async def download_syllabus_pdf(syllabus_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    syllabus, template_id, template_version = await get_accessible_syllabus_template(db, syllabus_id, current_user)
+    # Compiled templates are cached, so this only queries for a revision
+    # this process has not seen
+    template = await template_registry.get(db, template_id, template_version)
+
+    layout = layout_for_department(syllabus.subject.department_id if syllabus.subject else None, template)
+    key = pdf_cache.make_key(syllabus, layout, template.key)
+    etag = pdf_cache.etag_for(key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    pdf = await render_cached_pdf(syllabus, key, layout, template)
+
+    course_code = (syllabus.template_data or {}).get('courseCode', 'Course Code')
     filename = f"syllabus-{course_code or 'template'}.pdf"
-    return StreamingResponse(
-        buffer,
-        media_type='application/pdf',
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
\ No newline at end of file
+    headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return Response(content=pdf, media_type='application/pdf', headers=headers)
+
+
+@router.get("/{syllabus_id}/history", response_model=list[SyllabusRevision])
+async def read_syllabus_history(syllabus_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    await get_accessible_syllabus(db, syllabus_id, current_user)
+    revisions = (await db.execute(
+        select(SyllabusVersion.version, SyllabusVersion.kind, SyllabusVersion.timestamp)
+        .where(SyllabusVersion.syllabus_id == syllabus_id)
+        .order_by(SyllabusVersion.version)
+    )).all()
+    return [{"version": row.version, "kind": row.kind, "timestamp": row.timestamp} for row in revisions]
+
+@router.get("/{syllabus_id}/history/{revision}", response_model=SyllabusRevisionContent)
+async def read_syllabus_revision(syllabus_id: int, revision: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    await get_accessible_syllabus(db, syllabus_id, current_user)
+    row = (await db.execute(
+        select(SyllabusVersion.version, SyllabusVersion.kind, SyllabusVersion.timestamp).where(
+            SyllabusVersion.syllabus_id == syllabus_id,
+            SyllabusVersion.version == revision
+        )
+    )).first()
+    template_data = await reconstruct(db, syllabus_id, revision) if row else None
+    if template_data is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return {"version": row.version, "kind": row.kind, "timestamp": row.timestamp, "template_data": template_data}
+
+async def resolve_diff_base(db: AsyncSession, syllabus: Syllabus, against: str, current_user: Principal):
+    """Return (base syllabus, revision or None, template_data) for ``against``.
+
+    ``against`` is another syllabus id, ``v<N>`` for version N of the same
+    subject and teacher, ``approved`` for the latest approved earlier
+    version, or ``r<N>`` for stored revision N of this syllabus.
+    """
+    against = against.strip().lower()
+    if against.isdigit():
+        base = await get_accessible_syllabus(db, int(against), current_user)
+        return base, None, base.template_data
+    if against[:1] == "r" and against[1:].isdigit():
+        template_data = await reconstruct(db, syllabus.id, int(against[1:]))
+        if template_data is None:
+            raise HTTPException(status_code=404, detail="Revision not found")
+        return syllabus, int(against[1:]), template_data
+
+    lineage = select(Syllabus).where(
+        Syllabus.subject_id == syllabus.subject_id,
+        Syllabus.teacher_id == syllabus.teacher_id,
+    )
+    if against[:1] == "v" and against[1:].isdigit():
+        stmt = lineage.where(Syllabus.version == int(against[1:])).order_by(Syllabus.id.desc())
+    elif against == "approved":
+        stmt = lineage.where(
+            Syllabus.status == "approved",
+            Syllabus.id != syllabus.id,
+            Syllabus.version <= syllabus.version,
+        ).order_by(Syllabus.version.desc(), Syllabus.id.desc())
+    else:
+        raise HTTPException(status_code=400, detail="against must be a syllabus id, v<version>, r<revision> or 'approved'")
+    base = (await db.execute(stmt.limit(1))).scalar_one_or_none()
+    if not base:
+        raise HTTPException(status_code=404, detail="Syllabus not found")
+    return base, None, base.template_data
+
+@router.get("/{syllabus_id}/diff", response_model=SyllabusDiff, response_model_exclude_unset=True)
+async def diff_syllabus(syllabus_id: int, against: str, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    syllabus = await get_accessible_syllabus(db, syllabus_id, current_user)
+    base, revision, base_data = await resolve_diff_base(db, syllabus, against, current_user)
+
+    base_key = (base.id, "rev", revision) if revision is not None else (base.id, base.updated_at)
+    key = (base_key, (syllabus.id, syllabus.updated_at))
+    fields = diff_cache.get(key)
+    if fields is None:
+        fields = diff_template_data(base_data, syllabus.template_data)
+        diff_cache.put(key, fields)
+
+    result = {
+        "syllabus_id": syllabus.id,
+        "version": syllabus.version,
+        "against_id": base.id,
+        "against_version": base.version,
+        "fields": fields,
+    }
+    if revision is not None:
+        result["against_revision"] = revision
+    return result
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Assignment, ChangeLog, Department, Subject, Syllabus, User
+from app.utils.auth import Principal, get_current_user, get_async_db
+from app.utils.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_after
+from pydantic import BaseModel
+from typing import Optional
+
+# Synced tables and the columns sent for each of their rows
+SYNC_FIELDS = {
+    "users": (User, ["id", "email", "role", "department_id", "updated_at"]),
+    "departments": (Department, ["id", "name", "head_id", "updated_at"]),
+    "subjects": (Subject, ["id", "name", "code", "department_id", "updated_at"]),
+    "assignments": (Assignment, ["id", "teacher_id", "subject_id", "updated_at"]),
+    "syllabi": (Syllabus, ["id", "subject_id", "teacher_id", "template_data", "status", "version", "created_at", "updated_at"]),
+}
+
+class SyncResponse(BaseModel):
+    token: str
+    has_more: bool = False
+    upserted: dict[str, list[dict]] = {}
+    deleted: dict[str, list[int]] = {}
+
+router = APIRouter()
+
+TOKEN_COLUMNS = [ChangeLog.txid, ChangeLog.id]
+
+async def txid_horizon(db: AsyncSession) -> Optional[int]:
+    """Oldest transaction still running on Postgres, None elsewhere.
+
+    Every transaction below it has finished, so all change log entries it
+    will ever have are visible; entries at or above it are held back
+    rather than letting a token move past a transaction that commits later.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return await db.scalar(text("SELECT txid_snapshot_xmin(txid_current_snapshot())"))
+
+def visible_tables(current_user: Principal) -> list[str]:
+    if current_user.role == "admin":
+        return list(SYNC_FIELDS)
+    return [table for table in SYNC_FIELDS if table != "users"]
+
+def scoped(stmt, table: str, current_user: Principal):
+    """Restrict a synced table to the rows the caller's list views show."""
+    model = SYNC_FIELDS[table][0]
+    if current_user.role == "admin" or table not in ("assignments", "syllabi"):
+        return stmt
+    if current_user.role == "teacher":
+        return stmt.where(model.teacher_id == current_user.id)
+    return (
+        stmt.join(Subject, Subject.id == model.subject_id)
+        .join(Department, Department.id == Subject.department_id)
+        .where(Department.head_id == current_user.id)
+    )
+
+@router.get("/", response_model=SyncResponse)
+async def sync(since: Optional[str] = None, limit: int = 1000, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    """Rows created, updated or deleted since ``since``.
+
+    Without ``since`` only the current token is returned: take it before
+    loading the lists, then pass it back to receive every later change.
+    Rows that were changed but are no longer visible to the caller come
+    back as deletions, so a client cache can apply both lists as-is.
+    """
+    horizon = await txid_horizon(db)
+    if since is None:
+        if horizon is not None:
+            return {"token": encode_cursor("sync", [horizon, 0])}
+        latest = await db.scalar(select(func.max(ChangeLog.id)))
+        return {"token": encode_cursor("sync", [0, latest or 0])}
+    last = decode_cursor(since, "sync", TOKEN_COLUMNS)
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE * 10))
+    tables = visible_tables(current_user)
+    stmt = select(ChangeLog.id, ChangeLog.txid, ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op).where(keyset_after(TOKEN_COLUMNS, last, False))
+    if horizon is not None:
+        stmt = stmt.where(ChangeLog.txid < horizon)
+    entries = (await db.execute(stmt.order_by(*TOKEN_COLUMNS).limit(limit + 1))).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    token = encode_cursor("sync", [entries[-1].txid, entries[-1].id] if entries else last)
+
+    # The last change to each row decides between upsert and tombstone
+    latest_ops = {}
+    for entry in entries:
+        if entry.table_name in tables:
+            latest_ops[(entry.table_name, entry.row_id)] = entry.op
+
+    upserted, deleted = {}, {}
+    for table in tables:
+        model, fields = SYNC_FIELDS[table]
+        ids = [row_id for (name, row_id), op in latest_ops.items() if name == table and op == "upsert"]
+        gone = [row_id for (name, row_id), op in latest_ops.items() if name == table and op == "delete"]
+        if ids:
+            stmt = scoped(select(*[getattr(model, field) for field in fields]), table, current_user)
+            rows = (await db.execute(stmt.where(model.id.in_(ids)).order_by(model.id))).all()
+            if rows:
+                upserted[table] = [dict(row._mapping) for row in rows]
+            found = {row.id for row in rows}
+            gone.extend(row_id for row_id in ids if row_id not in found)
+        if gone:
+            deleted[table] = sorted(gone)
+    return {"token": token, "has_more": has_more, "upserted": upserted, "deleted": deleted}
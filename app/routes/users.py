@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.models.models import User
-from app.utils.auth import get_current_user, get_db, get_password_hash
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import insert, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import User, Department, Assignment, Syllabus, record_changes
+from app.utils.auth import Principal, get_current_user, get_async_db, principal_cache, pwd_context
+from app.utils.bulk import BulkBatch, BulkResult, check_unique, read_rows
+from app.utils.hashing import HashingPoolSaturated, hashing_pool
+from app.utils.etag import not_modified
+from app.utils.pagination import keyset_page
+from pydantic import BaseModel, model_validator
+from typing import Literal, Optional
 
 class UserCreate(BaseModel):
     email: str
@@ -17,6 +23,21 @@ class UserUpdate(BaseModel):
     role: str
     department_id: int
 
+class UserImport(BaseModel):
+    email: str
+    password: Optional[str] = None
+    password_hash: Optional[str] = None  # an existing passlib hash, e.g. from another system
+    role: Literal["admin", "teacher", "head"]
+    department_id: int
+
+    @model_validator(mode="after")
+    def one_password(self):
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError("give exactly one of password or password_hash")
+        if self.password_hash is not None and not pwd_context.identify(self.password_hash):
+            raise ValueError("password_hash is not a recognised hash")
+        return self
+
 class UserResponse(BaseModel):
     id: int
     email: str
@@ -25,43 +46,123 @@ class UserResponse(BaseModel):
 
 router = APIRouter()
 
+def hashing_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Password hashing is busy, please retry shortly", headers={"Retry-After": "1"})
+
+async def hash_password(password: str) -> str:
+    try:
+        return await hashing_pool.hash(password)
+    except HashingPoolSaturated:
+        raise hashing_busy()
+
 @router.post("/", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = User(email=user.email, password_hash=hashed_password, role=user.role, department_id=user.department_id)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
+@router.post("/bulk", response_model=BulkResult, response_model_exclude_none=True)
+async def bulk_create_users(request: Request, response: Response, atomic: bool = True, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    """Create users from a JSON array or CSV body in one transaction.
+
+    Every row is validated before anything is written. With ``atomic`` (the
+    default) any invalid row rejects the whole batch with 422; otherwise the
+    valid rows are created and the rest reported.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    batch = BulkBatch(UserImport, await read_rows(request))
+
+    emails = {user.email for user in batch.valid.values()}
+    existing = set((await db.execute(select(User.email).where(User.email.in_(emails)))).scalars()) if emails else set()
+    check_unique(batch, lambda row, user: user.email, existing, "Email")
+    department_ids = {user.department_id for user in batch.valid.values()}
+    known = set((await db.execute(select(Department.id).where(Department.id.in_(department_ids)))).scalars()) if department_ids else set()
+    for row, user in list(batch.valid.items()):
+        if user.department_id not in known:
+            batch.fail(row, "Department not found")
+
+    if not batch.valid or (atomic and batch.failed):
+        if batch.failed:
+            response.status_code = 422
+        return batch.report()
+
+    rows = list(batch.valid.items())
+    to_hash = [user.password for _, user in rows if user.password_hash is None]
+    try:
+        hashes = iter(await hashing_pool.hash_many(to_hash))
+    except HashingPoolSaturated:
+        raise hashing_busy()
+    values = [{
+        "email": user.email,
+        "password_hash": user.password_hash if user.password_hash is not None else next(hashes),
+        "role": user.role,
+        "department_id": user.department_id,
+    } for _, user in rows]
+
+    try:
+        ids = (await db.execute(insert(User).returning(User.id, sort_by_parameter_order=True), values)).scalars().all()
+        await db.run_sync(lambda session: record_changes(session.connection(), [("users", id, "upsert") for id in ids]))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="A user in the batch was created concurrently, please retry")
+    for (row, _), id in zip(rows, ids):
+        batch.created(row, id)
+    return batch.report()
+
 @router.get("/", response_model=list[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def read_users(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+    role: Optional[str] = None,
+    department_id: Optional[int] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    cached = await not_modified(request, response, db, ["users"], current_user)
+    if cached is not None:
+        return cached
+    stmt = select(User)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if department_id is not None:
+        stmt = stmt.where(User.department_id == department_id)
+    return await keyset_page(db, stmt, response, [User.id], "id", cursor, limit, include_total=include_total, skip=skip)
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    previous_email = db_user.email
     db_user.email = user.email
     if user.password:  # Only update password if provided
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await hash_password(user.password)
         db_user.password_hash = hashed_password
     db_user.role = user.role
     db_user.department_id = user.department_id
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    principal_cache.invalidate(previous_email)
+    principal_cache.invalidate(db_user.email)
     return db_user
 
 @router.delete("/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
@@ -69,15 +170,13 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
     if current_user.id == user_id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
 
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Check for dependencies that would prevent deletion
-    from app.models.models import Department, Assignment, Syllabus
-
     # Check if user is department head
-    dept_head = db.query(Department).filter(Department.head_id == user_id).first()
+    dept_head = (await db.execute(select(Department).where(Department.head_id == user_id))).scalars().first()
     if dept_head:
         raise HTTPException(
             status_code=400,
@@ -85,7 +184,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
         )
 
     # Check if user has assignments
-    assignments = db.query(Assignment).filter(Assignment.teacher_id == user_id).count()
+    assignments = await db.scalar(select(func.count()).select_from(Assignment).where(Assignment.teacher_id == user_id))
     if assignments > 0:
         raise HTTPException(
             status_code=400,
@@ -93,7 +192,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
         )
 
     # Check if user has syllabi
-    syllabi = db.query(Syllabus).filter(Syllabus.teacher_id == user_id).count()
+    syllabi = await db.scalar(select(func.count()).select_from(Syllabus).where(Syllabus.teacher_id == user_id))
     if syllabi > 0:
         raise HTTPException(
             status_code=400,
@@ -101,9 +200,11 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
         )
 
     try:
-        db.delete(db_user)
-        db.commit()
+        email = db_user.email
+        await db.delete(db_user)
+        await db.commit()
+        principal_cache.invalidate(email)
         return {"message": "User deleted successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete user: {str(e)}")
\ No newline at end of file
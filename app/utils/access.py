@@ -0,0 +1,48 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from app.models.models import Department, Subject, Syllabus, SyllabusTemplate
+from app.utils.auth import Principal
+
+async def _accessible_row(db: AsyncSession, syllabus_id: int, current_user: Principal, columns: tuple, options: tuple):
+    stmt = (
+        select(Syllabus, Department.head_id, *columns)
+        .outerjoin(Syllabus.subject)
+        .outerjoin(Department, Department.id == Subject.department_id)
+        .options(contains_eager(Syllabus.subject), *options)
+        .where(Syllabus.id == syllabus_id)
+    )
+    if columns:
+        stmt = stmt.outerjoin(SyllabusTemplate, SyllabusTemplate.department_id == Subject.department_id)
+    row = (await db.execute(stmt)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Syllabus not found")
+    syllabus, head_id = row[0], row[1]
+
+    # Allow access if user is teacher of the syllabus, admin, or head of department
+    if current_user.role not in ["admin"]:
+        if current_user.role == "teacher" and syllabus.teacher_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        elif current_user.role == "head" and (head_id is None or head_id != current_user.id):
+            raise HTTPException(status_code=403, detail="Not authorized")
+    return row
+
+async def get_accessible_syllabus(db: AsyncSession, syllabus_id: int, current_user: Principal, *options) -> Syllabus:
+    """Load a syllabus the caller may read, resolving access in one query.
+
+    The syllabus, its subject and the head of the subject's department come
+    back from a single outer join, so neither the role check nor later use
+    of ``syllabus.subject`` triggers a lazy load. Extra loader ``options``
+    are applied to the same statement.
+    """
+    return (await _accessible_row(db, syllabus_id, current_user, (), options))[0]
+
+async def get_accessible_syllabus_template(
+    db: AsyncSession, syllabus_id: int, current_user: Principal
+) -> tuple[Syllabus, Optional[int], Optional[int]]:
+    """Like get_accessible_syllabus, plus the (id, version) of the
+    department's template from the same query; both None without one."""
+    row = await _accessible_row(db, syllabus_id, current_user, (SyllabusTemplate.id, SyllabusTemplate.version), ())
+    return row[0], row[2], row[3]
@@ -1,17 +1,95 @@
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.models.models import User
-from app.database import SessionLocal
+from app.database import SessionLocal, AsyncSessionLocal
+from app.utils.hashing import hashing_pool
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    role: str
+    department_id: Optional[int]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role, department_id=user.department_id)
+
+class PrincipalCache:
+    """TTL cache of authenticated principals keyed by token subject (email).
+
+    Invalidation also remembers when a subject was changed so that tokens
+    carrying embedded principal claims issued before that moment are
+    re-checked against the database instead of being trusted. That record
+    lives in this process only: another worker keeps trusting the old
+    claims until the token expires, which is why embed_principal_claims is
+    off by default and meant for single-worker deployments.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}  # email -> (expires_at, Principal)
+        self._invalidated_at = {}  # email -> time.time() of the last change
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[email]
+                return None
+            return entry[1]
+
+    def put(self, principal: Principal):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[principal.email] = (time.monotonic() + self.ttl_seconds, principal)
+
+    def invalidate(self, email: str):
+        now = time.time()
+        with self._lock:
+            self._entries.pop(email, None)
+            self._invalidated_at[email] = now
+            # Tokens older than their lifetime cannot be presented any more
+            horizon = now - settings.access_token_expire_minutes * 60
+            for key in [k for k, at in self._invalidated_at.items() if at < horizon]:
+                del self._invalidated_at[key]
+
+    def claims_trusted(self, email: str, issued_at) -> bool:
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(email)
+        return invalidated_at is None or (issued_at is not None and issued_at > invalidated_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidated_at.clear()
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_max_entries,
+)
 
 def get_db():
     db = SessionLocal()
@@ -20,31 +98,54 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def principal_claims(user: User) -> dict:
+    claims = {"sub": user.email, "role": user.role}
+    if settings.embed_principal_claims:
+        claims.update({"uid": user.id, "dept": user.department_id})
+    return claims
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await hashing_pool.verify_and_update(password, user.password_hash)
+    if not valid:
         return False
+    # Transparently upgrade hashes made with a different cost factor
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def _principal_from_claims(payload: dict) -> Optional[Principal]:
+    if not settings.embed_principal_claims or "uid" not in payload or "role" not in payload:
+        return None
+    email = payload["sub"]
+    if not principal_cache.claims_trusted(email, payload.get("iat")):
+        return None
+    return Principal(id=payload["uid"], email=email, role=payload["role"], department_id=payload.get("dept"))
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -57,10 +158,26 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
+
+    principal = _principal_from_claims(payload) or principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    # Only open a session when the principal is not already known
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+    principal_cache.put(principal)
+    return principal
+
+async def get_stream_user(token: Optional[str] = Depends(optional_oauth2_scheme), access_token: Optional[str] = None) -> Principal:
+    """get_current_user that also accepts ``?access_token=``.
+
+    Browsers' EventSource cannot send an Authorization header.
+    """
+    return await get_current_user(token or access_token or "")
 
 def get_db():
     db = SessionLocal()
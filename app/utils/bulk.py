@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from typing import Optional
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from app.config import settings
+
+# Shared plumbing for the bulk import endpoints: read the rows (a JSON
+# array or a CSV body), validate each against a Pydantic model and collect
+# per-row results. Row numbers are 0-based positions in the input.
+
+class BulkRowResult(BaseModel):
+    row: int
+    status: str  # created, error, skipped
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkRowResult]
+
+async def read_rows(request: Request) -> list[dict]:
+    """Rows from a JSON array body or a ``text/csv`` body with a header row."""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        if content_type in ("text/csv", "application/csv"):
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # Empty CSV cells mean "not given"
+            rows = [{key.strip(): (value if value != "" else None) for key, value in row.items() if key} for row in reader]
+        else:
+            rows = json.loads(body)
+    except (UnicodeDecodeError, ValueError, csv.Error):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or a CSV file")
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of objects")
+    if len(rows) > settings.bulk_max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {settings.bulk_max_rows} rows per request")
+    return rows
+
+def _error_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors()
+    )
+
+class BulkBatch:
+    """Validated rows of one import with their per-row outcome."""
+
+    def __init__(self, model, rows: list[dict]):
+        self.results = [BulkRowResult(row=i, status="skipped") for i in range(len(rows))]
+        self.valid = {}
+        for i, row in enumerate(rows):
+            try:
+                self.valid[i] = model.model_validate(row)
+            except ValidationError as e:
+                self.fail(i, _error_message(e))
+
+    def fail(self, row: int, error: str):
+        self.valid.pop(row, None)
+        self.results[row] = BulkRowResult(row=row, status="error", error=error)
+
+    def created(self, row: int, id: int):
+        self.results[row] = BulkRowResult(row=row, status="created", id=id)
+
+    @property
+    def failed(self) -> int:
+        return sum(result.status == "error" for result in self.results)
+
+    def report(self) -> dict:
+        created = sum(result.status == "created" for result in self.results)
+        return {"created": created, "failed": self.failed, "results": self.results}
+
+def check_unique(batch: BulkBatch, key, existing: set, label: str):
+    """Fail rows whose ``key(row, item)`` is taken in the table or earlier in the batch."""
+    seen = set()
+    for row, item in list(batch.valid.items()):
+        value = key(row, item)
+        if value in existing:
+            batch.fail(row, f"{label} already exists")
+        elif value in seen:
+            batch.fail(row, f"Duplicate {label.lower()} in this batch")
+        else:
+            seen.add(value)
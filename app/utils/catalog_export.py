@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.models import Department, Subject, Syllabus, User
+
+# Flat catalog of syllabi with their subject, department and teacher, one
+# row per syllabus and one column per template_data field. Rows are read
+# through a server-side cursor in batches of ``export_batch_size`` and each
+# batch is encoded and yielded before the next is fetched.
+
+BASE_COLUMNS = [
+    "syllabus_id", "version", "status", "created_at", "updated_at",
+    "subject_id", "subject_code", "subject_name",
+    "department_id", "department_name",
+    "teacher_id", "teacher_email",
+]
+
+# The form's fields in form order; any other keys follow alphabetically
+TEMPLATE_FIELD_ORDER = [
+    "courseTitle", "courseCode", "type", "typology", "credits", "instructor", "email",
+    "officeHours", "courseDescription", "prerequisites", "learningObjectives",
+    "textbooks", "gradingPolicy", "attendancePolicy", "academicIntegrity", "schedule",
+]
+TEMPLATE_PREFIX = "template."
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_TEMPLATE_KEYS_SQL = {
+    "postgresql": "SELECT DISTINCT json_object_keys(template_data) FROM syllabi WHERE json_typeof(template_data) = 'object'",
+    "sqlite": "SELECT DISTINCT field.key FROM syllabi, json_each(syllabi.template_data) AS field WHERE json_type(syllabi.template_data) = 'object'",
+}
+
+async def template_keys(db) -> list[str]:
+    """Every top-level template_data key in use, collected by the database."""
+    sql = _TEMPLATE_KEYS_SQL.get(db.get_bind().dialect.name)
+    if sql is None:
+        return list(TEMPLATE_FIELD_ORDER)
+    keys = set((await db.execute(text(sql))).scalars())
+    known = [key for key in TEMPLATE_FIELD_ORDER if key in keys]
+    return known + sorted(keys - set(known))
+
+def catalog_query(status: Optional[str] = None, department_id: Optional[int] = None):
+    stmt = (
+        select(
+            Syllabus.id.label("syllabus_id"), Syllabus.version, Syllabus.status,
+            Syllabus.created_at, Syllabus.updated_at, Syllabus.template_data,
+            Subject.id.label("subject_id"), Subject.code.label("subject_code"), Subject.name.label("subject_name"),
+            Department.id.label("department_id"), Department.name.label("department_name"),
+            User.id.label("teacher_id"), User.email.label("teacher_email"),
+        )
+        .outerjoin(Subject, Subject.id == Syllabus.subject_id)
+        .outerjoin(Department, Department.id == Subject.department_id)
+        .outerjoin(User, User.id == Syllabus.teacher_id)
+        .order_by(Syllabus.id)
+    )
+    if status is not None:
+        stmt = stmt.where(Syllabus.status == status)
+    if department_id is not None:
+        stmt = stmt.where(Subject.department_id == department_id)
+    return stmt
+
+def _cell(value):
+    # Nested template values do not fit a flat column; keep them as JSON text
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def flatten(row, keys: list[str], nested_as_text: bool = True) -> dict:
+    record = {column: getattr(row, column) for column in BASE_COLUMNS}
+    template_data = row.template_data if isinstance(row.template_data, dict) else {}
+    for key in keys:
+        value = template_data.get(key)
+        record[TEMPLATE_PREFIX + key] = _cell(value) if nested_as_text else value
+    return record
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _encode_csv(records: list[dict], columns: list[str], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for record in records:
+        writer.writerow(["" if record[column] is None else _iso(record[column]) for column in columns])
+    return buffer.getvalue().encode("utf-8")
+
+def _encode_ndjson(records: list[dict]) -> bytes:
+    return "".join(
+        json.dumps({key: _iso(value) for key, value in record.items()}, ensure_ascii=False) + "\n"
+        for record in records
+    ).encode("utf-8")
+
+class _Sink:
+    # Append-only file object; tell() keeps counting across drains because
+    # the Parquet writer records absolute offsets in the footer
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class _ParquetEncoder:
+    """Writes one Parquet row group per batch and hands back the new bytes."""
+
+    def __init__(self, columns: list[str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet export needs the pyarrow package") from e
+        types = {"syllabus_id": pa.int64(), "version": pa.int64(), "subject_id": pa.int64(),
+                 "department_id": pa.int64(), "teacher_id": pa.int64(),
+                 "created_at": pa.timestamp("us"), "updated_at": pa.timestamp("us")}
+        self._pa = pa
+        self._schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+        self._sink = _Sink()
+        self._writer = pq.ParquetWriter(pa.PythonFile(self._sink, mode="w"), self._schema)
+
+    def encode(self, records: list[dict]) -> bytes:
+        # Free-form template values become text so every batch shares a schema
+        for record in records:
+            for column, value in record.items():
+                if column.startswith(TEMPLATE_PREFIX) and value is not None and not isinstance(value, str):
+                    record[column] = str(value)
+        self._writer.write_table(self._pa.Table.from_pylist(records, schema=self._schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+def check_format(fmt: str):
+    """Raise RuntimeError early when ``fmt`` needs a missing optional package."""
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("Parquet export needs the pyarrow package") from e
+
+async def stream_catalog(fmt: str, status: Optional[str] = None, department_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    # The stream outlives the request handler, so it owns its session
+    async with AsyncSessionLocal() as db:
+        keys = await template_keys(db)
+        columns = BASE_COLUMNS + [TEMPLATE_PREFIX + key for key in keys]
+        parquet = _ParquetEncoder(columns) if fmt == "parquet" else None
+        first = True
+
+        result = await db.stream(catalog_query(status, department_id).execution_options(yield_per=settings.export_batch_size))
+        async for batch in result.partitions():
+            records = [flatten(row, keys, nested_as_text=fmt != "ndjson") for row in batch]
+            if fmt == "csv":
+                yield _encode_csv(records, columns, header=first)
+            elif fmt == "ndjson":
+                yield _encode_ndjson(records)
+            else:
+                yield await run_in_threadpool(parquet.encode, records)
+            first = False
+
+        if fmt == "csv" and first:
+            yield _encode_csv([], columns, header=True)
+        if parquet is not None:
+            yield parquet.close()
@@ -0,0 +1,74 @@
+import difflib
+import re
+import threading
+from collections import OrderedDict
+from app.config import settings
+
+_TOKEN = re.compile(r"\s+|[^\s]+")
+
+def _words(text: str) -> list:
+    # Keep whitespace as tokens so joined segments reproduce the original text
+    return _TOKEN.findall(text)
+
+def word_diff(old: str, new: str) -> list:
+    """[op, old_text, new_text] segments; op is equal/insert/delete/replace.
+
+    Unchanged runs are sent once, as ["equal", text].
+    """
+    a, b = _words(old), _words(new)
+    segments = []
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if op == "equal":
+            segments.append([op, "".join(a[i1:i2])])
+        else:
+            segments.append([op, "".join(a[i1:i2]), "".join(b[j1:j2])])
+    return segments
+
+def diff_template_data(old: dict, new: dict) -> list:
+    """Field-level diff; only changed fields are returned."""
+    old, new = old or {}, new or {}
+    fields = []
+    for key in sorted(set(old) | set(new)):
+        if key not in new:
+            fields.append({"field": key, "change": "removed", "old": old[key]})
+        elif key not in old:
+            fields.append({"field": key, "change": "added", "new": new[key]})
+        elif old[key] != new[key]:
+            field = {"field": key, "change": "changed", "old": old[key], "new": new[key]}
+            if isinstance(old[key], str) and isinstance(new[key], str):
+                # The word segments already carry both texts
+                del field["old"], field["new"]
+                field["words"] = word_diff(old[key], new[key])
+            fields.append(field)
+    return fields
+
+class DiffCache:
+    """Small LRU of computed diffs keyed by the identities of both sides.
+
+    A side is identified by (syllabus id, updated_at) or, for a stored
+    revision, (syllabus id, "rev", number); either changes whenever the
+    content it names could have changed, so entries never go stale.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fields = self._entries.get(key)
+            if fields is not None:
+                self._entries.move_to_end(key)
+            return fields
+
+    def put(self, key, fields: list):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = fields
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+diff_cache = DiffCache(max_entries=settings.diff_cache_max_entries)
@@ -0,0 +1,59 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import TableVersion
+from app.utils.auth import Principal
+
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+async def table_versions(db: AsyncSession, tables: list) -> dict:
+    rows = (await db.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    )).all()
+    return {row.table_name: row.version for row in rows}
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+async def not_modified(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    tables: list,
+    current_user: Optional[Principal] = None,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Optional[Response]:
+    """Conditional GET for a read endpoint backed by ``tables``.
+
+    The weak ETag covers the change counters of ``tables``, the path and
+    query string and the caller's identity, so it changes whenever the
+    response could. Returns a 304 response to send as-is when the client's
+    copy is current; otherwise sets ETag and Cache-Control on ``response``
+    and returns None.
+    """
+    versions = await table_versions(db, tables)
+    etag = weak_etag(
+        request.url.path,
+        request.url.query,
+        current_user.id if current_user else "",
+        current_user.role if current_user else "",
+        *[f"{table}:{versions.get(table, 0)}" for table in sorted(tables)],
+    )
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
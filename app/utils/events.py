@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Channels: "user:<id>" for one user, "department:<id>" for everyone
+# following a department, "all" for admins
+ALL = "all"
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def department_channel(department_id: int) -> str:
+    return f"department:{department_id}"
+
+class Subscription:
+    """Events for a set of channels, buffered up to ``max_pending``.
+
+    A subscriber that falls behind loses its oldest events rather than
+    holding up publishers.
+    """
+
+    def __init__(self, channels: list, max_pending: int):
+        self.channels = list(channels)
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def deliver(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None once ``timeout`` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class InProcessBroker:
+    """Async pub/sub within one process.
+
+    Other backends reuse it for local fan-out and only replace how events
+    reach every process.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._subscriptions = {}
+
+    async def publish(self, channels: list, event: dict):
+        self.deliver(channels, event)
+
+    def deliver(self, channels: list, event: dict):
+        seen = set()
+        for channel in channels:
+            for subscription in self._subscriptions.get(channel, ()):
+                if id(subscription) not in seen:
+                    seen.add(id(subscription))
+                    subscription.deliver(event)
+
+    @asynccontextmanager
+    async def subscribe(self, channels: list):
+        subscription = Subscription(channels, self.max_pending)
+        for channel in subscription.channels:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self) -> int:
+        return len({id(s) for subscribers in self._subscriptions.values() for s in subscribers})
+
+    async def close(self):
+        pass
+
+class RedisBroker(InProcessBroker):
+    """Fans events out across processes through Redis pub/sub.
+
+    Every process publishes to one Redis channel and relays what it
+    receives to its local subscribers, so each uvicorn worker sees every
+    event. Needs the optional ``redis`` package.
+    """
+
+    def __init__(self, url: str, max_pending: int, channel: str = "syllabus-events"):
+        super().__init__(max_pending)
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("EVENT_BROKER_URL needs the redis package: pip install redis") from e
+        self._redis = redis.from_url(url)
+        self._channel = channel
+        self._listener = None
+
+    async def publish(self, channels: list, event: dict):
+        await self._redis.publish(self._channel, json.dumps({"channels": channels, "event": event}))
+
+    @asynccontextmanager
+    async def subscribe(self, channels: list):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with super().subscribe(channels) as subscription:
+            yield subscription
+
+    async def _listen(self):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                    self.deliver(payload["channels"], payload["event"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Dropping malformed event message")
+        finally:
+            await pubsub.close()
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+        await self._redis.close()
+
+def make_broker(url: str, max_pending: int):
+    if not url:
+        return InProcessBroker(max_pending)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url, max_pending)
+    raise ValueError(f"Unsupported EVENT_BROKER_URL: {url}")
+
+event_broker = make_broker(settings.event_broker_url, settings.event_max_pending)
+
+async def publish(channels: list, event: dict):
+    """Publish best effort.
+
+    A broker outage must not fail a write that already committed; clients
+    catch up through /sync.
+    """
+    try:
+        await event_broker.publish(channels, event)
+    except Exception:
+        logger.exception("Failed to publish %s event", event.get("type"))
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+from app.config import settings
+
+class HashingPoolSaturated(Exception):
+    pass
+
+# Worker entry points. The CryptContext cannot be pickled, so each worker
+# process imports its own copy from app.utils.auth.
+
+def _hash(password: str) -> str:
+    from app.utils.auth import pwd_context
+    return pwd_context.hash(password)
+
+def _hash_many(passwords: list) -> list:
+    from app.utils.auth import pwd_context
+    return [pwd_context.hash(password) for password in passwords]
+
+def _verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    from app.utils.auth import pwd_context
+    return pwd_context.verify_and_update(password, password_hash)
+
+class HashingPool:
+    """Runs bcrypt hashing and verification away from the request threadpool.
+
+    Like the PDF render pool, at most ``workers`` operations run at once and
+    at most ``max_queue`` more may wait before callers get HashingPoolSaturated.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def _run(self, fn, *args):
+        capacity = max(self.workers, 1) + self.max_queue
+        with self._lock:
+            if self._in_flight >= capacity:
+                raise HashingPoolSaturated()
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def hash_many(self, passwords: list, chunk_size: int = 8) -> list:
+        """Hash a batch in chunks spread over every worker.
+
+        At most ``workers`` chunks are in flight, each holding one admission
+        slot, so logins queued behind a bulk import wait for one chunk at
+        most rather than the whole batch.
+        """
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        semaphore = asyncio.Semaphore(max(self.workers, 1))
+
+        async def run_chunk(chunk):
+            async with semaphore:
+                return await self._run(_hash_many, chunk)
+
+        results = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks])
+        return [password_hash for chunk in results for password_hash in chunk]
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(_verify_and_update, password, password_hash)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+hashing_pool = HashingPool(workers=settings.password_hash_workers, max_queue=settings.password_hash_max_queue)
@@ -0,0 +1,247 @@
+import heapq
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request-level instrumentation rendered in the Prometheus text format at
+# /metrics. Metrics live in this process only; with several uvicorn workers
+# each one is scraped (or aggregated) separately.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets + (float("inf"),), series[:len(self.buckets)] + [series[-1]]):
+                    lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+def _gauge(name: str, help: str, value) -> list[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+
+REQUEST_LABELS = ("method", "route")
+
+requests_total = Counter("http_requests_total", "HTTP requests by route and status.", REQUEST_LABELS + ("status",))
+request_duration = Histogram("http_request_duration_seconds", "Time from request start until the response is fully sent.", REQUEST_LABELS)
+request_statements = Histogram("http_request_sql_statements", "SQL statements executed per request.", REQUEST_LABELS, STATEMENT_BUCKETS)
+request_sql_duration = Histogram("http_request_sql_seconds", "Time spent in SQL statements per request.", REQUEST_LABELS)
+pdf_render_duration = Histogram("pdf_render_seconds", "PDF render time seen by the download endpoint, including the render pool queue.")
+pdf_cache_lookups = Counter("pdf_cache_lookups_total", "Rendered PDF cache lookups by the download endpoint.", ("result",))
+
+_in_progress = 0
+_in_progress_lock = threading.Lock()
+
+class RequestStats:
+    """SQL work done on behalf of one request.
+
+    Only the ``slow_request_max_queries`` slowest statements are kept, so
+    a request issuing thousands of statements stays cheap to track.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self._slowest = []  # min-heap of (seconds, sequence, statement)
+
+    def add_statement(self, statement: str, seconds: float):
+        self.statements += 1
+        self.sql_seconds += seconds
+        item = (seconds, self.statements, statement)
+        if len(self._slowest) < settings.slow_request_max_queries:
+            heapq.heappush(self._slowest, item)
+        elif self._slowest and seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> list[tuple]:
+        return [(seconds, statement) for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_query_start")
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    stats = _current_request.get()
+    if stats is not None:
+        # Parameters are left out on purpose; they can carry password hashes
+        stats.add_statement(statement, seconds)
+
+def instrument_engine(engine):
+    """Attribute statements run on ``engine`` (sync, or an async engine's
+    ``sync_engine``) to the request being served."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _route_template(scope) -> str:
+    # The path template keeps label cardinality bounded; unmatched paths
+    # (404s, scanners) share one label. The template is rebuilt from the
+    # matched path parameters because an included route's own ``path`` may
+    # lack the router prefix.
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{names[part]}}}" if part in names else part for part in scope["path"].split("/"))
+
+def _log_slow_request(method: str, path: str, status: int, seconds: float, stats: RequestStats):
+    lines = [
+        f"Slow request {method} {path} -> {status} in {seconds:.3f}s "
+        f"({stats.statements} SQL statements, {stats.sql_seconds:.3f}s in SQL)"
+    ]
+    for statement_seconds, statement in stats.slowest():
+        lines.append(f"  {statement_seconds * 1000:8.1f} ms  {' '.join(statement.split())}")
+    logger.warning("\n".join(lines))
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL work per route.
+
+    Durations run until the response body is fully sent, so streaming
+    endpoints (PDF export, the catalog, server-sent events) report their
+    whole transfer time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_progress
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _in_progress_lock:
+            _in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            _current_request.reset(token)
+            with _in_progress_lock:
+                _in_progress -= 1
+            method, route = scope["method"], _route_template(scope)
+            requests_total.inc(method, route, str(status))
+            request_duration.observe(seconds, method, route)
+            request_statements.observe(stats.statements, method, route)
+            request_sql_duration.observe(stats.sql_seconds, method, route)
+            if settings.slow_request_seconds > 0 and seconds >= settings.slow_request_seconds:
+                _log_slow_request(method, scope["path"], status, seconds, stats)
+
+def _threadpool_lines() -> list[str]:
+    # run_in_threadpool and sync dependencies share anyio's default limiter
+    from anyio import to_thread
+    limiter = to_thread.current_default_thread_limiter()
+    return (
+        _gauge("threadpool_tokens_total", "Worker threads available to run_in_threadpool.", limiter.total_tokens)
+        + _gauge("threadpool_tokens_in_use", "Worker threads currently busy.", limiter.borrowed_tokens)
+        + _gauge("threadpool_tasks_waiting", "Calls waiting for a free worker thread.", limiter.statistics().tasks_waiting)
+    )
+
+def _render_pool_lines() -> list[str]:
+    from app.utils.render_pool import render_pool
+    stats = render_pool.stats()
+    lines = (
+        _gauge("pdf_render_pool_workers", "PDF render worker processes.", stats["workers"])
+        + _gauge("pdf_render_pool_in_flight", "PDF renders running or queued.", stats["in_flight"])
+        + _gauge("pdf_render_pool_capacity", "Renders admitted before callers get 503.", max(stats["workers"], 1) + stats["max_queue"])
+    )
+    for key, help in (
+        ("rendered", "PDF renders completed."),
+        ("rejected", "PDF renders rejected because the pool was saturated."),
+        ("failed", "PDF renders that raised."),
+    ):
+        name = f"pdf_render_pool_{key}_total"
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} counter", f"{name} {stats[key]}"]
+    return lines
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    from app.utils.events import event_broker
+    lines = []
+    for metric in (requests_total, request_duration, request_statements, request_sql_duration,
+                   pdf_render_duration, pdf_cache_lookups):
+        lines += metric.render()
+    with _in_progress_lock:
+        in_progress = _in_progress
+    lines += _gauge("http_requests_in_progress", "Requests being served, including open streams.", in_progress)
+    lines += _threadpool_lines()
+    lines += _render_pool_lines()
+    lines += _gauge("event_stream_subscribers", "Open server-sent event streams in this process.", event_broker.subscriber_count())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(sort: str, values: list) -> str:
+    payload = json.dumps({"s": sort, "v": [v.isoformat() if isinstance(v, datetime) else v for v in values]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, columns: list) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["s"] != sort or len(payload["v"]) != len(columns):
+            raise ValueError("cursor does not match sort order")
+        values = []
+        for column, value in zip(columns, payload["v"]):
+            if value is not None and column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_after(columns: list, values: list, descending: bool):
+    # (c1, c2, ...) strictly after (v1, v2, ...) in the sort order, expanded
+    # to OR/AND so it works on backends without row-value comparison
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        past = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, past))
+    return or_(*clauses)
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt,
+    response: Response,
+    columns: list,
+    sort: str,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+    include_total: bool = False,
+    scalars: bool = True,
+    skip: int = 0,
+):
+    """Run ``stmt`` one keyset page at a time.
+
+    ``columns`` must end with a unique column (the primary key) so the order
+    is total. The opaque cursor for the next page is returned in the
+    ``X-Next-Cursor`` header and, when requested, the unpaged row count in
+    ``X-Total-Count``, so list endpoints keep returning plain arrays.
+    With ``scalars=False`` the rows of a multi-column select are returned
+    as-is; each sort column must then be selected under its own key.
+
+    ``skip`` is the offset the endpoints took before they paged by keyset.
+    It is still honoured on a page requested without a cursor, so older
+    clients stepping through ?skip= get the rows they expect; the page also
+    carries the cursor to continue from.
+    """
+    if skip < 0:
+        raise HTTPException(status_code=400, detail="skip must not be negative")
+    if skip and cursor:
+        raise HTTPException(status_code=400, detail="Pass either skip or cursor, not both; follow X-Next-Cursor instead of skip")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        response.headers["X-Total-Count"] = str(total)
+
+    if cursor:
+        stmt = stmt.where(keyset_after(columns, decode_cursor(cursor, sort, columns), descending))
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column in columns]).offset(skip or None).limit(limit + 1)
+    result = await db.execute(stmt)
+    rows = result.scalars().all() if scalars else result.all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+    return rows
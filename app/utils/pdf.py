@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+from typing import Callable, Optional
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from xml.sax.saxutils import escape
+from app.config import settings
+from app.utils.templates import default_template
+
+# Bump whenever the layout below changes so cached renders are not reused
+RENDERER_VERSION = "2"
+
+DEFAULT_LAYOUT = "default"
+
+@dataclass(frozen=True)
+class Field:
+    """One template_data value, skipped when empty unless ``always`` is set.
+
+    ``format`` turns the value into paragraph markup.
+    """
+    key: str
+    label: Optional[str] = None  # rendered as "<b>label:</b> value"
+    default: str = ''
+    format: Callable = lambda value: escape(f"{value}")
+    always: bool = False
+
+@dataclass(frozen=True)
+class Section:
+    """A heading followed by its fields, left out when every field is empty.
+
+    ``combine`` renders the fields as one paragraph split by line breaks.
+    """
+    heading: Optional[str]
+    fields: tuple
+    style: str = 'content'
+    combine: bool = False
+
+def _formatter(field: dict) -> Callable:
+    # Values are escaped so stray markup characters cannot break the build
+    if field["type"] == "choice":
+        choices = field["choices"]
+        if field["show_code"]:
+            return lambda value: escape(f"{value} - {choices.get(value, '')}")
+        return lambda value: escape(f"{choices.get(value, value)}")
+    if field["type"] == "text":
+        return lambda value: escape(f"{value}").replace('\n', '<br/>')
+    return lambda value: escape(f"{value}")
+
+def sections_from_definition(definition: dict) -> tuple:
+    """Section table for a template definition (TemplateDefinition JSON)."""
+    fields = {field["key"]: field for field in definition["fields"]}
+    return tuple(
+        Section(
+            section["heading"],
+            tuple(
+                Field(field["key"], field["label"], field["default"], _formatter(fields[field["key"]]), field["always"])
+                for field in section["fields"]
+            ),
+            style=section["style"],
+            combine=section["combine"],
+        )
+        for section in definition["sections"]
+    )
+
+SECTIONS = sections_from_definition(default_template.definition)
+
+FOOTER = "This syllabus is subject to change at the instructor's discretion.<br/>Last updated: {date}"
+
+# Built once per process; ParagraphStyle objects are only read while rendering
+_sample_styles = getSampleStyleSheet()
+
+class Layout:
+    """Sections and styles compiled once, then shared by every render."""
+
+    def __init__(self, name: str, sections: tuple = SECTIONS, title_size: int = 18, heading_size: int = 14,
+                 content_size: Optional[int] = None, section_gap: int = 12, footer: str = FOOTER):
+        self.name = name
+        self.section_gap = section_gap
+        self.footer = footer
+        content_style = _sample_styles['Normal']
+        if content_size is not None:
+            content_style = ParagraphStyle(f'{name}-Content', parent=content_style, fontSize=content_size, leading=content_size * 1.2)
+        self.styles = {
+            'title': ParagraphStyle(
+                'Title',
+                parent=_sample_styles['Heading1'],
+                fontSize=title_size,
+                spaceAfter=30 * title_size // 18,
+                alignment=1  # Center alignment
+            ),
+            'heading': ParagraphStyle(
+                'Heading',
+                parent=_sample_styles['Heading2'],
+                fontSize=heading_size,
+                spaceAfter=12 * heading_size // 14
+            ),
+            'content': content_style,
+            'footer': _sample_styles['Italic'],
+        }
+        # (heading, style, combine, [(key, default, prefix, format, always)]);
+        # headings and labels may come from department templates, so escape them
+        self.sections = [
+            (
+                escape(section.heading) if section.heading else None,
+                self.styles[section.style],
+                section.combine,
+                [
+                    (field.key, field.default, f"<b>{escape(field.label)}:</b> " if field.label else "", field.format, field.always)
+                    for field in section.fields
+                ],
+            )
+            for section in sections
+        ]
+
+    def story(self, template_data: dict, last_updated: datetime) -> list:
+        story = []
+        heading_style = self.styles['heading']
+        for heading, style, combine, fields in self.sections:
+            lines = []
+            for key, default, prefix, format, always in fields:
+                value = template_data.get(key, default)
+                if value or always:
+                    lines.append(prefix + format(value))
+            if not lines:
+                continue
+            if heading:
+                story.append(Paragraph(heading, heading_style))
+            if combine:
+                story.append(Paragraph("<br/>".join(lines), style))
+            else:
+                story.extend(Paragraph(line, style) for line in lines)
+            story.append(Spacer(1, self.section_gap))
+
+        story.append(Spacer(1, self.section_gap * 2))
+        story.append(Paragraph(self.footer.format(date=last_updated.strftime('%Y-%m-%d')), self.styles['footer']))
+        return story
+
+_layouts = {}
+_layout_options = {}
+# (layout name, template key) -> Layout over a department template's sections
+_template_layouts = {}
+MAX_TEMPLATE_LAYOUTS = 256
+
+def register_layout(name: str, **options) -> Layout:
+    """Compile and register a layout; renders pick it by name."""
+    _layout_options[name] = options
+    layout = _layouts[name] = Layout(name, **options)
+    return layout
+
+def get_layout(name: Optional[str], template_key: Optional[str] = None, template: Optional[dict] = None) -> Layout:
+    """The named layout, over a department template's sections when given.
+
+    Template layouts are compiled on first use and kept per template
+    revision, so render workers pay the setup cost once per revision.
+    """
+    if name not in _layouts:
+        name = DEFAULT_LAYOUT
+    if template_key is None:
+        return _layouts[name]
+    layout = _template_layouts.get((name, template_key))
+    if layout is None:
+        if len(_template_layouts) >= MAX_TEMPLATE_LAYOUTS:
+            del _template_layouts[next(iter(_template_layouts))]
+        layout = _template_layouts[(name, template_key)] = Layout(
+            name, sections_from_definition(template), **_layout_options[name]
+        )
+    return layout
+
+def layout_for_department(department_id: Optional[int], template=None) -> str:
+    """Layout name for a department: its template's choice, else
+    PDF_DEPARTMENT_LAYOUTS, else the default."""
+    name = template.layout if template is not None and template.layout else None
+    if name is None and department_id is not None:
+        name = settings.pdf_department_layouts.get(department_id)
+    return name if name in _layouts else DEFAULT_LAYOUT
+
+register_layout(DEFAULT_LAYOUT)
+# Smaller type and tighter spacing for departments that print booklets
+register_layout("compact", title_size=14, heading_size=11, content_size=9, section_gap=6)
+
+def render_syllabus_pdf(template_data: dict, last_updated: Optional[datetime] = None, layout: str = DEFAULT_LAYOUT,
+                        template_key: Optional[str] = None, template: Optional[dict] = None) -> bytes:
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc.build(get_layout(layout, template_key, template).story(template_data or {}, last_updated or datetime.now()))
+    return buffer.getvalue()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+from app.utils.pdf import DEFAULT_LAYOUT, RENDERER_VERSION
+
+class PDFCache:
+    """Two-tier (memory + disk) cache of rendered syllabus PDFs.
+
+    Entries are content addressed: the key is a hash of everything that
+    affects the rendered bytes, so a stale entry can never be served for
+    changed data. Invalidation by syllabus id only reclaims space early.
+    """
+
+    def __init__(self, directory: str, max_memory_bytes: int, max_disk_bytes: int):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (syllabus_id, pdf bytes)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(syllabus, layout: str = DEFAULT_LAYOUT, template_key: Optional[str] = None) -> str:
+        payload = json.dumps(
+            {
+                "id": syllabus.id,
+                "version": syllabus.version,
+                "updated_at": syllabus.updated_at.isoformat() if syllabus.updated_at else None,
+                "template_data": syllabus.template_data or {},
+                "renderer": RENDERER_VERSION,
+                "layout": layout,
+                "template": template_key,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def etag_for(key: str) -> str:
+        return f'"{key}"'
+
+    def _path(self, syllabus_id: int, key: str) -> str:
+        return os.path.join(self.directory, f"{syllabus_id}-{key}.pdf")
+
+    def get(self, syllabus_id: int, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[1]
+
+        path = self._path(syllabus_id, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # Touch so disk eviction treats the file as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._remember(syllabus_id, key, data)
+        return data
+
+    def put(self, syllabus_id: int, key: str, data: bytes):
+        self._remember(syllabus_id, key, data)
+        if self.max_disk_bytes <= 0:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(syllabus_id, key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best effort; the memory tier still holds the render
+            return
+        self._evict_disk()
+
+    def invalidate(self, syllabus_id: int):
+        with self._lock:
+            for key in [k for k, (sid, _) in self._memory.items() if sid == syllabus_id]:
+                _, data = self._memory.pop(key)
+                self._memory_bytes -= len(data)
+        prefix = f"{syllabus_id}-"
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(prefix) and name.endswith(".pdf"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def _remember(self, syllabus_id: int, key: str, data: bytes):
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[1])
+            self._memory[key] = (syllabus_id, data)
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pdf"):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError:
+            return
+        if total <= self.max_disk_bytes:
+            return
+        # Least recently used first
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+pdf_cache = PDFCache(
+    directory=settings.pdf_cache_dir,
+    max_memory_bytes=settings.pdf_cache_memory_bytes,
+    max_disk_bytes=settings.pdf_cache_disk_bytes,
+)
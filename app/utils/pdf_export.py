@@ -0,0 +1,103 @@
+import asyncio
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.utils.pdf import layout_for_department
+from app.utils.pdf_cache import pdf_cache
+from app.utils.render_pool import render_pool, RenderPoolSaturated
+from app.utils.templates import CompiledTemplate, default_template
+
+# Seconds to back off when the render pool is saturated by other traffic
+SATURATED_BACKOFF = 0.5
+
+@dataclass
+class ExportEntry:
+    id: int
+    version: int
+    updated_at: Optional[datetime]
+    template_data: dict
+    filename: str
+    layout: str
+    template: CompiledTemplate
+
+def export_entry(syllabus, templates: dict) -> ExportEntry:
+    """Snapshot the row so the stream does not depend on the request's
+    session; ``templates`` maps department ids to their own templates."""
+    code = syllabus.subject.code if syllabus.subject and syllabus.subject.code else "syllabus"
+    code = re.sub(r"[^A-Za-z0-9_.-]+", "_", code)
+    department_id = syllabus.subject.department_id if syllabus.subject else None
+    template = templates.get(department_id, default_template)
+    return ExportEntry(
+        id=syllabus.id,
+        version=syllabus.version,
+        updated_at=syllabus.updated_at,
+        template_data=syllabus.template_data or {},
+        filename=f"{code}-v{syllabus.version}-{syllabus.id}.pdf",
+        layout=layout_for_department(department_id, template),
+        template=template,
+    )
+
+class _ChunkWriter:
+    # Write-only sink for ZipFile; zipfile falls back to data descriptors
+    # because there is no seek/tell, so nothing is ever rewritten in place
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def _render_entry(entry: ExportEntry):
+    key = pdf_cache.make_key(entry, entry.layout, entry.template.key)
+    pdf = await run_in_threadpool(pdf_cache.get, entry.id, key)
+    if pdf is None:
+        while True:
+            try:
+                pdf = await render_pool.render(entry.template_data, entry.updated_at, entry.layout, entry.template)
+                break
+            except RenderPoolSaturated:
+                await asyncio.sleep(SATURATED_BACKOFF)
+        await run_in_threadpool(pdf_cache.put, entry.id, key, pdf)
+    return entry, pdf
+
+async def stream_pdf_zip(entries: list[ExportEntry]) -> AsyncIterator[bytes]:
+    # Only a render-pool-sized window of PDFs is held in memory at a time and
+    # each one is written to the archive as soon as it finishes
+    window = max(render_pool.workers, 1)
+    sink = _ChunkWriter()
+    pending = set()
+    remaining = iter(entries)
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            while True:
+                while len(pending) < window:
+                    entry = next(remaining, None)
+                    if entry is None:
+                        break
+                    pending.add(asyncio.ensure_future(_render_entry(entry)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    entry, pdf = task.result()
+                    archive.writestr(entry.filename, pdf)
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    finally:
+        for task in pending:
+            task.cancel()
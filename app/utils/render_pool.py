@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.utils.pdf import DEFAULT_LAYOUT, render_syllabus_pdf
+
+class RenderPoolSaturated(Exception):
+    pass
+
+def _render_job(payload: str, submitted_at: float):
+    # Runs inside the worker process, so it only gets plain JSON in and bytes out
+    started_at = time.time()
+    data = json.loads(payload)
+    last_updated = datetime.fromisoformat(data["last_updated"]) if data["last_updated"] else None
+    pdf = render_syllabus_pdf(data["template_data"], last_updated, data["layout"], data["template_key"], data["template"])
+    return pdf, started_at - submitted_at, time.time() - started_at
+
+class RenderPool:
+    """Runs PDF renders outside the request threadpool with admission control.
+
+    At most ``workers`` renders run at once and at most ``max_queue`` more may
+    wait; anything beyond that is rejected with RenderPoolSaturated so the
+    caller can answer 503 instead of piling up work.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rendered = 0
+        self._rejected = 0
+        self._failed = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._render_time_total = 0.0
+        self._render_time_max = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    # Local worker queue for development and single-process setups
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+            return self._executor
+
+    def _admit(self):
+        capacity = max(self.workers, 1) + self.max_queue
+        with self._lock:
+            if self._in_flight >= capacity:
+                self._rejected += 1
+                raise RenderPoolSaturated()
+            self._in_flight += 1
+
+    async def render(self, template_data: dict, last_updated: Optional[datetime] = None, layout: str = DEFAULT_LAYOUT, template=None) -> bytes:
+        """Render in a worker; ``template`` is the department's CompiledTemplate,
+        None or the default template for the built-in sections."""
+        self._admit()
+        try:
+            payload = json.dumps({
+                "template_data": template_data or {},
+                "last_updated": last_updated.isoformat() if last_updated else None,
+                "layout": layout,
+                # Workers compile a template's layout once per template key
+                "template_key": template.key if template is not None else None,
+                "template": template.definition if template is not None and template.key else None,
+            })
+            loop = asyncio.get_running_loop()
+            try:
+                pdf, queue_wait, render_time = await loop.run_in_executor(
+                    self._get_executor(), _render_job, payload, time.time()
+                )
+            except Exception:
+                with self._lock:
+                    self._failed += 1
+                raise
+            with self._lock:
+                self._rendered += 1
+                self._queue_wait_total += queue_wait
+                self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+                self._render_time_total += render_time
+                self._render_time_max = max(self._render_time_max, render_time)
+            return pdf
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            rendered = self._rendered or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rendered": self._rendered,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "queue_wait_avg_seconds": self._queue_wait_total / rendered,
+                "queue_wait_max_seconds": self._queue_wait_max,
+                "render_time_avg_seconds": self._render_time_total / rendered,
+                "render_time_max_seconds": self._render_time_max,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+render_pool = RenderPool(workers=settings.pdf_render_workers, max_queue=settings.pdf_render_max_queue)
@@ -0,0 +1,110 @@
+import html
+import re
+from typing import Optional
+from sqlalchemy import Float, Integer, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Full-text search over syllabus template_data. The course title and code
+# form a heavily weighted ``title`` column; every other text value in the
+# template (description, objectives, textbooks, custom fields...) goes into
+# ``body``. The index is kept in step with syllabi inside the same session
+# as the write, so it commits or rolls back with it.
+
+TITLE_FIELDS = ("courseTitle", "courseCode")
+MARK_START, MARK_END = "<mark>", "</mark>"
+# Highlight delimiters inside SQL: private-use characters, stripped from
+# indexed text, that become MARK_START/MARK_END once the snippet is escaped
+SEL_START, SEL_END = "\ue000", "\ue001"
+_STRIP_SEL = str.maketrans("", "", SEL_START + SEL_END)
+
+_QUERY_TERM = re.compile(r'"([^"]+)"|(\w+)', re.UNICODE)
+
+def _flatten(value) -> list:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, dict):
+        return [part for item in value.values() for part in _flatten(item)]
+    if isinstance(value, (list, tuple)):
+        return [part for item in value for part in _flatten(item)]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return [str(value)]
+    return []
+
+def search_document(template_data: Optional[dict]) -> dict:
+    """Split template_data into the indexed ``title`` and ``body`` texts."""
+    template_data = template_data or {}
+    title = [part for key in TITLE_FIELDS for part in _flatten(template_data.get(key))]
+    body = [part for key, value in template_data.items() if key not in TITLE_FIELDS for part in _flatten(value)]
+    return {"title": " ".join(title).translate(_STRIP_SEL), "body": "\n".join(body).translate(_STRIP_SEL)}
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a search_hits snippet, then mark its highlighted terms."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SEL_START, MARK_START).replace(SEL_END, MARK_END)
+
+def fts5_query(q: str) -> str:
+    """Quote user input as FTS5 terms and phrases, ANDed together.
+
+    Quoting keeps operators and stray punctuation in the input from being
+    parsed as FTS5 syntax.
+    """
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(q):
+        term = " ".join(re.findall(r"\w+", phrase, re.UNICODE)) if phrase else word
+        if term:
+            terms.append(f'"{term}"')
+    return " ".join(terms)
+
+async def index_syllabus(db: AsyncSession, syllabus_id: int, template_data: Optional[dict]):
+    """Replace the index entry of one syllabus (caller commits)."""
+    document = search_document(template_data)
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(
+            "INSERT INTO syllabus_search (syllabus_id, title, body) VALUES (:id, :title, :body) "
+            "ON CONFLICT (syllabus_id) DO UPDATE SET title = excluded.title, body = excluded.body"
+        ), {"id": syllabus_id, **document})
+    else:
+        await db.execute(text("DELETE FROM syllabus_search WHERE rowid = :id"), {"id": syllabus_id})
+        await db.execute(text(
+            "INSERT INTO syllabus_search (rowid, title, body) VALUES (:id, :title, :body)"
+        ), {"id": syllabus_id, **document})
+
+async def unindex_syllabus(db: AsyncSession, syllabus_id: int):
+    # Postgres drops the row through its ON DELETE CASCADE foreign key
+    if db.get_bind().dialect.name != "postgresql":
+        await db.execute(text("DELETE FROM syllabus_search WHERE rowid = :id"), {"id": syllabus_id})
+
+def search_hits(dialect: str, q: str):
+    """Subquery of (syllabus_id, rank, snippet) rows matching ``q``.
+
+    Snippets are raw text with SEL_START/SEL_END around matches; pass them
+    through highlight() before returning them to clients.
+
+    Returns (subquery, descending): better matches sort first when ordering
+    by rank in the given direction. The subquery is None when ``q`` holds
+    no searchable terms.
+    """
+    if dialect == "postgresql":
+        stmt = text(
+            "SELECT s.syllabus_id AS syllabus_id, "
+            "ts_rank(s.document, query) AS rank, "
+            "ts_headline('english', s.title || ' ' || s.body, query, "
+            f"'StartSel={SEL_START}, StopSel={SEL_END}, MaxWords=30, MinWords=10, MaxFragments=2') AS snippet "
+            "FROM syllabus_search s, websearch_to_tsquery('english', :q) query "
+            "WHERE s.document @@ query"
+        ).bindparams(q=q)
+        descending = True
+    else:
+        match = fts5_query(q)
+        if not match:
+            return None, False
+        # bm25() is lower for better matches; the title counts ten times the body
+        stmt = text(
+            "SELECT rowid AS syllabus_id, "
+            "bm25(syllabus_search, 10.0, 1.0) AS rank, "
+            f"snippet(syllabus_search, -1, '{SEL_START}', '{SEL_END}', '…', 16) AS snippet "
+            "FROM syllabus_search WHERE syllabus_search MATCH :q"
+        ).bindparams(q=match)
+        descending = False
+    return stmt.columns(syllabus_id=Integer, rank=Float, snippet=String).subquery("hits"), descending
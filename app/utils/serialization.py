@@ -0,0 +1,38 @@
+import json
+from datetime import date
+from fastapi import Response
+
+# orjson is optional; without it the standard library encoder produces the
+# same JSON, only slower
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    # datetime is a date; both encode like Pydantic does, as ISO 8601
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+class JSONBytesResponse(Response):
+    """JSON response for content that is already plain dicts and lists.
+
+    Returning it from an endpoint skips the response_model round trip
+    (validating every item, then encoding it), which dominates large list
+    responses built from trusted database rows.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def json_response(content, response: Response) -> JSONBytesResponse:
+    """``content`` as a JSONBytesResponse, keeping the headers the endpoint
+    already set on its injected ``response`` (ETag, cursors, totals)."""
+    return JSONBytesResponse(content, headers=response.headers)
@@ -0,0 +1,57 @@
+import threading
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Subject, SyllabusTemplate
+from app.utils.templates import CompiledTemplate, compile_template, default_template
+
+class TemplateRegistry:
+    """Department templates compiled once per revision.
+
+    Callers look a template up by its (id, version), usually joined into a
+    query they run anyway; the definition is only fetched and compiled when
+    this process has not seen that revision yet.
+    """
+
+    def __init__(self):
+        self._compiled = {}  # template id -> CompiledTemplate of its latest seen version
+        self._lock = threading.Lock()
+
+    async def get(self, db: AsyncSession, template_id: Optional[int], version: Optional[int]) -> CompiledTemplate:
+        if template_id is None:
+            return default_template
+        with self._lock:
+            compiled = self._compiled.get(template_id)
+        if compiled is not None and compiled.key == f"{template_id}.{version}":
+            return compiled
+        row = (await db.execute(
+            select(SyllabusTemplate.version, SyllabusTemplate.definition).where(SyllabusTemplate.id == template_id)
+        )).first()
+        if row is None:
+            # Deleted since the caller read its id
+            return default_template
+        compiled = compile_template(row.definition, f"{template_id}.{row.version}")
+        with self._lock:
+            self._compiled[template_id] = compiled
+        return compiled
+
+    async def for_subject(self, db: AsyncSession, subject_id: int) -> CompiledTemplate:
+        row = (await db.execute(
+            select(SyllabusTemplate.id, SyllabusTemplate.version)
+            .select_from(Subject)
+            .join(SyllabusTemplate, SyllabusTemplate.department_id == Subject.department_id)
+            .where(Subject.id == subject_id)
+        )).first()
+        return await self.get(db, *row) if row else default_template
+
+    async def for_departments(self, db: AsyncSession, department_ids: set) -> dict:
+        """Department id -> template for those that have their own."""
+        if not department_ids:
+            return {}
+        rows = (await db.execute(
+            select(SyllabusTemplate.department_id, SyllabusTemplate.id, SyllabusTemplate.version)
+            .where(SyllabusTemplate.department_id.in_(department_ids))
+        )).all()
+        return {department_id: await self.get(db, id, version) for department_id, id, version in rows}
+
+template_registry = TemplateRegistry()
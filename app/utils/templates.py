@@ -0,0 +1,208 @@
+import json
+from typing import Annotated, Any, Literal, Optional
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import (
+    BaseModel, BeforeValidator, ConfigDict, Field, StringConstraints, ValidationError, create_model, model_validator,
+)
+from pydantic_core import PydanticCustomError
+from app.config import settings
+
+# Syllabus templates: which template_data fields a department's syllabi
+# have, their types and limits, and how the PDF lays them out. The same
+# definition is served to the frontend form. A department without its own
+# template uses DEFAULT_TEMPLATE.
+
+FIELD_TYPES = ("string", "text", "number", "choice", "email")
+DEFAULT_MAX_LENGTHS = {"string": 500, "text": 20000, "email": 254, "choice": None, "number": None}
+DEFAULT_MAX_BYTES = 64 * 1024
+
+class TemplateField(BaseModel):
+    key: str = Field(pattern=r"^[A-Za-z][A-Za-z0-9_]{0,63}$")
+    label: str = Field(max_length=200)
+    type: Literal[FIELD_TYPES] = "string"
+    required: bool = False
+    max_length: Optional[int] = Field(None, ge=1, le=1_000_000)  # per type default when unset
+    min: Optional[float] = None  # number fields
+    max: Optional[float] = None
+    choices: Optional[dict[str, str]] = None  # value -> label, choice fields
+    show_code: bool = False  # render a choice as "value - label"
+    # Form hints; the API ignores them
+    group: Optional[str] = Field(None, max_length=200)
+    form: bool = True  # False for values the frontend derives from other fields
+    readonly: bool = False
+    rows: Optional[int] = Field(None, ge=1, le=50)
+    placeholder: Optional[str] = Field(None, max_length=500)
+    help: Optional[str] = Field(None, max_length=500)
+
+    @model_validator(mode="after")
+    def check_type_options(self):
+        if self.type == "choice" and not self.choices:
+            raise ValueError(f"Choice field {self.key} needs choices")
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError(f"Field {self.key} has min above max")
+        return self
+
+class SectionField(BaseModel):
+    key: str
+    label: Optional[str] = Field(None, max_length=200)  # rendered as "<b>label:</b> value"
+    default: str = Field("", max_length=500)
+    always: bool = False  # render even when empty
+
+class TemplateSection(BaseModel):
+    heading: Optional[str] = Field(None, max_length=200)
+    style: Literal["title", "content"] = "content"
+    combine: bool = False  # one paragraph, fields split by line breaks
+    required: bool = False  # at least one of the fields must be filled in
+    fields: list[SectionField] = Field(min_length=1, max_length=50)
+
+class TemplateDefinition(BaseModel):
+    max_bytes: int = Field(DEFAULT_MAX_BYTES, ge=1024)  # encoded template_data
+    extra: Literal["allow", "forbid"] = "allow"  # keys the template does not define
+    layout: Optional[str] = None  # PDF layout; unset follows PDF_DEPARTMENT_LAYOUTS
+    fields: list[TemplateField] = Field(min_length=1, max_length=200)
+    sections: list[TemplateSection] = Field(max_length=100)
+
+    @model_validator(mode="after")
+    def check_references(self):
+        if self.max_bytes > settings.template_max_bytes:
+            raise ValueError(f"max_bytes may be at most {settings.template_max_bytes}")
+        keys = [field.key for field in self.fields]
+        duplicates = sorted({key for key in keys if keys.count(key) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate fields: {', '.join(duplicates)}")
+        unknown = sorted({field.key for section in self.sections for field in section.fields} - set(keys))
+        if unknown:
+            raise ValueError(f"Sections use undefined fields: {', '.join(unknown)}")
+        return self
+
+def _blank_to_none(value):
+    # The form sends "" for fields left empty
+    return None if value == "" else value
+
+def _required(value):
+    if value is None:
+        raise PydanticCustomError("missing", "Field required")
+    return value
+
+def _annotation(field: TemplateField):
+    if field.type == "number":
+        annotation = Annotated[float, Field(ge=field.min, le=field.max)]
+    elif field.type == "choice":
+        annotation = Literal[tuple(field.choices)]
+    else:
+        max_length = field.max_length or DEFAULT_MAX_LENGTHS[field.type]
+        pattern = r"^[^@\s]+@[^@\s]+$" if field.type == "email" else None
+        annotation = Annotated[str, StringConstraints(max_length=max_length, pattern=pattern)]
+    if field.required:
+        return Annotated[annotation, BeforeValidator(_required), BeforeValidator(_blank_to_none), Field(alias=field.key)], ...
+    return Annotated[Optional[annotation], BeforeValidator(_blank_to_none), Field(alias=field.key)], None
+
+class CompiledTemplate:
+    """A definition compiled once into a Pydantic model for template_data.
+
+    ``key`` identifies the stored template revision (None for the default
+    template); PDF renders and their cache entries are keyed by it.
+    """
+
+    def __init__(self, definition: TemplateDefinition, key: Optional[str] = None):
+        self.key = key
+        self.definition = definition.model_dump(mode="json")
+        self.layout = definition.layout
+        self.max_bytes = definition.max_bytes
+        # Attributes are numbered and aliased to the keys, so a key such as
+        # model_config or json cannot clash with BaseModel's own names
+        self.model = create_model(
+            f"TemplateData_{key or 'default'}".replace(".", "_"),
+            __config__=ConfigDict(extra=definition.extra),
+            **{f"field_{index}": _annotation(field) for index, field in enumerate(definition.fields)},
+        )
+        self.required_sections = [
+            (section.heading or ", ".join(field.key for field in section.fields), [field.key for field in section.fields])
+            for section in definition.sections if section.required
+        ]
+
+    def validate(self, template_data: dict):
+        """Raise 413 for oversized data and 422 for data the template rejects."""
+        size = len(json.dumps(template_data, separators=(",", ":"), default=str))
+        if size > self.max_bytes:
+            raise HTTPException(status_code=413, detail=f"template_data is {size} bytes; this template allows {self.max_bytes}")
+        errors = []
+        try:
+            self.model.model_validate(template_data)
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+        for heading, keys in self.required_sections:
+            if not any(template_data.get(key) not in (None, "") for key in keys):
+                errors.append({"type": "missing", "loc": (), "msg": f"Section {heading} needs at least one of: {', '.join(keys)}", "input": None})
+        if errors:
+            raise RequestValidationError([{**error, "loc": ("body", "template_data", *error["loc"])} for error in errors])
+
+def compile_template(definition: Any, key: Optional[str] = None) -> CompiledTemplate:
+    return CompiledTemplate(TemplateDefinition.model_validate(definition), key)
+
+def _text(key: str, label: str, group: str, rows: int = 2, **options) -> dict:
+    return {"key": key, "label": label, "type": "text", "group": group, "rows": rows, **options}
+
+# Mirrors the original form and PDF. Nothing is required, so every client
+# that saved syllabi before templates existed keeps working.
+DEFAULT_TEMPLATE = {
+    "fields": [
+        {"key": "courseTitle", "label": "Course Title", "group": "Course Information"},
+        {"key": "courseCode", "label": "Course Code", "max_length": 50, "group": "Course Information"},
+        {"key": "instructor", "label": "Instructor Name", "group": "Course Information", "readonly": True},
+        {"key": "email", "label": "Email", "type": "email", "group": "Course Information", "readonly": True},
+        _text("officeHours", "Office Hours", "Course Information", max_length=1000),
+        {"key": "typology", "label": "Subject Typology", "type": "choice", "group": "Course Information", "show_code": True,
+         "choices": {"A": "Basic", "B": "Intermediate", "C": "Advanced", "D": "Specialized", "E": "Research", "F": "Practical"}},
+        {"key": "type", "label": "Subject Type", "type": "choice", "group": "Course Information",
+         "choices": {"compulsory": "Compulsory", "optional": "Optional"}},
+        {"key": "credits", "label": "Credits", "type": "number", "min": 0, "max": 100, "group": "Course Information"},
+        {"key": "year", "label": "Year", "max_length": 20, "group": "Course Details", "placeholder": "e.g., 2024"},
+        {"key": "semester", "label": "Semester", "max_length": 50, "group": "Course Details", "placeholder": "e.g., Fall"},
+        _text("additionalDescription", "Course Description", "Course Details", placeholder="Additional course description details"),
+        # Built by the form from year, semester and the description above
+        _text("courseDescription", "Course Description", "Course Details", form=False),
+        _text("learningObjectives", "Learning Objectives", "Course Details", rows=3),
+        _text("prerequisites", "Prerequisites", "Course Details"),
+        _text("textbooks", "Required Textbooks/Materials", "Additional Information", rows=3),
+        {"key": "assignmentsPercent", "label": "Assignments (%)", "type": "number", "min": 0, "max": 100, "group": "Grading Policy (Percentages)"},
+        {"key": "midtermPercent", "label": "Midterm (%)", "type": "number", "min": 0, "max": 100, "group": "Grading Policy (Percentages)"},
+        {"key": "finalPercent", "label": "Final Exam (%)", "type": "number", "min": 0, "max": 100, "group": "Grading Policy (Percentages)"},
+        {"key": "otherPercent", "label": "Other (%)", "type": "number", "min": 0, "max": 100, "group": "Grading Policy (Percentages)",
+         "help": "Participation, quizzes, etc."},
+        # Built by the form from the percentages above
+        _text("gradingPolicy", "Grading Policy", "Grading Policy (Percentages)", form=False),
+        _text("attendancePolicy", "Attendance Policy", "Additional Information"),
+        _text("academicIntegrity", "Academic Integrity Policy", "Additional Information"),
+        _text("schedule", "Course Schedule/Important Dates", "Additional Information", rows=4,
+              placeholder="Week 1: Introduction\nWeek 2: Basic Concepts\netc."),
+    ],
+    "sections": [
+        {"style": "title", "combine": True, "fields": [
+            {"key": "courseTitle", "default": "Course Title", "always": True},
+            {"key": "courseCode", "default": "Course Code", "always": True},
+        ]},
+        {"heading": "Instructor Information", "fields": [
+            {"key": "instructor", "label": "Name", "default": "Instructor Name", "always": True},
+            {"key": "email", "label": "Email"},
+            {"key": "officeHours", "label": "Office Hours"},
+        ]},
+        {"heading": "Subject Information", "fields": [
+            {"key": "typology", "label": "Typology"},
+            {"key": "type", "label": "Type"},
+        ]},
+        {"heading": "Course Description", "fields": [{"key": "courseDescription"}]},
+        {"heading": "Learning Objectives", "fields": [{"key": "learningObjectives"}]},
+        {"heading": "Prerequisites", "fields": [{"key": "prerequisites"}]},
+        {"heading": "Required Materials", "fields": [{"key": "textbooks"}]},
+        {"heading": "Grading Policy", "fields": [{"key": "gradingPolicy"}]},
+        {"heading": "Course Policies", "fields": [
+            {"key": "attendancePolicy", "label": "Attendance"},
+            {"key": "academicIntegrity", "label": "Academic Integrity"},
+        ]},
+        {"heading": "Course Schedule", "fields": [{"key": "schedule"}]},
+    ],
+}
+
+default_template = compile_template(DEFAULT_TEMPLATE)
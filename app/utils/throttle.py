@@ -0,0 +1,45 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+class SlidingWindowThrottle:
+    """Counts events per key over a sliding time window."""
+
+    def __init__(self, max_events: int, window_seconds: int, max_keys: int = 100000):
+        self.max_events = max_events
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._events = {}  # key -> deque of monotonic timestamps
+        self._lock = threading.Lock()
+
+    def _prune(self, events: deque, now: float):
+        while events and events[0] <= now - self.window_seconds:
+            events.popleft()
+
+    def retry_after(self, key: str) -> Optional[int]:
+        """Seconds until ``key`` may try again, or None if it is not throttled."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return None
+            self._prune(events, now)
+            if len(events) < self.max_events:
+                return None
+            return max(1, int(events[0] + self.window_seconds - now) + 1)
+
+    def hit(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                if len(self._events) >= self.max_keys:
+                    self._events.clear()
+                events = self._events[key] = deque()
+            self._prune(events, now)
+            events.append(now)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._events.pop(key, None)
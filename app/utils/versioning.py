@@ -0,0 +1,133 @@
+import json
+import zlib
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.models import SyllabusVersion
+
+# Revision storage for syllabus template_data. Every
+# ``version_snapshot_interval``-th revision is a full snapshot and the ones
+# in between are RFC 6902 JSON patches against the previous revision, so
+# rebuilding any revision applies at most interval - 1 patches.
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def make_patch(old: dict, new: dict, path: str = "") -> list:
+    """JSON patch (add/remove/replace ops) turning ``old`` into ``new``."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        pointer = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(old[key], dict) and isinstance(value, dict):
+            ops.extend(make_patch(old[key], value, pointer))
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+def apply_patch(doc: dict, ops: list) -> dict:
+    doc = json.loads(json.dumps(doc))
+    for op in ops:
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        target = doc
+        for token in tokens[:-1]:
+            target = target[token]
+        if op["op"] == "remove":
+            target.pop(tokens[-1], None)
+        elif op["op"] in ("add", "replace"):
+            target[tokens[-1]] = op["value"]
+        else:
+            raise ValueError(f"Unsupported patch op: {op['op']}")
+    return doc
+
+def encode_body(body) -> tuple:
+    """Return (data, payload): the JSON body, or its zlib compression."""
+    raw = json.dumps(body, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    if settings.version_compress and len(raw) >= settings.version_compress_min_bytes:
+        return None, zlib.compress(raw)
+    return body, None
+
+def decode_body(row: SyllabusVersion):
+    if row.payload is not None:
+        return json.loads(zlib.decompress(row.payload))
+    return row.data
+
+REVISION_ATTEMPTS = 10
+
+def next_revision(syllabus_id: int):
+    return (
+        select(func.coalesce(func.max(SyllabusVersion.version), 0) + 1)
+        .where(SyllabusVersion.syllabus_id == syllabus_id)
+        .scalar_subquery()
+    )
+
+async def record_revision(db: AsyncSession, syllabus_id: int, previous: Optional[dict], current: dict) -> SyllabusVersion:
+    """Add the next revision of a syllabus to the session (caller commits).
+
+    Callers pass ``previous`` as read under a lock on the syllabus row, so
+    a delta against it is the true successor of the latest revision. Each
+    attempt runs in a savepoint; if another writer takes the number anyway,
+    the revision is stored as a snapshot numbered by the INSERT itself,
+    which is correct whatever came before it.
+    """
+    latest = await db.scalar(
+        select(func.max(SyllabusVersion.version)).where(SyllabusVersion.syllabus_id == syllabus_id)
+    )
+    revision = (latest or 0) + 1
+    current = current or {}
+    delta = previous is not None and latest is not None and (revision - 1) % settings.version_snapshot_interval != 0
+    for _ in range(REVISION_ATTEMPTS):
+        if delta:
+            # Only valid as exactly the revision after ``latest``
+            kind, body, version = DELTA, make_patch(previous, current), revision
+        else:
+            kind, body, version = SNAPSHOT, current, next_revision(syllabus_id)
+        data, payload = encode_body(body)
+        row = SyllabusVersion(syllabus_id=syllabus_id, version=version, kind=kind, data=data, payload=payload)
+        try:
+            async with db.begin_nested():
+                db.add(row)
+        except IntegrityError:
+            delta = False
+            continue
+        if kind == SNAPSHOT:
+            await db.refresh(row, ["version"])
+        return row
+    raise HTTPException(status_code=409, detail="Too many concurrent revisions of this syllabus, please retry")
+
+async def reconstruct(db: AsyncSession, syllabus_id: int, revision: int) -> Optional[dict]:
+    snapshot_version = await db.scalar(
+        select(func.max(SyllabusVersion.version)).where(
+            SyllabusVersion.syllabus_id == syllabus_id,
+            SyllabusVersion.kind == SNAPSHOT,
+            SyllabusVersion.version <= revision,
+        )
+    )
+    if snapshot_version is None:
+        return None
+    rows = (await db.execute(
+        select(SyllabusVersion).where(
+            SyllabusVersion.syllabus_id == syllabus_id,
+            SyllabusVersion.version >= snapshot_version,
+            SyllabusVersion.version <= revision,
+        ).order_by(SyllabusVersion.version)
+    )).scalars().all()
+    if not rows or rows[-1].version != revision:
+        return None
+    doc = decode_body(rows[0])
+    for row in rows[1:]:
+        doc = apply_patch(doc, decode_body(row))
+    return doc
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark of a term onboarding import: bulk endpoints against one request per row.
+
+Seeds a throwaway SQLite database, then imports --rows users, subjects and
+assignments through POST /users/bulk, /subjects/bulk and /subjects/assign/bulk,
+and times a --sample of the same rows through the single-row endpoints to
+extrapolate their cost. bcrypt cost dominates user creation, so the users
+import is also reported with pre-hashed passwords (the password_hash column).
+
+Usage: python -m benchmarks.bulk_import [--rows 10000] [--sample 200] [--rounds 4] [--workers 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bulk-import-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bulk.db"
+os.environ["PDF_CACHE_DIR"] = f"{_tmp}/pdf-cache"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost factor for the run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="password hashing processes")
+    return parser.parse_args()
+
+def timed(client, method, url, headers, **kwargs):
+    start = time.perf_counter()
+    response = client.request(method, url, headers=headers, **kwargs)
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        sys.exit(f"{method} {url} failed with HTTP {response.status_code}: {response.text[:300]}")
+    return elapsed, response.json()
+
+def main():
+    args = parse_args()
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["BULK_MAX_ROWS"] = str(max(args.rows, 10000))
+
+    from fastapi.testclient import TestClient
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.models import Department, User
+    from app.utils.auth import create_access_token, get_password_hash
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    dept = Department(name="Onboarding")
+    db.add(dept)
+    db.flush()
+    admin = User(email="admin@bulk.edu", password_hash=get_password_hash("bulk"), role="admin", department_id=dept.id)
+    db.add(admin)
+    db.commit()
+    dept_id = dept.id
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email, 'role': admin.role})}"}
+    db.close()
+
+    n, sample = args.rows, min(args.sample, args.rows)
+    users = [{"email": f"teacher{i}@bulk.edu", "password": f"pw-{i}", "role": "teacher", "department_id": dept_id} for i in range(n)]
+    prehashed_hash = get_password_hash("imported")
+    prehashed = [{"email": f"imported{i}@bulk.edu", "password_hash": prehashed_hash, "role": "teacher", "department_id": dept_id} for i in range(n)]
+    subjects = [{"name": f"Subject {i}", "code": f"BLK{i}", "department_id": dept_id} for i in range(n)]
+    assignments = [{"teacher_email": f"teacher{i}@bulk.edu", "subject_code": f"BLK{i}"} for i in range(n)]
+
+    results = []
+    with TestClient(app) as client:
+        client.get("/")
+        for label, url, rows in [
+            ("users", "/users/bulk", users),
+            ("users (pre-hashed)", "/users/bulk", prehashed),
+            ("subjects", "/subjects/bulk", subjects),
+            ("assignments", "/subjects/assign/bulk", assignments),
+        ]:
+            elapsed, body = timed(client, "POST", url, headers, json=rows)
+            assert body["created"] == len(rows), body["failed"]
+            results.append((label, len(rows), elapsed))
+
+        # Single-row baselines on fresh rows, extrapolated to the full import
+        single = [
+            ("users", "/users/", [{**row, "email": f"single{i}@bulk.edu"} for i, row in enumerate(users[:sample])]),
+            ("subjects", "/subjects/", [{**row, "code": f"ONE{i}"} for i, row in enumerate(subjects[:sample])]),
+        ]
+        baselines = {}
+        for label, url, rows in single:
+            start = time.perf_counter()
+            for row in rows:
+                timed(client, "POST", url, headers, json=row)
+            baselines[label] = (time.perf_counter() - start) / len(rows) * n
+
+    print(f"{n} rows, bcrypt rounds={args.rounds}, hashing workers={args.workers}")
+    print(f"{'import':<20} {'rows':>7} {'bulk s':>8} {'rows/s':>9} {'1-by-1 s':>9}")
+    for label, rows, elapsed in results:
+        baseline = baselines.get(label)
+        baseline_text = f"{baseline:>9.1f}" if baseline is not None else f"{'-':>9}"
+        print(f"{label:<20} {rows:>7} {elapsed:>8.2f} {rows / elapsed:>9.0f} {baseline_text}")
+    print(f"(1-by-1 times extrapolated from {sample} single-row requests)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Load test of the API against a synthetic university, in process and offline.
+
+Seeds a throwaway SQLite database (or an empty database given with --url)
+with benchmarks.university, then drives role-based scenarios through
+httpx's ASGI transport: a login spike, teacher dashboard loads, head
+reviews, PDF downloads and admin listings. Each scenario runs --iterations
+sessions over --concurrency concurrent clients and reports throughput and
+p50/p95/p99 request latency.
+
+--micro times download_syllabus_pdf and get_current_user called directly,
+without HTTP, instead of the scenarios.
+
+--save-baseline writes the results as JSON. --baseline compares against
+such a file and exits 1 when p95 latency or throughput is more than
+--tolerance worse. Baselines only compare on the same machine, database
+and scale.
+
+Usage: python -m benchmarks.load_test [--url postgresql://...] [--departments 20]
+       [--iterations 200] [--concurrency 16] [--micro] [--baseline FILE] [--save-baseline FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="empty database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--teachers-per-department", type=int, default=100)
+    parser.add_argument("--subjects-per-department", type=int, default=30)
+    parser.add_argument("--max-versions", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200, help="sessions per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64, help="logins in the login spike")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of sessions that also write")
+    parser.add_argument("--scenarios", nargs="+", help="run only these scenarios")
+    parser.add_argument("--micro", action="store_true", help="run the micro-benchmarks instead of the scenarios")
+    parser.add_argument("--micro-iterations", type=int, default=200)
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression against the baseline")
+    return parser.parse_args()
+
+# Parsed before the app is imported, since --url decides DATABASE_URL
+args = parse_args()
+_tmp = tempfile.mkdtemp(prefix="load-test-")
+os.environ["DATABASE_URL"] = args.url or f"sqlite:///{_tmp}/load.db"
+os.environ["PDF_CACHE_DIR"] = f"{_tmp}/pdf-cache"
+# The slow-request log would flood the report under load
+os.environ.setdefault("SLOW_REQUEST_SECONDS", "0")
+
+import httpx
+from starlette.requests import Request
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.main import app
+from app.routes.syllabi import download_syllabus_pdf
+from app.utils.auth import create_access_token, get_current_user, get_password_hash, principal_cache
+from app.utils.hashing import hashing_pool
+from app.utils.pdf_cache import pdf_cache
+from app.utils.render_pool import render_pool
+from benchmarks.university import PASSWORD, Scale, seed_university, template_data
+
+OK_STATUSES = {200, 304}
+
+def percentile(samples: list, p: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+
+    async def request(self, client, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.append(time.perf_counter() - start)
+        self.statuses[response.status_code] += 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        errors = sum(count for status, count in self.statuses.items() if status not in OK_STATUSES)
+        latencies = self.latencies or [0.0]
+        return {
+            "requests": len(self.latencies),
+            "errors": errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "throughput": len(self.latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+
+class Context:
+    """The seeded university plus per-user tokens and ETags for the scenarios.
+
+    Tokens are minted directly so only the login spike pays for bcrypt.
+    """
+
+    def __init__(self, university, write_ratio: float):
+        self.university = university
+        self.write_ratio = write_ratio
+        self.tokens = {}
+        self.etags = {}
+
+    def headers(self, email: str, role: str, etag_key=None) -> dict:
+        token = self.tokens.get(email)
+        if token is None:
+            token = self.tokens[email] = create_access_token({"sub": email, "role": role})
+        headers = {"Authorization": f"Bearer {token}"}
+        if etag_key in self.etags:
+            headers["If-None-Match"] = self.etags[etag_key]
+        return headers
+
+    def remember_etag(self, key, response: httpx.Response):
+        if "etag" in response.headers:
+            self.etags[key] = response.headers["etag"]
+
+# Scenarios: each coroutine is one user session
+
+async def login_spike(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    _, email = rng.choice(ctx.university.teachers)
+    await recorder.request(client, "POST", "/auth/login", json={"email": email, "password": PASSWORD})
+
+async def teacher_dashboard(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    teacher_id, email = rng.choice(ctx.university.teachers)
+    for url in ("/subjects/my", "/syllabi/my"):
+        key = (url, teacher_id)
+        response = await recorder.request(client, "GET", url, headers=ctx.headers(email, "teacher", etag_key=key))
+        ctx.remember_etag(key, response)
+    if rng.random() < ctx.write_ratio:
+        # Save a new version of one of the teacher's syllabi
+        subject_id = rng.choice(ctx.university.subjects_by_teacher[teacher_id])
+        data = template_data(rng, f"NEW{subject_id}", "Revised course", email, 1)
+        await recorder.request(client, "POST", "/syllabi/", headers=ctx.headers(email, "teacher"),
+                               json={"subject_id": subject_id, "template_data": data, "status": "pending"})
+
+async def head_review(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    head_id, email = rng.choice(ctx.university.heads)
+    key = ("review", head_id)
+    response = await recorder.request(client, "GET", "/syllabi/review", params={"include_counts": "true", "limit": 200},
+                                      headers=ctx.headers(email, "head", etag_key=key))
+    ctx.remember_etag(key, response)
+    if response.status_code != 200:
+        return
+    pending = [item for item in response.json()["items"] if item["status"] == "pending"]
+    if not pending:
+        return
+    item = rng.choice(pending)
+    if item["version"] > 1:
+        await recorder.request(client, "GET", f"/syllabi/{item['id']}/diff", params={"against": "approved"},
+                               headers=ctx.headers(email, "head"))
+    if rng.random() < ctx.write_ratio:
+        await recorder.request(client, "PUT", f"/syllabi/{item['id']}/status", params={"status": "approved"},
+                               headers=ctx.headers(email, "head"))
+
+async def pdf_download(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    teacher_id, email = rng.choice(ctx.university.teachers)
+    syllabus_id = rng.choice(ctx.university.syllabi_by_teacher[teacher_id])
+    await recorder.request(client, "GET", f"/syllabi/{syllabus_id}/pdf", headers=ctx.headers(email, "teacher"))
+
+async def admin_listing(client, recorder: Recorder, ctx: Context, rng: random.Random):
+    admin_id, email = rng.choice(ctx.university.admins)
+    for url in ("/users/", "/departments/", "/subjects/"):
+        await recorder.request(client, "GET", url, headers=ctx.headers(email, "admin"))
+    # A few pages of the syllabus list, following the keyset cursor
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 100, "expand": "subject,teacher"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await recorder.request(client, "GET", "/syllabi/all", params=params, headers=ctx.headers(email, "admin"))
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+SCENARIOS = {
+    "login_spike": login_spike,
+    "teacher_dashboard": teacher_dashboard,
+    "head_review": head_review,
+    "pdf_download": pdf_download,
+    "admin_listing": admin_listing,
+}
+
+async def run_scenario(client, scenario, ctx: Context, iterations: int, concurrency: int, seed: int) -> dict:
+    recorder = Recorder()
+    remaining = iter(range(iterations))
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        for _ in remaining:
+            await scenario(client, recorder, ctx, rng)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(i) for i in range(concurrency)])
+    return recorder.summary(time.perf_counter() - start)
+
+# Micro-benchmarks: the handlers called directly, no HTTP or routing
+
+async def timed_calls(fn, iterations: int, before=None) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    return {
+        "requests": iterations,
+        "errors": 0,
+        "throughput": iterations / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+async def run_micro(ctx: Context, iterations: int) -> dict:
+    teacher_id, email = ctx.university.teachers[0]
+    syllabus_id = ctx.university.syllabi_by_teacher[teacher_id][0]
+    token = create_access_token({"sub": email, "role": "teacher"})
+    principal = await get_current_user(token)
+    request = Request({"type": "http", "method": "GET", "path": f"/syllabi/{syllabus_id}/pdf", "headers": []})
+
+    async def download():
+        async with AsyncSessionLocal() as db:
+            response = await download_syllabus_pdf(syllabus_id, request, db, principal)
+        assert response.status_code == 200
+
+    results = {}
+    results["get_current_user (cached)"] = await timed_calls(lambda: get_current_user(token), iterations)
+    results["get_current_user (database)"] = await timed_calls(lambda: get_current_user(token), iterations, before=principal_cache.clear)
+    await download()
+    results["download_syllabus_pdf (cached)"] = await timed_calls(download, iterations)
+    results["download_syllabus_pdf (render)"] = await timed_calls(
+        download, max(1, iterations // 10), before=lambda: pdf_cache.invalidate(syllabus_id)
+    )
+    return results
+
+def print_results(results: dict):
+    print(f"{'benchmark':<32} {'requests':>8} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, result in results.items():
+        print(f"{name:<32} {result['requests']:>8} {result['errors']:>6} {result['throughput']:>9.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+def compare(results: dict, meta: dict, path: str, tolerance: float) -> int:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("meta") != meta:
+        print(f"warning: baseline was recorded with {baseline.get('meta')}")
+    regressions = 0
+    print(f"\n{'against ' + path:<32} {'base p95':>9} {'p95 ms':>8} {'change':>7} {'base req/s':>10} {'req/s':>8} {'change':>7}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<32} (not in baseline)")
+            continue
+        p95_change = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rate_change = result["throughput"] / base["throughput"] - 1 if base["throughput"] else 0.0
+        worse = p95_change > tolerance or rate_change < -tolerance
+        regressions += worse
+        print(f"{name:<32} {base['p95_ms']:>9.1f} {result['p95_ms']:>8.1f} {p95_change:>+7.0%} "
+              f"{base['throughput']:>10.1f} {result['throughput']:>8.1f} {rate_change:>+7.0%}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+async def run(args) -> int:
+    scale = Scale(
+        departments=args.departments,
+        teachers_per_department=args.teachers_per_department,
+        subjects_per_department=args.subjects_per_department,
+        max_versions=args.max_versions,
+        seed=args.seed,
+    )
+    start = time.perf_counter()
+    university = seed_university(engine, scale, get_password_hash(PASSWORD))
+    print(f"Seeded {university.users} users, {args.departments} departments, {university.syllabi} syllabi "
+          f"on {engine.dialect.name} in {time.perf_counter() - start:.1f}s")
+    ctx = Context(university, args.write_ratio)
+
+    try:
+        if args.micro:
+            results = await run_micro(ctx, args.micro_iterations)
+        else:
+            names = args.scenarios or list(SCENARIOS)
+            unknown = set(names) - set(SCENARIOS)
+            if unknown:
+                sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}; choose from {', '.join(SCENARIOS)}")
+            results = {}
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Start the worker processes and fill the connection pool first
+                await run_scenario(client, pdf_download, ctx, min(args.concurrency, 8), args.concurrency, args.seed)
+                for name in names:
+                    iterations = args.logins if name == "login_spike" else args.iterations
+                    results[name] = await run_scenario(client, SCENARIOS[name], ctx, iterations, args.concurrency, args.seed)
+    finally:
+        render_pool.shutdown()
+        hashing_pool.shutdown()
+        await async_engine.dispose()
+
+    print_results(results)
+    meta = {
+        "mode": "micro" if args.micro else "scenarios",
+        "database": engine.dialect.name,
+        "scale": vars(scale),
+        "iterations": args.micro_iterations if args.micro else args.iterations,
+        "concurrency": args.concurrency,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "pdf_render_workers": settings.pdf_render_workers,
+    }
+    status = 0
+    if args.baseline:
+        regressions = compare(results, meta, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n{regressions} result(s) regressed by more than {args.tolerance:.0%}")
+            status = 1
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+        print(f"Saved results to {args.save_baseline}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(args)))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark of password verification throughput (logins/sec) at several bcrypt
+cost factors, both inline on one thread and through the hashing process pool.
+
+Usage: python -m benchmarks.login [--rounds 10 11 12 13] [--logins 40] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+
+PASSWORD = "correct horse battery staple"
+
+def _verify(rounds: int, password_hash: str) -> bool:
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    return context.verify(PASSWORD, password_hash)
+
+def bench_inline(context: CryptContext, password_hash: str, logins: int) -> float:
+    start = time.perf_counter()
+    for _ in range(logins):
+        context.verify(PASSWORD, password_hash)
+    return logins / (time.perf_counter() - start)
+
+async def bench_pool(executor, rounds: int, password_hash: str, logins: int) -> float:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        loop.run_in_executor(executor, _verify, rounds, password_hash)
+        for _ in range(logins)
+    ])
+    return logins / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'ms/verify':>10} {'inline/s':>10} {'pool/s':>10}  (workers={args.workers})")
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # Warm the worker processes so start-up cost is not measured
+        executor.submit(_verify, 4, CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(PASSWORD)).result()
+        for rounds in args.rounds:
+            context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+            password_hash = context.hash(PASSWORD)
+            inline = bench_inline(context, password_hash, args.logins)
+            pooled = asyncio.run(bench_pool(executor, rounds, password_hash, args.logins))
+            print(f"{rounds:>6} {1000 / inline:>10.1f} {inline:>10.1f} {pooled:>10.1f}")
+
+if __name__ == "__main__":
+    main()
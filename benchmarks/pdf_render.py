@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of render_syllabus_pdf on its own: no HTTP, database or
+render pool.
+
+Renders --iterations syllabi generated like benchmarks.university's and
+reports the cost of the first render in the process (module setup
+included), then time per render (mean/p50/p95) and peak traced memory per
+render. Time and memory are measured in separate passes because tracing
+allocations slows rendering down.
+
+--save-baseline writes the results as JSON. --baseline compares against
+such a file and exits 1 when time or memory per render is more than
+--tolerance worse.
+
+Usage: python -m benchmarks.pdf_render [--iterations 200] [--layout NAME]
+       [--baseline FILE] [--save-baseline FILE]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--layout", help="registered layout to render with (default: the default layout)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression against the baseline")
+    return parser.parse_args()
+
+def percentile(samples: list, p: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def run(args) -> int:
+    from benchmarks.university import template_data
+    rng = random.Random(args.seed)
+    documents = [
+        template_data(rng, f"BEN{i:03d}", f"Benchmark Course {i}", f"teacher{i}@bench.edu", 1 + i % 3)
+        for i in range(args.iterations)
+    ]
+    last_updated = datetime(2026, 1, 1)
+    options = {"layout": args.layout} if args.layout else {}
+
+    # The import and first render pay for module-level setup
+    start = time.perf_counter()
+    from app.utils.pdf import render_syllabus_pdf
+    render_syllabus_pdf(documents[0], last_updated, **options)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for data in documents:
+        start = time.perf_counter()
+        render_syllabus_pdf(data, last_updated, **options)
+        timings.append(time.perf_counter() - start)
+
+    peaks = []
+    tracemalloc.start()
+    for data in documents:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        render_syllabus_pdf(data, last_updated, **options)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    results = {
+        "first_render_ms": first_ms,
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "peak_kib": sum(peaks) / len(peaks) / 1024,
+    }
+    print(f"first render {results['first_render_ms']:.1f} ms; per render over {args.iterations}: "
+          f"mean {results['mean_ms']:.2f} ms, p50 {results['p50_ms']:.2f} ms, p95 {results['p95_ms']:.2f} ms, "
+          f"peak {results['peak_kib']:.0f} KiB")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            before = json.load(f)["results"]
+        regressions = 0
+        for name in ("mean_ms", "p95_ms", "peak_kib"):
+            change = results[name] / before[name] - 1 if before[name] else 0.0
+            worse = change > args.tolerance
+            regressions += worse
+            print(f"  {name:<10} {before[name]:10.2f} -> {results[name]:10.2f} ({change:+.1%}){'  REGRESSED' if worse else ''}")
+        if regressions:
+            print(f"\n{regressions} result(s) regressed by more than {args.tolerance:.0%}")
+            status = 1
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"meta": {"iterations": args.iterations, "layout": args.layout}, "results": results}, f, indent=2, sort_keys=True)
+        print(f"Saved results to {args.save_baseline}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
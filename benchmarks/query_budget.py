@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+SQL statement budget check for the syllabus read endpoints.
+
+Seeds a throwaway SQLite database with a department, several teachers and
+syllabi, calls each endpoint in-process and counts the SQL statements it
+issues. The counts must not grow with the number of rows, so any new lazy
+load (N+1) pushes an endpoint over its budget and the script exits 1.
+Endpoints that send an ETag are also replayed with If-None-Match and must
+answer 304 from the change-counter read alone.
+
+Usage: python -m benchmarks.query_budget [--syllabi 30]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="query-budget-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/budget.db"
+os.environ["PDF_CACHE_DIR"] = f"{_tmp}/pdf-cache"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models.models import Assignment, Department, Subject, Syllabus, User
+from app.utils.auth import create_access_token, get_password_hash
+
+# (role, path, budget); budgets assume the caller's principal is cached and
+# include the change-counter read behind each list ETag
+BUDGETS = [
+    ("teacher", "/syllabi/my", 2),
+    ("teacher", "/syllabi/my?expand=subject,teacher", 2),
+    ("head", "/syllabi/pending?expand=subject,teacher", 3),
+    ("head", "/syllabi/review?include_counts=true", 3),
+    ("admin", "/syllabi/all?expand=subject,teacher", 2),
+    ("admin", "/syllabi/all?fields=id,status&sort=updated_at", 2),
+    ("head", "/syllabi/{syllabus_id}/pdf", 1),
+]
+NOT_MODIFIED_BUDGET = 1
+
+def seed(syllabi: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    password_hash = get_password_hash("budget")
+    dept = Department(name="Budget")
+    db.add(dept)
+    db.flush()
+    admin = User(email="admin@budget.edu", password_hash=password_hash, role="admin", department_id=dept.id)
+    head = User(email="head@budget.edu", password_hash=password_hash, role="head", department_id=dept.id)
+    teachers = [User(email=f"teacher{i}@budget.edu", password_hash=password_hash, role="teacher", department_id=dept.id) for i in range(3)]
+    db.add_all([admin, head, *teachers])
+    db.flush()
+    dept.head_id = head.id
+    subjects = [Subject(name=f"Subject {i}", code=f"BUD{i}", department_id=dept.id) for i in range(5)]
+    db.add_all(subjects)
+    db.flush()
+    for teacher in teachers:
+        for subject in subjects:
+            db.add(Assignment(teacher_id=teacher.id, subject_id=subject.id))
+    for i in range(syllabi):
+        db.add(Syllabus(
+            subject_id=subjects[i % len(subjects)].id,
+            teacher_id=teachers[i % len(teachers)].id,
+            template_data={"courseTitle": f"Course {i}", "courseCode": f"BUD{i}"},
+            status="pending" if i % 2 else "approved",
+            version=i // 15 + 1,
+        ))
+    db.commit()
+    first_syllabus = db.query(Syllabus).filter(Syllabus.teacher_id == teachers[0].id).first()
+    users = {"admin": admin, "head": head, "teacher": teachers[0]}
+    tokens = {role: create_access_token({"sub": user.email, "role": user.role}) for role, user in users.items()}
+    result = {"tokens": tokens, "syllabus_id": first_syllabus.id}
+    db.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--syllabi", type=int, default=30)
+    args = parser.parse_args()
+
+    seeded = seed(args.syllabi)
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    failures = 0
+    with TestClient(app) as client:
+        for role, path, budget in BUDGETS:
+            url = path.format(syllabus_id=seeded["syllabus_id"])
+            headers = {"Authorization": f"Bearer {seeded['tokens'][role]}"}
+            client.get(url, headers=headers)  # warm the principal cache
+            statements.clear()
+            response = client.get(url, headers=headers)
+            count = len(statements)
+            ok = response.status_code == 200 and count <= budget
+            failures += not ok
+            print(f"[{'ok' if ok else 'FAIL'}] {role:<7} {url:<60} {count:>2} statements (budget {budget}, HTTP {response.status_code})")
+            if not ok:
+                for statement in statements:
+                    print("    " + " ".join(statement.split())[:160])
+
+            etag = response.headers.get("etag")
+            if etag:
+                statements.clear()
+                response = client.get(url, headers={**headers, "If-None-Match": etag})
+                count = len(statements)
+                ok = response.status_code == 304 and count <= NOT_MODIFIED_BUDGET
+                failures += not ok
+                print(f"[{'ok' if ok else 'FAIL'}] {role:<7} {url + ' (If-None-Match)':<60} {count:>2} statements (budget {NOT_MODIFIED_BUDGET}, HTTP {response.status_code})")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
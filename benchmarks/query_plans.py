@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Query-plan audit for the hot syllabus lookups.
+
+Runs EXPLAIN for each query the routes issue on the request path and fails
+(exit status 1) when the plan does not use one of the expected indexes.
+Works on SQLite (EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN, with
+sequential scans disabled so tiny tables do not hide a missing index).
+
+Without --url it audits a temporary SQLite database created from the
+current models. A database given with --url must already be migrated (or
+pass --create-schema), otherwise the audit stops before running EXPLAIN.
+
+Usage: python -m benchmarks.query_plans [--url postgresql://...] [--create-schema]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from sqlalchemy import create_engine, inspect, select
+from app.database import Base
+from app.models.models import Assignment, Department, Subject, Syllabus, SyllabusVersion
+from app.routes.syllabi import next_version
+from app.utils.versioning import next_revision
+
+def hot_queries():
+    # (name, statement, acceptable index names) mirroring app/routes/*
+    return [
+        (
+            "create_syllabus: next version per (subject, teacher)",
+            select(next_version(1, 1)),
+            ["ix_syllabi_subject_id_teacher_id_version"],
+        ),
+        (
+            "read_my_syllabi: by teacher",
+            select(Syllabus).where(Syllabus.teacher_id == 1),
+            ["ix_syllabi_teacher_id_id"],
+        ),
+        (
+            "read_pending_syllabi: pending in department",
+            select(Syllabus).join(Syllabus.subject).where(Syllabus.status == "pending", Subject.department_id == 1),
+            ["ix_syllabi_status_subject_id", "ix_syllabi_status_id"],
+        ),
+        (
+            "head department lookup",
+            select(Department).where(Department.head_id == 1),
+            ["ix_departments_head_id"],
+        ),
+        (
+            "read_my_subjects: assignments by teacher",
+            select(Subject).join(Assignment).where(Assignment.teacher_id == 1),
+            ["ix_assignments_teacher_id_subject_id"],
+        ),
+        (
+            "syllabus versions by syllabus",
+            select(SyllabusVersion).where(SyllabusVersion.syllabus_id == 1),
+            ["ix_syllabus_versions_syllabus_id", "ix_syllabus_versions_syllabus_id_version"],
+        ),
+        (
+            "record_revision: next revision per syllabus",
+            select(next_revision(1)),
+            ["ix_syllabus_versions_syllabus_id_version"],
+        ),
+    ]
+
+def explain(conn, stmt) -> str:
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[k] for k in compiled.positiontup) if compiled.positional else compiled.params
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+    rows = conn.exec_driver_sql(f"EXPLAIN {compiled}", params).fetchall()
+    return "\n".join(str(row[0]) for row in rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="database to audit (default: a temporary SQLite database)")
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables and indexes first")
+    args = parser.parse_args()
+
+    if args.url is None:
+        args.url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='query-plans-'), 'query_plans.db')}"
+        args.create_schema = True
+    engine = create_engine(args.url)
+    if args.create_schema:
+        Base.metadata.create_all(bind=engine)
+    missing = sorted(set(Base.metadata.tables) - set(inspect(engine).get_table_names()))
+    if missing:
+        sys.exit(f"{args.url} is missing tables ({', '.join(missing)}); run alembic upgrade head or pass --create-schema")
+
+    failures = 0
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, stmt, indexes in hot_queries():
+            plan = explain(conn, stmt)
+            ok = any(index in plan for index in indexes)
+            failures += not ok
+            print(f"[{'ok' if ok else 'FAIL'}] {name}")
+            if not ok:
+                print("    expected one of: " + ", ".join(indexes))
+                print("    " + plan.replace("\n", "\n    "))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark of syllabus list serialization, ORM objects through a Pydantic
+response_model against column rows encoded straight to JSON bytes.
+
+Seeds a temporary SQLite database with --rows syllabi (template_data
+generated like benchmarks.university's) and, for each row count, times
+three ways of turning them into a response body with subject and teacher
+expanded:
+
+  response_model  ORM objects with selectin-loaded relations, converted to
+                  dicts, validated and encoded by a TypeAdapter over the
+                  endpoint's response_model, as /syllabi/all used to
+  columns         the list_query column select, encoded by
+                  app.utils.serialization.dumps
+  columns_fields  the same without template_data (fields=id,subject_id,
+                  teacher_id,status,version)
+
+Load (query and row mapping) and encode times are reported separately,
+best of --repeat runs, with rows per second over both.
+
+Usage: python -m benchmarks.serialization [--rows 1000 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="serialization-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/serialization.db"
+os.environ.setdefault("PDF_CACHE_DIR", os.path.join(_tmp, "pdf-cache"))
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.database import Base, SessionLocal, engine
+from app.models.models import Department, Subject, Syllabus, User
+from app.routes.syllabi import SyllabusExpandedResponse, list_query
+from app.utils.serialization import dumps, orjson
+from benchmarks.university import template_data
+
+SUMMARY_FIELDS = ["id", "subject_id", "teacher_id", "status", "version"]
+
+def seed(rows: int):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    with SessionLocal() as db:
+        dept = Department(name="Benchmark")
+        db.add(dept)
+        db.flush()
+        teachers = [User(email=f"teacher{i}@bench.edu", password_hash="-", role="teacher", department_id=dept.id) for i in range(50)]
+        subjects = [Subject(name=f"Subject {i}", code=f"BEN{i:03d}", department_id=dept.id) for i in range(100)]
+        db.add_all(teachers + subjects)
+        db.flush()
+        db.execute(Syllabus.__table__.insert(), [
+            {
+                "subject_id": subjects[i % len(subjects)].id,
+                "teacher_id": teachers[i % len(teachers)].id,
+                "template_data": template_data(rng, f"BEN{i % 100:03d}", f"Subject {i % 100}", f"teacher{i % 50}@bench.edu", 1 + i % 3),
+                "status": rng.choice(["draft", "pending", "approved"]),
+                # Subject and teacher pairs repeat every 100 rows
+                "version": 1 + i // 100,
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+
+def _orm_item(syllabus: Syllabus) -> dict:
+    # The dict built per syllabus before the column path
+    subject, teacher = syllabus.subject, syllabus.teacher
+    return {
+        "id": syllabus.id,
+        "subject_id": syllabus.subject_id,
+        "teacher_id": syllabus.teacher_id,
+        "template_data": syllabus.template_data or {},
+        "status": syllabus.status,
+        "version": syllabus.version,
+        "subject": {"id": subject.id, "name": subject.name, "code": subject.code, "department_id": subject.department_id} if subject else None,
+        "teacher": {"id": teacher.id, "email": teacher.email, "department_id": teacher.department_id} if teacher else None,
+    }
+
+_adapter = TypeAdapter(list[SyllabusExpandedResponse])
+
+def response_model(db, limit: int):
+    def load():
+        syllabi = db.execute(
+            select(Syllabus).options(selectinload(Syllabus.subject), selectinload(Syllabus.teacher)).order_by(Syllabus.id).limit(limit)
+        ).scalars().all()
+        return [_orm_item(syllabus) for syllabus in syllabi]
+
+    def encode(items):
+        return _adapter.dump_json(_adapter.validate_python(items), exclude_unset=True)
+
+    return load, encode
+
+def columns(fields: list[str]):
+    def mode(db, limit: int):
+        stmt, to_item = list_query(fields, ["subject", "teacher"])
+
+        def load():
+            return [to_item(row) for row in db.execute(stmt.order_by(Syllabus.id).limit(limit)).all()]
+
+        return load, dumps
+
+    return mode
+
+MODES = {
+    "response_model": response_model,
+    "columns": columns(["id", "subject_id", "teacher_id", "template_data", "status", "version"]),
+    "columns_fields": columns(SUMMARY_FIELDS),
+}
+
+def measure(mode, limit: int, repeat: int) -> tuple[float, float, int]:
+    best_load = best_encode = float("inf")
+    size = 0
+    for _ in range(repeat):
+        # A fresh session per run so no ORM identity map carries over
+        with SessionLocal() as db:
+            load, encode = mode(db, limit)
+            start = time.perf_counter()
+            items = load()
+            loaded = time.perf_counter()
+            body = encode(items)
+            encoded = time.perf_counter()
+        best_load = min(best_load, loaded - start)
+        best_encode = min(best_encode, encoded - loaded)
+        size = len(body)
+    return best_load, best_encode, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    seed(max(args.rows))
+    print(f"JSON encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    print(f"{'rows':>6} {'mode':<15} {'load ms':>9} {'encode ms':>10} {'rows/s':>10} {'body KiB':>9} {'speedup':>8}")
+    for rows in args.rows:
+        baseline = None
+        for name, mode in MODES.items():
+            load, encode, size = measure(mode, rows, args.repeat)
+            rate = rows / (load + encode)
+            baseline = baseline or rate
+            print(f"{rows:>6} {name:<15} {load * 1000:>9.1f} {encode * 1000:>10.1f} {rate:>10.0f} {size / 1024:>9.0f} {rate / baseline:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
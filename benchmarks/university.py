@@ -0,0 +1,146 @@
+"""
+Synthetic university for benchmarks: departments with a head, teachers and
+subjects, teacher assignments and several versions of each syllabus.
+
+Rows are written with Core multi-row inserts, so seeding thousands of users
+takes seconds on SQLite and PostgreSQL alike. The same --seed always yields
+the same university. The target database must be empty.
+"""
+
+import random
+from dataclasses import dataclass, field
+from sqlalchemy import bindparam, func, insert, select, update
+from app.database import Base
+from app.models.models import Assignment, Department, Subject, Syllabus, User, rebuild_dashboard_stats
+
+PASSWORD = "benchmark"
+
+TOPICS = [
+    "Algorithms", "Databases", "Networks", "Thermodynamics", "Organic Chemistry", "Linear Algebra",
+    "Microeconomics", "Statistics", "Genetics", "Ethics", "Signal Processing", "Compilers",
+    "Cell Biology", "Macroeconomics", "Optics", "Topology", "Sociology", "Marketing",
+]
+WORDS = (
+    "students will study the core concepts methods and applications of the field through lectures "
+    "laboratory sessions readings and projects with an emphasis on critical analysis and practice"
+).split()
+
+@dataclass
+class Scale:
+    departments: int = 20
+    teachers_per_department: int = 100
+    subjects_per_department: int = 30
+    subjects_per_teacher: int = 2
+    max_versions: int = 3
+    seed: int = 42
+
+@dataclass
+class University:
+    """Ids the scenarios draw from; teachers map to their syllabus ids."""
+    admins: list = field(default_factory=list)
+    heads: list = field(default_factory=list)  # (user id, email)
+    teachers: list = field(default_factory=list)  # (user id, email)
+    subjects_by_teacher: dict = field(default_factory=dict)
+    syllabi_by_teacher: dict = field(default_factory=dict)
+    syllabi: int = 0
+
+    @property
+    def users(self) -> int:
+        return len(self.admins) + len(self.heads) + len(self.teachers)
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def template_data(rng: random.Random, code: str, title: str, email: str, version: int) -> dict:
+    # Same shape as the frontend form: every field is a string
+    return {
+        "courseTitle": title,
+        "courseCode": code,
+        "type": rng.choice(["compulsory", "optional"]),
+        "typology": rng.choice("ABCDEF"),
+        "credits": str(rng.choice([3, 4, 6])),
+        "instructor": email.split("@")[0].replace(".", " ").title(),
+        "email": email,
+        "officeHours": f"{rng.choice(['Mon', 'Tue', 'Wed', 'Thu'])} {rng.randint(9, 16)}:00",
+        "courseDescription": _paragraph(rng, 60 + 10 * version),
+        "prerequisites": _paragraph(rng, 8),
+        "learningObjectives": " ".join(_paragraph(rng, 12) for _ in range(5)),
+        "textbooks": " ".join(_paragraph(rng, 6) for _ in range(2)),
+        "gradingPolicy": _paragraph(rng, 25),
+        "attendancePolicy": _paragraph(rng, 15),
+        "academicIntegrity": _paragraph(rng, 20),
+        "schedule": "\n".join(f"Week {week}: {_paragraph(rng, 5)}" for week in range(1, 15)),
+    }
+
+def _insert(conn, model, rows: list[dict]) -> list[int]:
+    if not rows:
+        return []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(conn.execute(stmt, rows).scalars())
+
+def seed_university(engine, scale: Scale, password_hash: str) -> University:
+    """Create the schema if needed and fill it; returns what was created."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(scale.seed)
+    university = University()
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(User)).scalar():
+            raise RuntimeError("The benchmark database must be empty")
+
+        dept_ids = _insert(conn, Department, [{"name": f"Department {d:03d}"} for d in range(scale.departments)])
+        admin_ids = _insert(conn, User, [
+            {"email": f"admin{i}@bench.edu", "password_hash": password_hash, "role": "admin", "department_id": dept_ids[0]}
+            for i in range(2)
+        ])
+        university.admins = list(zip(admin_ids, [f"admin{i}@bench.edu" for i in range(2)]))
+
+        head_emails = [f"head.d{d:03d}@bench.edu" for d in range(scale.departments)]
+        head_ids = _insert(conn, User, [
+            {"email": email, "password_hash": password_hash, "role": "head", "department_id": dept_id}
+            for email, dept_id in zip(head_emails, dept_ids)
+        ])
+        conn.execute(
+            update(Department).where(Department.id == bindparam("dept_id")).values(head_id=bindparam("head_id")),
+            [{"dept_id": dept_id, "head_id": head_id} for dept_id, head_id in zip(dept_ids, head_ids)],
+        )
+        university.heads = list(zip(head_ids, head_emails))
+
+        for d, dept_id in enumerate(dept_ids):
+            topic = TOPICS[d % len(TOPICS)]
+            subject_rows = [
+                {"name": f"{topic} {s + 1}", "code": f"D{d:03d}S{s:03d}", "department_id": dept_id}
+                for s in range(scale.subjects_per_department)
+            ]
+            subject_ids = _insert(conn, Subject, subject_rows)
+            teacher_emails = [f"teacher{t:03d}.d{d:03d}@bench.edu" for t in range(scale.teachers_per_department)]
+            teacher_ids = _insert(conn, User, [
+                {"email": email, "password_hash": password_hash, "role": "teacher", "department_id": dept_id}
+                for email in teacher_emails
+            ])
+
+            assignments, syllabi = [], []
+            for teacher_id, email in zip(teacher_ids, teacher_emails):
+                picks = rng.sample(range(len(subject_ids)), min(scale.subjects_per_teacher, len(subject_ids)))
+                university.subjects_by_teacher[teacher_id] = [subject_ids[s] for s in picks]
+                for s in picks:
+                    assignments.append({"teacher_id": teacher_id, "subject_id": subject_ids[s]})
+                    versions = rng.randint(1, scale.max_versions)
+                    for version in range(1, versions + 1):
+                        latest = version == versions
+                        syllabi.append({
+                            "subject_id": subject_ids[s],
+                            "teacher_id": teacher_id,
+                            "template_data": template_data(rng, subject_rows[s]["code"], subject_rows[s]["name"], email, version),
+                            # Earlier versions were approved; the latest is anywhere in the workflow
+                            "status": rng.choice(["draft", "pending", "pending", "approved"]) if latest else "approved",
+                            "version": version,
+                        })
+            _insert(conn, Assignment, assignments)
+            syllabus_ids = _insert(conn, Syllabus, syllabi)
+            for row, syllabus_id in zip(syllabi, syllabus_ids):
+                university.syllabi_by_teacher.setdefault(row["teacher_id"], []).append(syllabus_id)
+            university.teachers.extend(zip(teacher_ids, teacher_emails))
+            university.syllabi += len(syllabus_ids)
+        # Core inserts bypass the ORM hooks that keep /stats current
+        rebuild_dashboard_stats(conn)
+    return university
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Stress test of syllabus version allocation under concurrent creates.
+
+Seeds a throwaway SQLite database (or an empty database given with --url)
+with a small benchmarks.university, then fires --creates POST /syllabi/
+requests at once, spread over --pairs (subject, teacher) pairs so many of
+them race for the same next version. Afterwards every pair's versions must
+be unique and dense (1..n), every accepted create must be stored with the
+version it was answered with, and nothing but 200 or 409 (retries
+exhausted) may come back. Exits 1 when any check fails.
+
+Usage: python -m benchmarks.version_stress [--url postgresql://...] [--creates 400]
+       [--pairs 4] [--concurrency 400]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="empty database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--creates", type=int, default=400)
+    parser.add_argument("--pairs", type=int, default=4, help="(subject, teacher) pairs the creates share")
+    parser.add_argument("--concurrency", type=int, default=400, help="creates in flight at once")
+    parser.add_argument("--max-versions", type=int, default=3, help="versions each pair starts with, at most")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+# Parsed before the app is imported, since --url decides DATABASE_URL
+args = parse_args()
+_tmp = tempfile.mkdtemp(prefix="version-stress-")
+os.environ["DATABASE_URL"] = args.url or f"sqlite:///{_tmp}/stress.db"
+os.environ["PDF_CACHE_DIR"] = f"{_tmp}/pdf-cache"
+os.environ.setdefault("SLOW_REQUEST_SECONDS", "0")
+
+import httpx
+from sqlalchemy import select
+from app.database import async_engine, engine
+from app.main import app
+from app.models.models import Syllabus
+from app.utils.auth import create_access_token
+from app.utils.hashing import hashing_pool
+from app.utils.render_pool import render_pool
+from benchmarks.university import Scale, seed_university
+
+def check_versions(rows: list, accepted: list) -> list[str]:
+    """Problems found in the stored (id, subject, teacher, version) rows."""
+    problems = []
+    by_pair = defaultdict(list)
+    stored = {}
+    for id, subject_id, teacher_id, version in rows:
+        by_pair[(subject_id, teacher_id)].append(version)
+        stored[id] = version
+    for pair, versions in sorted(by_pair.items()):
+        duplicates = sorted(version for version, count in Counter(versions).items() if count > 1)
+        if duplicates:
+            problems.append(f"subject {pair[0]}, teacher {pair[1]}: duplicate versions {duplicates}")
+        missing = sorted(set(range(1, len(versions) + 1)) - set(versions))
+        if missing:
+            problems.append(f"subject {pair[0]}, teacher {pair[1]}: missing versions {missing}")
+    for item in accepted:
+        if stored.get(item["id"]) != item["version"]:
+            problems.append(f"syllabus {item['id']} was answered as version {item['version']} "
+                            f"but stored as {stored.get(item['id'])}")
+    return problems
+
+async def run(args) -> int:
+    scale = Scale(
+        departments=1,
+        teachers_per_department=args.pairs,
+        subjects_per_department=max(args.pairs, 1),
+        subjects_per_teacher=1,
+        max_versions=args.max_versions,
+        seed=args.seed,
+    )
+    # Nobody logs in, so the password hash only has to be a string
+    university = seed_university(engine, scale, "!")
+    pairs = [
+        (university.subjects_by_teacher[teacher_id][0], create_access_token({"sub": email, "role": "teacher"}))
+        for teacher_id, email in university.teachers
+    ]
+    print(f"Seeded {university.syllabi} syllabi over {len(pairs)} pairs on {engine.dialect.name}")
+
+    statuses = Counter()
+    accepted = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def create(client, n: int):
+        subject_id, token = pairs[n % len(pairs)]
+        async with semaphore:
+            response = await client.post(
+                "/syllabi/",
+                json={"subject_id": subject_id, "template_data": {"courseTitle": f"Stress {n}"}, "status": "draft"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            accepted.append(response.json())
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*[create(client, n) for n in range(args.creates)])
+            elapsed = time.perf_counter() - start
+        with engine.connect() as conn:
+            rows = conn.execute(select(Syllabus.id, Syllabus.subject_id, Syllabus.teacher_id, Syllabus.version)).all()
+    finally:
+        render_pool.shutdown()
+        hashing_pool.shutdown()
+        await async_engine.dispose()
+
+    print(f"{args.creates} creates in {elapsed:.2f}s: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    problems = check_versions(rows, accepted)
+    unexpected = {status: count for status, count in statuses.items() if status not in (200, 409)}
+    if unexpected:
+        problems.append(f"unexpected responses {unexpected}")
+    if len(rows) != university.syllabi + len(accepted):
+        problems.append(f"{len(rows)} syllabi stored, expected {university.syllabi + len(accepted)}")
+    for problem in problems:
+        print(problem)
+    print("FAILED" if problems else "Versions are unique and dense")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(args)))
@@ -1,4 +1,4 @@
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import {
   Box,
   Button,
@@ -57,28 +57,47 @@ const SyllabusTemplate = ({ syllabus, onClose, onSave, mode = 'view', selectedSu
   };
 
   const templateRef = useRef(null);
+  const [definition, setDefinition] = useState(null);
   const [templateData, setTemplateData] = useState({
     courseTitle: selectedSubject ? selectedSubject.name : '',
     courseCode: selectedSubject ? selectedSubject.code : '',
     instructor: formatTeacherName(currentUser.email),
     email: currentUser.email || '',
-    officeHours: '',
-    typology: '',
-    type: '',
-    year: '',
-    semester: '',
-    additionalDescription: '',
-    courseDescription: '',
-    learningObjectives: '',
-    prerequisites: '',
-    textbooks: '',
-    gradingPolicy: '',
-    attendancePolicy: '',
-    academicIntegrity: '',
-    schedule: '',
     ...syllabus?.template_data
   });
 
+  // The department's template drives both the form and the preview, the
+  // same definition the backend validates against and renders the PDF from
+  const subjectId = selectedSubject?.id || syllabus?.subject_id;
+  useEffect(() => {
+    if (!subjectId) return;
+    let cancelled = false;
+    api.get(`/subjects/${subjectId}/template`)
+      .then((response) => {
+        if (!cancelled) setDefinition(response.data.definition);
+      })
+      .catch((error) => console.error('Error loading syllabus template:', error));
+    return () => {
+      cancelled = true;
+    };
+  }, [subjectId]);
+
+  const fields = definition ? definition.fields : [];
+  const fieldsByKey = Object.fromEntries(fields.map((field) => [field.key, field]));
+  const groups = [];
+  fields.filter((field) => field.form !== false).forEach((field) => {
+    const name = field.group || 'Details';
+    let group = groups.find((g) => g.name === name);
+    if (!group) {
+      group = { name, fields: [] };
+      groups.push(group);
+    }
+    group.fields.push(field);
+  });
+  // The first two groups sit beside the preview, the rest below it
+  const sideGroups = groups.slice(0, 2);
+  const bottomGroups = groups.slice(2);
+
   const handleInputChange = (field, value) => {
     setTemplateData(prev => ({
       ...prev,
@@ -86,6 +105,24 @@ const SyllabusTemplate = ({ syllabus, onClose, onSave, mode = 'view', selectedSu
     }));
   };
 
+  // Values the default template derives from other fields rather than asks for
+  const withDerivedFields = (data) => {
+    const derived = { ...data };
+    if (fieldsByKey.courseDescription && fieldsByKey.courseDescription.form === false) {
+      derived.courseDescription = `Year ${data.year || '...'} Semester ${data.semester || '...'} 15 weeks ${data.additionalDescription || '.........'}`;
+    }
+    if (fieldsByKey.gradingPolicy && fieldsByKey.gradingPolicy.form === false) {
+      const parts = [
+        ['assignmentsPercent', 'Assignments'],
+        ['midtermPercent', 'Midterm'],
+        ['finalPercent', 'Final Exam'],
+        ['otherPercent', 'Other'],
+      ].filter(([key]) => data[key]).map(([key, label]) => `${label}: ${data[key]}%`);
+      if (parts.length) derived.gradingPolicy = parts.join(', ');
+    }
+    return derived;
+  };
+
   const generatePDF = async () => {
     if (!templateRef.current) return;
 
@@ -124,21 +161,98 @@ const SyllabusTemplate = ({ syllabus, onClose, onSave, mode = 'view', selectedSu
     }
   };
 
-  const isFormValid = templateData.courseTitle && templateData.courseCode;
+  const isFilled = (value) => value !== undefined && value !== null && value !== '';
+  const isFormValid = Boolean(definition)
+    && ['courseTitle', 'courseCode'].every((key) => !fieldsByKey[key] || isFilled(templateData[key]))
+    && fields.every((field) => !field.required || field.form === false || isFilled(templateData[field.key]));
 
   const handleSave = () => {
     if (onSave) {
-      const courseDescription = `Year ${templateData.year || '...'} Semester ${templateData.semester || '...'} 15 weeks ${templateData.additionalDescription || '.........'}`;
+      onSave(withDerivedFields(templateData));
+    }
+  };
 
-      const dataToSave = {
-        ...templateData,
-        courseDescription
-      };
+  const formatValue = (key, value) => {
+    const field = fieldsByKey[key];
+    if (field && field.type === 'choice') {
+      const label = field.choices[value];
+      if (field.show_code) return `${value} - ${label || ''}`;
+      return label || value;
+    }
+    return `${value}`;
+  };
 
-      onSave(dataToSave);
+  const renderField = (field, inGrid) => {
+    const lockedBySubject = mode === 'create' && selectedSubject && (field.key === 'courseTitle' || field.key === 'courseCode');
+    const common = {
+      fullWidth: true,
+      label: field.label,
+      value: templateData[field.key] ?? '',
+      onChange: (e) => handleInputChange(field.key, e.target.value),
+      required: field.required || field.key === 'courseTitle' || field.key === 'courseCode',
+      disabled: field.readonly || Boolean(lockedBySubject),
+      helperText: field.help,
+      placeholder: field.placeholder,
+    };
+    if (field.type === 'choice') {
+      return (
+        <FormControl key={field.key} fullWidth margin={inGrid ? 'none' : 'normal'} required={common.required} disabled={common.disabled}>
+          <InputLabel>{field.label}</InputLabel>
+          <Select value={common.value} label={field.label} onChange={common.onChange}>
+            {Object.entries(field.choices).map(([value, label]) => (
+              <MenuItem key={value} value={value}>
+                {field.show_code ? `${value} - ${label}` : label}
+              </MenuItem>
+            ))}
+          </Select>
+        </FormControl>
+      );
+    }
+    if (field.type === 'number') {
+      return (
+        <TextField
+          key={field.key}
+          {...common}
+          type="number"
+          inputProps={{ min: field.min ?? undefined, max: field.max ?? undefined }}
+          size={inGrid ? 'small' : 'medium'}
+          margin={inGrid ? 'none' : 'normal'}
+        />
+      );
     }
+    return (
+      <TextField
+        key={field.key}
+        {...common}
+        type={field.type === 'email' ? 'email' : 'text'}
+        multiline={field.type === 'text'}
+        rows={field.type === 'text' ? field.rows || 2 : undefined}
+        inputProps={{ maxLength: field.max_length ?? undefined }}
+        margin={inGrid ? 'none' : 'normal'}
+      />
+    );
   };
 
+  const groupPaperSx = {
+    p: 3,
+    borderRadius: 3,
+    border: '1px solid',
+    borderColor: 'divider',
+    boxShadow: 'none',
+  };
+
+  const previewData = withDerivedFields(templateData);
+  const previewSections = (definition ? definition.sections : []).map((section, index) => {
+    const lines = section.fields
+      .map((field) => {
+        const value = field.key in previewData ? previewData[field.key] : field.default;
+        if (!isFilled(value) && !field.always) return null;
+        return { key: field.key, label: field.label, text: formatValue(field.key, value) };
+      })
+      .filter(Boolean);
+    return { ...section, index, lines };
+  }).filter((section) => section.lines.length);
+
   return (
     <Box
       sx={{
@@ -206,146 +320,14 @@ const SyllabusTemplate = ({ syllabus, onClose, onSave, mode = 'view', selectedSu
       <Grid container spacing={3}>
         {/* Form Fields */}
         <Grid item xs={12} md={6}>
-          <Paper
-            sx={{
-              p: 3,
-              borderRadius: 3,
-              border: '1px solid',
-              borderColor: 'divider',
-              boxShadow: 'none',
-            }}
-          >
-            <Typography variant="h6" gutterBottom sx={{ fontWeight: 600, color: 'primary.main' }}>
-              Course Information
-            </Typography>
-            <TextField
-              fullWidth
-              label="Course Title"
-              value={templateData.courseTitle}
-              onChange={(e) => handleInputChange('courseTitle', e.target.value)}
-              margin="normal"
-              required
-              disabled={mode === 'create' && selectedSubject}
-            />
-            <TextField
-              fullWidth
-              label="Course Code"
-              value={templateData.courseCode}
-              onChange={(e) => handleInputChange('courseCode', e.target.value)}
-              margin="normal"
-              required
-              disabled={mode === 'create' && selectedSubject}
-            />
-            <TextField
-              fullWidth
-              label="Instructor Name"
-              value={templateData.instructor}
-              margin="normal"
-              disabled
-            />
-            <TextField
-              fullWidth
-              label="Email"
-              type="email"
-              value={templateData.email}
-              margin="normal"
-              disabled
-            />
-            <TextField
-              fullWidth
-              label="Office Hours"
-              value={templateData.officeHours}
-              onChange={(e) => handleInputChange('officeHours', e.target.value)}
-              margin="normal"
-              multiline
-              rows={2}
-            />
-            <FormControl fullWidth margin="normal">
-              <InputLabel>Subject Typology</InputLabel>
-              <Select
-                value={templateData.typology}
-                label="Subject Typology"
-                onChange={(e) => handleInputChange('typology', e.target.value)}
-              >
-                <MenuItem value="A">A - Basic</MenuItem>
-                <MenuItem value="B">B - Intermediate</MenuItem>
-                <MenuItem value="C">C - Advanced</MenuItem>
-                <MenuItem value="D">D - Specialized</MenuItem>
-                <MenuItem value="E">E - Research</MenuItem>
-                <MenuItem value="F">F - Practical</MenuItem>
-              </Select>
-            </FormControl>
-            <FormControl fullWidth margin="normal">
-              <InputLabel>Subject Type</InputLabel>
-              <Select
-                value={templateData.type}
-                label="Subject Type"
-                onChange={(e) => handleInputChange('type', e.target.value)}
-              >
-                <MenuItem value="compulsory">Compulsory</MenuItem>
-                <MenuItem value="optional">Optional</MenuItem>
-              </Select>
-            </FormControl>
-          </Paper>
-
-          <Paper
-            sx={{
-              p: 3,
-              mt: 3,
-              borderRadius: 3,
-              border: '1px solid',
-              borderColor: 'divider',
-              boxShadow: 'none',
-            }}
-          >
-            <Typography variant="h6" gutterBottom sx={{ fontWeight: 600, color: 'primary.main' }}>
-              Course Details
-            </Typography>
-            <TextField
-              fullWidth
-              label="Year"
-              value={templateData.year || ''}
-              onChange={(e) => handleInputChange('year', e.target.value)}
-              margin="normal"
-              placeholder="e.g., 2024"
-            />
-            <TextField
-              fullWidth
-              label="Semester"
-              value={templateData.semester || ''}
-              onChange={(e) => handleInputChange('semester', e.target.value)}
-              margin="normal"
-              placeholder="e.g., Fall"
-            />
-            <TextField
-              fullWidth
-              label="Course Description"
-              value={templateData.additionalDescription || ''}
-              onChange={(e) => handleInputChange('additionalDescription', e.target.value)}
-              margin="normal"
-              multiline
-              rows={2}
-              placeholder="Additional course description details"
-            />
-            <TextField
-              fullWidth
-              label="Learning Objectives"
-              value={templateData.learningObjectives}
-              onChange={(e) => handleInputChange('learningObjectives', e.target.value)}
-              margin="normal"
-              multiline
-              rows={3}
-            />
-            <TextField
-              fullWidth
-              label="Prerequisites"
-              value={templateData.prerequisites}
-              onChange={(e) => handleInputChange('prerequisites', e.target.value)}
-              margin="normal"
-              multiline
-              rows={2}
-            />
-          </Paper>
+          {sideGroups.map((group, index) => (
+            <Paper key={group.name} sx={{ ...groupPaperSx, mt: index ? 3 : 0 }}>
+              <Typography variant="h6" gutterBottom sx={{ fontWeight: 600, color: 'primary.main' }}>
+                {group.name}
+              </Typography>
+              {group.fields.map((field) => renderField(field, false))}
+            </Paper>
+          ))}
         </Grid>
 
         {/* Template Preview - Keep white background for PDF generation */}
@@ -378,150 +360,42 @@ const SyllabusTemplate = ({ syllabus, onClose, onSave, mode = 'view', selectedSu
                 boxShadow: '0 12px 30px rgba(15, 23, 42, 0.08)',
               }}
             >
-              {/* Header - Always use print-friendly colors */}
-              <Box sx={{ textAlign: 'center', mb: 3, borderBottom: '2px solid #1565C0', pb: 2 }}>
-                <Typography variant="h4" sx={{ color: '#1565C0', fontWeight: 'bold', mb: 1 }}>
-                  {templateData.courseTitle || 'Course Title'}
-                </Typography>
-                <Typography variant="h6" sx={{ color: '#666' }}>
-                  {templateData.courseCode || 'Course Code'}
-                </Typography>
-              </Box>
-
-              {/* Instructor Info */}
-              <Box sx={{ mb: 3 }}>
-                <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                  Instructor Information
-                </Typography>
-                <Typography sx={{ color: '#333' }}>
-                  <strong>Name:</strong> {templateData.instructor || 'Instructor Name'}
-                </Typography>
-                <Typography sx={{ color: '#333' }}>
-                  <strong>Email:</strong> {templateData.email || 'instructor@university.edu'}
-                </Typography>
-                {templateData.officeHours && (
-                  <Typography sx={{ color: '#333' }}>
-                    <strong>Office Hours:</strong> {templateData.officeHours}
-                  </Typography>
-                )}
-              </Box>
-
-              {/* Subject Information */}
-              {(templateData.typology || templateData.type) && (
-                <Box sx={{ mb: 3 }}>
-                  <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                    Subject Information
-                  </Typography>
-                  {templateData.typology && (
-                    <Typography sx={{ color: '#333' }}>
-                      <strong>Typology:</strong> {templateData.typology} - {
-                        templateData.typology === 'A' ? 'Basic' :
-                        templateData.typology === 'B' ? 'Intermediate' :
-                        templateData.typology === 'C' ? 'Advanced' :
-                        templateData.typology === 'D' ? 'Specialized' :
-                        templateData.typology === 'E' ? 'Research' :
-                        templateData.typology === 'F' ? 'Practical' : ''
-                      }
-                    </Typography>
-                  )}
-                  {templateData.type && (
-                    <Typography sx={{ color: '#333' }}>
-                      <strong>Type:</strong> {templateData.type === 'compulsory' ? 'Compulsory' : 'Optional'}
-                    </Typography>
-                  )}
-                </Box>
-              )}
-
-              <Divider sx={{ my: 2 }} />
-
-              {/* Course Description */}
-              {(templateData.year || templateData.semester || templateData.additionalDescription) && (
-                <Box sx={{ mb: 3 }}>
-                  <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                    Course Description
-                  </Typography>
-                  <Typography sx={{ lineHeight: 1.6, color: '#333' }}>
-                    Year {templateData.year || '...'} Semester {templateData.semester || '...'} 15 weeks {templateData.additionalDescription || '.........'}
-                  </Typography>
-                </Box>
-              )}
-
-              {/* Learning Objectives */}
-              {templateData.learningObjectives && (
-                <Box sx={{ mb: 3 }}>
-                  <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                    Learning Objectives
-                  </Typography>
-                  <Typography sx={{ lineHeight: 1.6, color: '#333' }}>
-                    {templateData.learningObjectives}
-                  </Typography>
-                </Box>
-              )}
-
-              {/* Prerequisites */}
-              {templateData.prerequisites && (
-                <Box sx={{ mb: 3 }}>
-                  <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                    Prerequisites
-                  </Typography>
-                  <Typography sx={{ color: '#333' }}>{templateData.prerequisites}</Typography>
-                </Box>
-              )}
-
-              {/* Required Materials */}
-              <Box sx={{ mb: 3 }}>
-                <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                  Required Materials
-                </Typography>
-                <Typography sx={{ lineHeight: 1.6, color: '#333' }}>
-                  {templateData.textbooks || 'Textbooks and materials will be announced.'}
-                </Typography>
-              </Box>
-
-              {/* Grading Policy */}
-              <Box sx={{ mb: 3 }}>
-                <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                  Grading Policy
-                </Typography>
-                <Typography sx={{ lineHeight: 1.6, color: '#333' }}>
-                  {templateData.assignmentsPercent && `Assignments: ${templateData.assignmentsPercent}%`}
-                  {templateData.midtermPercent && `, Midterm: ${templateData.midtermPercent}%`}
-                  {templateData.finalPercent && `, Final Exam: ${templateData.finalPercent}%`}
-                  {templateData.otherPercent && `, Other: ${templateData.otherPercent}%`}
-                  {(!templateData.assignmentsPercent && !templateData.midtermPercent && !templateData.finalPercent && !templateData.otherPercent) && 'Assignments: 40%, Midterm: 30%, Final Exam: 30%'}
-                </Typography>
-              </Box>
-
-              {/* Policies */}
-              <Box sx={{ mb: 3 }}>
-                <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                  Course Policies
-                </Typography>
-
-                {templateData.attendancePolicy && (
-                  <Typography sx={{ mb: 1, color: '#333' }}>
-                    <strong>Attendance:</strong> {templateData.attendancePolicy}
-                  </Typography>
-                )}
-
-                {templateData.academicIntegrity && (
-                  <Typography sx={{ mb: 1, color: '#333' }}>
-                    <strong>Academic Integrity:</strong> {templateData.academicIntegrity}
-                  </Typography>
-                )}
-              </Box>
-
-              {/* Schedule */}
-              {templateData.schedule && (
-                <Box sx={{ mb: 3 }}>
-                  <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
-                    Course Schedule
-                  </Typography>
-                  <Typography sx={{ lineHeight: 1.6, whiteSpace: 'pre-line', color: '#333' }}>
-                    {templateData.schedule}
-                  </Typography>
-                </Box>
-              )}
+              {previewSections.map((section) => (
+                section.style === 'title' ? (
+                  /* Header - Always use print-friendly colors */
+                  <Box key={section.index} sx={{ textAlign: 'center', mb: 3, borderBottom: '2px solid #1565C0', pb: 2 }}>
+                    {section.heading && (
+                      <Typography variant="h6" sx={{ color: '#333', fontWeight: 'bold', mb: 1 }}>
+                        {section.heading}
+                      </Typography>
+                    )}
+                    {section.lines.map((line, index) => (
+                      <Typography
+                        key={line.key}
+                        variant={index ? 'h6' : 'h4'}
+                        sx={index ? { color: '#666' } : { color: '#1565C0', fontWeight: 'bold', mb: 1 }}
+                      >
+                        {line.label && <strong>{line.label}: </strong>}
+                        {line.text}
+                      </Typography>
+                    ))}
+                  </Box>
+                ) : (
+                  <Box key={section.index} sx={{ mb: 3 }}>
+                    {section.heading && (
+                      <Typography variant="h6" sx={{ fontWeight: 'bold', mb: 1, color: '#333' }}>
+                        {section.heading}
+                      </Typography>
+                    )}
+                    {section.lines.map((line) => (
+                      <Typography key={line.key} sx={{ lineHeight: 1.6, whiteSpace: 'pre-line', color: '#333' }}>
+                        {line.label && <strong>{line.label}: </strong>}
+                        {line.text}
+                      </Typography>
+                    ))}
+                  </Box>
+                )
+              ))}
 
               {/* Footer */}
               <Divider sx={{ my: 2 }} />
@@ -538,116 +412,22 @@ const SyllabusTemplate = ({ syllabus, onClose, onSave, mode = 'view', selectedSu
         </Grid>
 
         {/* Additional Fields */}
-        <Grid item xs={12}>
-          <Paper
-            sx={{
-              p: 3,
-              borderRadius: 3,
-              border: '1px solid',
-              borderColor: 'divider',
-              boxShadow: 'none',
-            }}
-          >
-            <Typography variant="h6" gutterBottom sx={{ fontWeight: 600, color: 'primary.main' }}>
-              Additional Information
-            </Typography>
-            <Grid container spacing={3}>
-              <Grid item xs={12} md={6}>
-                <TextField
-                  fullWidth
-                  label="Required Textbooks/Materials"
-                  value={templateData.textbooks}
-                  onChange={(e) => handleInputChange('textbooks', e.target.value)}
-                  multiline
-                  rows={3}
-                />
-              </Grid>
-              <Grid item xs={12} md={6}>
-                <Typography variant="subtitle1" sx={{ mb: 1, fontWeight: 500 }}>
-                  Grading Policy (Percentages)
-                </Typography>
-                <Grid container spacing={2}>
-                  <Grid item xs={6}>
-                    <TextField
-                      fullWidth
-                      label="Assignments (%)"
-                      type="number"
-                      value={templateData.assignmentsPercent || ''}
-                      onChange={(e) => handleInputChange('assignmentsPercent', e.target.value)}
-                      inputProps={{ min: 0, max: 100 }}
-                      size="small"
-                    />
-                  </Grid>
-                  <Grid item xs={6}>
-                    <TextField
-                      fullWidth
-                      label="Midterm (%)"
-                      type="number"
-                      value={templateData.midtermPercent || ''}
-                      onChange={(e) => handleInputChange('midtermPercent', e.target.value)}
-                      inputProps={{ min: 0, max: 100 }}
-                      size="small"
-                    />
-                  </Grid>
-                  <Grid item xs={6}>
-                    <TextField
-                      fullWidth
-                      label="Final Exam (%)"
-                      type="number"
-                      value={templateData.finalPercent || ''}
-                      onChange={(e) => handleInputChange('finalPercent', e.target.value)}
-                      inputProps={{ min: 0, max: 100 }}
-                      size="small"
-                    />
-                  </Grid>
-                  <Grid item xs={6}>
-                    <TextField
-                      fullWidth
-                      label="Other (%)"
-                      type="number"
-                      value={templateData.otherPercent || ''}
-                      onChange={(e) => handleInputChange('otherPercent', e.target.value)}
-                      inputProps={{ min: 0, max: 100 }}
-                      helperText="Participation, quizzes, etc."
-                      size="small"
-                    />
+        {bottomGroups.map((group) => (
+          <Grid item xs={12} key={group.name}>
+            <Paper sx={groupPaperSx}>
+              <Typography variant="h6" gutterBottom sx={{ fontWeight: 600, color: 'primary.main' }}>
+                {group.name}
+              </Typography>
+              <Grid container spacing={2}>
+                {group.fields.map((field) => (
+                  <Grid item key={field.key} xs={field.type === 'number' ? 6 : 12} md={field.type === 'number' ? 3 : 6}>
+                    {renderField(field, true)}
                   </Grid>
-                </Grid>
+                ))}
               </Grid>
-              <Grid item xs={12} md={6}>
-                <TextField
-                  fullWidth
-                  label="Attendance Policy"
-                  value={templateData.attendancePolicy}
-                  onChange={(e) => handleInputChange('attendancePolicy', e.target.value)}
-                  multiline
-                  rows={2}
-                />
-              </Grid>
-              <Grid item xs={12} md={6}>
-                <TextField
-                  fullWidth
-                  label="Academic Integrity Policy"
-                  value={templateData.academicIntegrity}
-                  onChange={(e) => handleInputChange('academicIntegrity', e.target.value)}
-                  multiline
-                  rows={2}
-                />
-              </Grid>
-              <Grid item xs={12}>
-                <TextField
-                  fullWidth
-                  label="Course Schedule/Important Dates"
-                  value={templateData.schedule}
-                  onChange={(e) => handleInputChange('schedule', e.target.value)}
-                  multiline
-                  rows={4}
-                  placeholder="Week 1: Introduction&#10;Week 2: Basic Concepts&#10;etc."
-                />
-              </Grid>
-            </Grid>
-          </Paper>
-        </Grid>
+            </Paper>
+          </Grid>
+        ))}
       </Grid>
     </Box>
   );
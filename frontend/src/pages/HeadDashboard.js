@@ -39,7 +39,7 @@ import { useNavigate } from 'react-router-dom';
 import { useTheme, alpha } from '@mui/material/styles';
 import { ColorModeContext } from '../App';
 import { getStatusColor } from '../theme';
-import api, { formatTeacherName } from '../services/api';
+import api, { formatTeacherName, subscribeToSyllabusEvents } from '../services/api';
 import SyllabusTemplate from '../components/SyllabusTemplate';
 
 const HeadDashboard = () => {
@@ -49,6 +49,7 @@ const HeadDashboard = () => {
 
   const [syllabi, setSyllabi] = useState([]);
   const [allSyllabi, setAllSyllabi] = useState([]);
+  const [statusCounts, setStatusCounts] = useState({});
   const [loading, setLoading] = useState(true);
   const [selectedSyllabus, setSelectedSyllabus] = useState(null);
   const [showTemplate, setShowTemplate] = useState(false);
@@ -65,15 +66,34 @@ const HeadDashboard = () => {
     fetchData();
   }, [navigate]);
 
+  // Refresh when a syllabus in the department is submitted or changes status
+  useEffect(() => subscribeToSyllabusEvents(() => fetchData()), []);
+
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [pendingRes, allRes] = await Promise.all([
-        api.get('/syllabi/pending'),
-        api.get('/syllabi/all'),
-      ]);
-      setSyllabi(pendingRes.data);
-      setAllSyllabi(allRes.data);
+      // The whole pending queue, page by page, with department-wide
+      // per-status counts from the first page
+      const pending = [];
+      let counts = {};
+      let cursor = null;
+      do {
+        const response = await api.get('/syllabi/review', {
+          params: { status: 'pending', limit: 200, include_counts: cursor === null, ...(cursor ? { cursor } : {}) },
+        });
+        pending.push(...response.data.items);
+        if (cursor === null) counts = response.data.counts || {};
+        cursor = response.headers['x-next-cursor'] || null;
+      } while (cursor);
+
+      // Latest decisions for the activity list; FastAPI reads repeated
+      // status params, not axios' default status[]=
+      const reviewed = await api.get('/syllabi/review?status=approved&status=rejected', {
+        params: { limit: 5 },
+      });
+      setSyllabi(pending);
+      setAllSyllabi(reviewed.data.items);
+      setStatusCounts(counts);
     } catch (error) {
       console.error('Failed to fetch syllabi:', error);
     }
@@ -103,12 +123,13 @@ const HeadDashboard = () => {
     navigate('/login');
   };
 
-  const pendingSyllabi = syllabi.filter(s => s.status === 'pending');
-  const approvedCount = allSyllabi.filter(s => s.status === 'approved').length;
-  const rejectedCount = allSyllabi.filter(s => s.status === 'rejected').length;
+  const pendingSyllabi = syllabi;
+  const pendingCount = statusCounts.pending || 0;
+  const approvedCount = statusCounts.approved || 0;
+  const rejectedCount = statusCounts.rejected || 0;
 
   const statCards = [
-    { title: 'Pending Review', count: pendingSyllabi.length, icon: HourglassEmpty, color: 'warning', desc: 'Syllabi awaiting your review' },
+    { title: 'Pending Review', count: pendingCount, icon: HourglassEmpty, color: 'warning', desc: 'Syllabi awaiting your review' },
     { title: 'Approved', count: approvedCount, icon: ThumbUp, color: 'success', desc: 'Syllabi you\'ve approved' },
     { title: 'Rejected', count: rejectedCount, icon: ThumbDown, color: 'error', desc: 'Syllabi you\'ve rejected' },
   ];
@@ -214,7 +235,7 @@ const HeadDashboard = () => {
               <Typography variant="h6" sx={{ fontWeight: 600 }}>
                 Pending Syllabi for Review
               </Typography>
-              <Chip label={pendingSyllabi.length} color="warning" size="small" />
+              <Chip label={pendingCount} color="warning" size="small" />
             </Box>
 
             {loading ? (
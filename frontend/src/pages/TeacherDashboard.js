@@ -15,7 +15,7 @@ import {
 import { useTheme, alpha } from '@mui/material/styles';
 import { ColorModeContext } from '../App';
 import { getStatusColor } from '../theme';
-import api from '../services/api';
+import api, { subscribeToSyllabusEvents } from '../services/api';
 import SyllabusTemplate from '../components/SyllabusTemplate';
 
 const TeacherDashboard = () => {
@@ -38,6 +38,9 @@ const TeacherDashboard = () => {
     fetchSyllabi();
   }, []);
 
+  // Refresh when one of our syllabi is created, edited or reviewed
+  useEffect(() => subscribeToSyllabusEvents(() => fetchSyllabi()), []);
+
   const fetchSubjects = async () => {
     const response = await api.get('/subjects/my');
     setSubjects(response.data);
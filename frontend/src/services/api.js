@@ -15,6 +15,24 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// Subscribe to syllabus change notifications (Server-Sent Events).
+// EventSource cannot set headers, so the token travels as a query parameter.
+// Returns a function that closes the stream.
+export const subscribeToSyllabusEvents = (onEvent) => {
+  const token = localStorage.getItem('token');
+  if (!token || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+  const source = new EventSource(
+    `${api.defaults.baseURL}/syllabi/events?access_token=${encodeURIComponent(token)}`
+  );
+  const handler = (message) => onEvent(JSON.parse(message.data));
+  ['syllabus.created', 'syllabus.updated', 'syllabus.status'].forEach((type) =>
+    source.addEventListener(type, handler)
+  );
+  return () => source.close();
+};
+
 // Utility function to format teacher name from email (name.surname@university.edu format)
 export const formatTeacherName = (email) => {
   if (!email || !email.includes('@')) return '';